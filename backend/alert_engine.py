@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Alert state engine for Cloud Health Dashboard Phase 2
+Turns per-probe threshold checks into firing/resolved alerts with hysteresis, so alert
+writes follow state changes instead of probe count
+"""
+
+from extensions import db
+from models import Alert
+from notifications import notify_alert
+
+def alert_dedup_key(service_id, alert_type):
+    """Key shared by every alert of one type on one service"""
+    return f'{service_id}:{alert_type}'
+
+class AlertState:
+    """In-memory hysteresis counters for one dedup key"""
+    __slots__ = ('breaches', 'recoveries', 'alert_id')
+
+    def __init__(self, alert_id=None, breaches=0):
+        self.breaches = breaches  # consecutive breaches, or breaches since firing
+        self.recoveries = 0  # consecutive healthy observations while firing
+        self.alert_id = alert_id  # id of the firing Alert row, if any
+
+class AlertStateEngine:
+    """Fire after N consecutive breaches, resolve after M consecutive recoveries
+
+    While an alert fires, further breaches bump its escalation_level every
+    escalate_after observations (up to max_escalation) instead of adding rows.
+    Counters live in memory; firing alerts are reloaded from the database on first use.
+    """
+
+    def __init__(self, fire_after=3, resolve_after=3, escalate_after=20, max_escalation=3):
+        self.fire_after = max(1, fire_after)
+        self.resolve_after = max(1, resolve_after)
+        self.escalate_after = max(1, escalate_after)
+        self.max_escalation = max_escalation
+        self._states = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            fire_after=config['ALERT_FIRE_AFTER'],
+            resolve_after=config['ALERT_RESOLVE_AFTER'],
+            escalate_after=config['ALERT_ESCALATE_AFTER'],
+            max_escalation=config['ALERT_MAX_ESCALATION']
+        )
+
+    def _load(self):
+        """Resume firing alerts left by a previous run (one query per process)"""
+        self._states = {}
+        for alert in Alert.query.filter_by(status='firing').all():
+            key = alert.dedup_key or alert_dedup_key(alert.service_id, alert.type)
+            self._states[key] = AlertState(alert_id=alert.id, breaches=alert.breach_count or 1)
+
+    def observe(self, service, alert_type, breached, value, threshold, severity, message, now):
+        """Feed one threshold check; returns the Alert row written, if any. The caller commits."""
+        if self._states is None:
+            self._load()
+
+        key = alert_dedup_key(service.id, alert_type)
+        state = self._states.get(key)
+        if state is None:
+            if not breached:
+                return None
+            state = self._states[key] = AlertState()
+
+        if breached:
+            state.breaches += 1
+            state.recoveries = 0
+            if state.alert_id is None:
+                if state.breaches >= self.fire_after:
+                    return self._fire(state, service, alert_type, key, value, threshold, severity, message, now)
+                return None
+            over = state.breaches - self.fire_after
+            if over > 0 and over % self.escalate_after == 0:
+                return self._escalate(state, service, value, message)
+            return None
+
+        if state.alert_id is None:
+            del self._states[key]
+            return None
+        state.recoveries += 1
+        if state.recoveries >= self.resolve_after:
+            alert = self._resolve(state, service, now)
+            del self._states[key]
+            return alert
+        return None
+
+    def tracked_keys(self):
+        """Dedup keys with pending or firing state; every other key is quiet and can be skipped"""
+        if self._states is None:
+            self._load()
+        return self._states.keys()
+
+    def forget(self):
+        """Drop the counters (e.g. after a rollback) so firing alerts are reloaded from the database"""
+        self._states = None
+
+    def _fire(self, state, service, alert_type, key, value, threshold, severity, message, now):
+        alert = Alert(
+            service_id=service.id,
+            type=alert_type,
+            message=message,
+            threshold=threshold,
+            severity=severity,
+            triggered_at=now,
+            status='firing',
+            dedup_key=key,
+            breach_count=state.breaches,
+            last_value=value
+        )
+        db.session.add(alert)
+        db.session.flush()
+        state.alert_id = alert.id
+        notify_alert(alert, 'alert_firing', service.name)
+        return alert
+
+    def _escalate(self, state, service, value, message):
+        alert = db.session.get(Alert, state.alert_id)
+        if alert is None or alert.escalation_level >= self.max_escalation:
+            return None
+        alert.escalation_level += 1
+        alert.breach_count = state.breaches
+        alert.last_value = value
+        alert.message = message
+        notify_alert(alert, 'alert_escalated', service.name)
+        return alert
+
+    def _resolve(self, state, service, now):
+        alert = db.session.get(Alert, state.alert_id)
+        if alert is None:
+            return None
+        alert.status = 'resolved'
+        alert.resolved_at = now
+        alert.breach_count = state.breaches
+        notify_alert(alert, 'alert_resolved', service.name)
+        return alert
+
+def get_alert_engine(app):
+    """The app's alert engine, created from its config on first use"""
+    engine = app.extensions.get('alert_engine')
+    if engine is None:
+        engine = app.extensions['alert_engine'] = AlertStateEngine.from_config(app.config)
+    return engine
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Alert rule engine for Cloud Health Dashboard Phase 2
+Compiles each service's alert_thresholds JSON once into rules (metric, aggregation, window,
+comparison) and evaluates the rules of a cycle group by group: rules sharing a signature are kept
+as parallel lists of service ids and thresholds, each group's aggregates are gathered into an
+array('d') by a plain Python loop, and the comparison is one map() over the group. This is not
+vectorized arithmetic; the saving is that rules are parsed once and that only breached rules and
+keys the alert engine is already tracking reach the hysteresis state machine.
+"""
+
+import copy
+import logging
+import math
+import operator
+import time
+from array import array
+from collections import namedtuple
+from datetime import timedelta
+from itertools import compress, repeat
+
+from alert_engine import alert_dedup_key, get_alert_engine
+from cost_rollups import get_latency_sketch, get_latency_sketches
+from latency_sketch import percentile_threshold
+from sliding_window import WindowRegistry, get_window_registry, parse_window
+
+logger = logging.getLogger(__name__)
+
+COMPARISONS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+COMPARISON_WORDS = {'>': 'exceeded', '>=': 'reached', '<': 'fell below', '<=': 'fell to'}
+MISSING = math.nan  # comparisons against NaN are always False
+
+# Threshold key -> (metric, default aggregation, window config key, severity)
+RULE_DEFAULTS = {
+    'response_time': ('response_time', 'last', None, 'medium'),
+    'cost': ('cost', 'last', None, 'high'),
+    'error_rate': ('error_rate', 'rate', 'ALERT_ERROR_RATE_WINDOW', 'high')
+}
+
+Rule = namedtuple('Rule', 'key metric aggregation window comparison threshold alert_type severity')
+Observation = namedtuple('Observation', 'response_time cost status_code error')
+
+class RuleError(ValueError):
+    """An alert_thresholds entry that cannot be compiled"""
+
+def _window_name(window, windows):
+    """The name under which windows ({name: seconds}) keeps a window spec of the same length, or None"""
+    try:
+        seconds = parse_window(str(window))
+    except ValueError:
+        raise RuleError(f'Invalid window {window!r}')
+    if seconds <= 0:
+        raise RuleError(f'Invalid window {window!r}')
+    for name, length in windows.items():
+        if length == seconds:
+            return name
+    return None
+
+def compile_rule(key, spec, config, windows=None):
+    """Compile one alert_thresholds entry
+
+    spec is a number (legacy form: `"response_time": 2.0`) or a dict such as
+    `{"threshold": 1.5, "aggregation": "avg", "window": "1h", "comparison": ">", "severity": "high"}`.
+    Keys like `p95_response_time` are response_time rules with a p95 aggregation. windows maps
+    the sliding windows kept per service to their length; avg and rate rules must use one of
+    them (any spelling of the same length, e.g. '300' for '5m'), or they could never be judged.
+    """
+    windows = windows if windows is not None else WindowRegistry.from_config(config).windows
+    quantile = percentile_threshold(key)
+    if quantile is not None:
+        metric, aggregation, window_key, severity = ('response_time', key.split('_')[0],
+                                                     'ALERT_PERCENTILE_WINDOW', 'medium')
+    elif key in RULE_DEFAULTS:
+        metric, aggregation, window_key, severity = RULE_DEFAULTS[key]
+    else:
+        raise RuleError(f'Unknown alert threshold {key!r}')
+
+    if not isinstance(spec, dict):
+        spec = {'threshold': spec}
+    try:
+        threshold = float(spec['threshold'])
+    except (KeyError, TypeError, ValueError):
+        raise RuleError(f'Alert threshold {key!r} needs a numeric threshold')
+
+    aggregation = spec.get('aggregation', aggregation)
+    comparison = spec.get('comparison', '>')
+    window = spec.get('window') or (config[window_key] if window_key else None)
+
+    if comparison not in COMPARISONS:
+        raise RuleError(f'Unknown comparison {comparison!r} for {key!r}')
+    if aggregation == 'last':
+        window = None
+    elif aggregation in ('avg', 'rate'):
+        if (aggregation == 'rate') != (metric == 'error_rate'):
+            raise RuleError(f'Aggregation {aggregation!r} does not apply to {metric}')
+    elif percentile_threshold(f'{aggregation}_response_time') is None or metric != 'response_time':
+        raise RuleError(f'Unknown aggregation {aggregation!r} for {key!r}')
+    if window is not None:
+        name = _window_name(window, windows)
+        if aggregation in ('avg', 'rate'):
+            if name is None:
+                raise RuleError(f'Window {window!r} for {key!r} is not one of STATS_WINDOWS ({", ".join(windows)})')
+            window = name
+        elif name is not None:
+            window = name  # percentiles merge sketches over any span; share a group when the length matches
+
+    return Rule(key, metric, aggregation, window, comparison, threshold, f'high_{key}',
+                spec.get('severity', severity))
+
+def compile_thresholds(thresholds, config, windows=None):
+    """Compile a service's alert_thresholds, skipping (and logging) entries that are invalid"""
+    rules = []
+    for key, spec in (thresholds or {}).items():
+        try:
+            rules.append(compile_rule(key, spec, config, windows))
+        except RuleError as e:
+            logger.warning(f"Ignoring alert threshold: {e}")
+    return rules
+
+def format_message(rule, value):
+    verb = COMPARISON_WORDS[rule.comparison]
+    over = f' over {rule.window}' if rule.window else ''
+    if rule.metric == 'cost':
+        return f'Cost ${value:.6f}{over} {verb} threshold ${rule.threshold:.6f}'
+    if rule.metric == 'error_rate':
+        return f'Error rate {value:.1f}%{over} {verb} threshold {rule.threshold}%'
+    label = 'Response time' if rule.aggregation == 'last' else f'{rule.aggregation} response time'
+    return f'{label} {value:.3f}s{over} {verb} threshold {rule.threshold}s'
+
+class RuleGroup:
+    """Rules sharing (metric, aggregation, window, comparison), stored as parallel columns"""
+
+    def __init__(self, metric, aggregation, window, comparison):
+        self.metric = metric
+        self.aggregation = aggregation
+        self.window = window
+        self.compare = COMPARISONS[comparison]
+        self.service_ids = []
+        self.thresholds = array('d')
+        self.rules = []
+        self.keys = []
+
+    def add(self, service_id, rule):
+        self.service_ids.append(service_id)
+        self.thresholds.append(rule.threshold)
+        self.rules.append(rule)
+        self.keys.append(alert_dedup_key(service_id, rule.alert_type))
+
+class AlertRuleEngine:
+    """Compiled rules for every service, regrouped only when some service's thresholds change"""
+
+    def __init__(self, app):
+        self.app = app
+        self._compiled = {}  # service_id -> (alert_thresholds as compiled, rules)
+        self._groups = []
+        self._percentiles = {}  # (window, aggregation) -> (refresh due, {service_id: value})
+
+    def sync(self, services):
+        """Compile new or changed alert_thresholds; regroup only if anything changed"""
+        changed = False
+        seen = set()
+        for service in services:
+            seen.add(service.id)
+            changed |= self._compile(service)
+        for service_id in [sid for sid in self._compiled if sid not in seen]:
+            del self._compiled[service_id]
+            changed = True
+        if changed:
+            self._regroup()
+
+    def _compile(self, service):
+        cached = self._compiled.get(service.id)
+        if cached is not None and cached[0] == service.alert_thresholds:
+            return False
+        self._compiled[service.id] = (copy.deepcopy(service.alert_thresholds),
+                                      compile_thresholds(service.alert_thresholds, self.app.config,
+                                                         get_window_registry(self.app).windows))
+        return True
+
+    def _regroup(self):
+        groups = {}
+        for service_id, (_, rules) in self._compiled.items():
+            for rule in rules:
+                signature = (rule.metric, rule.aggregation, rule.window, rule.comparison)
+                group = groups.get(signature)
+                if group is None:
+                    group = groups[signature] = RuleGroup(*signature)
+                group.add(service_id, rule)
+        self._groups = list(groups.values())
+
+    def evaluate(self, services, observations, now, suppressed=()):
+        """Evaluate every compiled rule for this cycle's observations
+
+        services: the Service rows of the cycle; observations: service_id -> Observation.
+        Services whose ids are in suppressed (e.g. in maintenance) are left alone this cycle.
+        Returns the number of rules that reached the alert engine. The caller commits.
+        """
+        self.sync(services)
+        by_id = {service.id: service for service in services if service.id not in suppressed}
+        engine = get_alert_engine(self.app)
+        tracked = engine.tracked_keys()
+        values_for = AggregateColumns(self.app, observations, now, percentile_cache=self._percentiles)
+        observed = 0
+
+        for group in self._groups:
+            values = values_for(group)
+            breached = list(map(group.compare, values, group.thresholds))
+            interesting = map(operator.or_, breached, map(tracked.__contains__, group.keys))
+            for i in compress(range(len(values)), list(interesting)):
+                value = values[i]
+                service = by_id.get(group.service_ids[i])
+                if service is None or math.isnan(value):  # nothing to judge this cycle
+                    continue
+                rule = group.rules[i]
+                engine.observe(service, rule.alert_type, breached=breached[i], value=value,
+                               threshold=rule.threshold, severity=rule.severity,
+                               message=format_message(rule, value), now=now)
+                observed += 1
+        return observed
+
+    def evaluate_service(self, service, observation, now):
+        """Evaluate one service's rules (e.g. the first check of a newly added service)"""
+        if self._compile(service):
+            self._regroup()
+        engine = get_alert_engine(self.app)
+        values_for = AggregateColumns(self.app, {service.id: observation}, now, service_id=service.id)
+        observed = 0
+        for rule in self._compiled[service.id][1]:
+            group = RuleGroup(rule.metric, rule.aggregation, rule.window, rule.comparison)
+            group.add(service.id, rule)
+            value = values_for(group)[0]
+            if math.isnan(value):
+                continue
+            engine.observe(service, rule.alert_type, breached=group.compare(value, rule.threshold),
+                           value=value, threshold=rule.threshold, severity=rule.severity,
+                           message=format_message(rule, value), now=now)
+            observed += 1
+        return observed
+
+class AggregateColumns:
+    """Builds the value column for a rule group; NaN marks services with nothing to compare
+
+    Percentiles come from merging rollup sketches, by far the most expensive aggregate, so a
+    cycle-wide evaluation reuses them for ALERT_PERCENTILE_REFRESH seconds via percentile_cache.
+    """
+
+    def __init__(self, app, observations, now, service_id=None, percentile_cache=None):
+        self.observations = observations
+        self.now = now
+        self.clock = time.time()  # sliding windows are keyed by wall-clock seconds
+        self.windows = get_window_registry(app)
+        self.service_id = service_id  # restrict sketch queries to one service
+        self.percentile_cache = percentile_cache
+        self.percentile_refresh = app.config['ALERT_PERCENTILE_REFRESH']
+        self._sketches = {}
+
+    def __call__(self, group):
+        ids = group.service_ids
+        if group.aggregation == 'last':
+            return self._last(ids, group.metric)
+        if group.aggregation in ('avg', 'rate'):
+            return self._windowed(ids, group.aggregation, group.window)
+        return self._percentile(ids, group.aggregation, group.window)
+
+    def _last(self, ids, metric):
+        column = array('d')
+        get = self.observations.get
+        for service_id in ids:
+            observation = get(service_id)
+            value = getattr(observation, metric) if observation is not None else None
+            column.append(MISSING if value is None else value)
+        return column
+
+    def _windowed(self, ids, aggregation, window):
+        column = array('d')
+        registry = self.windows
+        for service_id in ids:
+            if window not in registry.windows:
+                column.append(MISSING)
+                continue
+            requests, errors, latency_sum = registry.get(service_id).windows[window].totals(self.clock)
+            if aggregation == 'rate':
+                column.append(errors / requests * 100 if requests else MISSING)
+            else:
+                successes = requests - errors
+                column.append(latency_sum / successes if successes else MISSING)
+        return column
+
+    def _percentile(self, ids, aggregation, window):
+        cache_key = (window, aggregation)
+        cached = self.percentile_cache.get(cache_key) if self.percentile_cache is not None else None
+        if cached is None or cached[0] <= self.clock:
+            quantile = percentile_threshold(f'{aggregation}_response_time')
+            values = {}
+            for service_id, sketch in self._window_sketches(window).items():
+                value = sketch.quantile(quantile)
+                if value is not None:
+                    values[service_id] = value
+            cached = (self.clock + self.percentile_refresh, values)
+            if self.percentile_cache is not None:
+                self.percentile_cache[cache_key] = cached
+        return array('d', map(cached[1].get, ids, repeat(MISSING)))
+
+    def _window_sketches(self, window):
+        sketches = self._sketches.get(window)
+        if sketches is None:
+            since = self.now - timedelta(seconds=parse_window(window))
+            if self.service_id is not None:
+                sketches = {self.service_id: get_latency_sketch(self.service_id, since, self.now)}
+            else:
+                sketches = get_latency_sketches(since, self.now)
+            self._sketches[window] = sketches
+        return sketches
+
+def get_rule_engine(app):
+    """The app's alert rule engine, created on first use"""
+    engine = app.extensions.get('alert_rules')
+    if engine is None:
+        engine = app.extensions['alert_rules'] = AlertRuleEngine(app)
+    return engine
@@ -4,12 +4,21 @@ Authentication service for Cloud Health Dashboard Phase 2
 Handles user authentication, JWT token management, and authorization
 """
 
-from flask import request, jsonify
+from flask import Blueprint, current_app, g, request, jsonify
 from functools import wraps
+import math
+import uuid
 import jwt
 import bcrypt
 from datetime import datetime, timedelta
-from app import app, db, User
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import User
+from monitoring import LOGIN_ATTEMPTS
+from login_throttle import HashQueueFull, get_login_throttle, get_password_hasher
+from token_revocation import is_token_revoked, revoke_token
+
+auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 def generate_token(user_id, username, role):
     """Generate JWT token for user"""
@@ -18,9 +27,10 @@ def generate_token(user_id, username, role):
         'username': username,
         'role': role,
         'exp': datetime.utcnow() + timedelta(hours=24),  # 24 hour expiration
-        'iat': datetime.utcnow()
+        'iat': datetime.utcnow(),
+        'jti': uuid.uuid4().hex  # lets logout revoke this token alone
     }
-    return jwt.encode(payload, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+    return jwt.encode(payload, current_app.config['JWT_SECRET_KEY'], algorithm='HS256')
 
 def verify_password(password, password_hash):
     """Verify password against hash"""
@@ -43,16 +53,15 @@ def token_required(f):
             if token.startswith('Bearer '):
                 token = token[7:]
             
-            data = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            if is_token_revoked(current_app, data):
+                return jsonify({'error': 'Token has been revoked'}), 401
+            g.token = data
             current_user = User.query.get(data['user_id'])
             
             if not current_user:
                 return jsonify({'error': 'Invalid token'}), 401
             
-            # Update last login
-            current_user.last_login = datetime.utcnow()
-            db.session.commit()
-            
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token has expired'}), 401
         except jwt.InvalidTokenError:
@@ -73,7 +82,10 @@ def admin_required(f):
             if token.startswith('Bearer '):
                 token = token[7:]
             
-            data = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            if is_token_revoked(current_app, data):
+                return jsonify({'error': 'Token has been revoked'}), 401
+            g.token = data
             current_user = User.query.get(data['user_id'])
             
             if not current_user or current_user.role != 'admin':
@@ -99,7 +111,10 @@ def operator_required(f):
             if token.startswith('Bearer '):
                 token = token[7:]
             
-            data = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            if is_token_revoked(current_app, data):
+                return jsonify({'error': 'Token has been revoked'}), 401
+            g.token = data
             current_user = User.query.get(data['user_id'])
             
             if not current_user or current_user.role not in ['admin', 'operator']:
@@ -113,8 +128,15 @@ def operator_required(f):
         return f(current_user, *args, **kwargs)
     return decorated
 
+def _retry_later(message, status, retry_after):
+    retry_after = max(1, int(math.ceil(retry_after)))
+    response = jsonify({'error': message, 'retry_after': retry_after})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
 # Authentication routes
-@app.route('/api/auth/login', methods=['POST'])
+@auth_bp.route('/login', methods=['POST'])
 def login():
     """User login endpoint"""
     data = request.get_json()
@@ -122,11 +144,30 @@ def login():
     if not data or 'username' not in data or 'password' not in data:
         return jsonify({'error': 'Username and password are required'}), 400
     
+    # Locked-out usernames and addresses are refused before any password is hashed
+    throttle = get_login_throttle(current_app)
+    locked_for = throttle.locked_for(data['username'], request.remote_addr)
+    if locked_for:
+        LOGIN_ATTEMPTS.labels(outcome='locked').inc()
+        return _retry_later('Too many failed login attempts', 429, locked_for)
+    
     user = User.query.filter_by(username=data['username']).first()
     
-    if not user or not verify_password(data['password'], user.password_hash):
+    try:
+        valid = user is not None and get_password_hasher(current_app).run(
+            verify_password, data['password'], user.password_hash)
+    except HashQueueFull:
+        LOGIN_ATTEMPTS.labels(outcome='busy').inc()
+        return _retry_later('Too many logins in progress', 503, 1)
+    
+    if not valid:
+        throttle.failed(data['username'], request.remote_addr)
+        LOGIN_ATTEMPTS.labels(outcome='failure').inc()
         return jsonify({'error': 'Invalid credentials'}), 401
     
+    throttle.succeeded(data['username'])
+    LOGIN_ATTEMPTS.labels(outcome='success').inc()
+    
     # Generate token
     token = generate_token(user.id, user.username, user.role)
     
@@ -145,7 +186,7 @@ def login():
         'expires_in': 86400  # 24 hours in seconds
     })
 
-@app.route('/api/auth/register', methods=['POST'])
+@auth_bp.route('/register', methods=['POST'])
 def register():
     """User registration endpoint"""
     data = request.get_json()
@@ -160,8 +201,11 @@ def register():
     if User.query.filter_by(email=data['email']).first():
         return jsonify({'error': 'Email already exists'}), 400
     
-    # Create new user
-    password_hash = hash_password(data['password'])
+    # Create new user (registration floods queue for the same bcrypt threads as logins)
+    try:
+        password_hash = get_password_hasher(current_app).run(hash_password, data['password'])
+    except HashQueueFull:
+        return _retry_later('Too many requests in progress', 503, 1)
     user = User(
         username=data['username'],
         email=data['email'],
@@ -186,7 +230,7 @@ def register():
         'expires_in': 86400
     }), 201
 
-@app.route('/api/auth/profile', methods=['GET'])
+@auth_bp.route('/profile', methods=['GET'])
 @token_required
 def get_profile(current_user):
     """Get current user profile"""
@@ -199,7 +243,7 @@ def get_profile(current_user):
         'last_login': current_user.last_login.isoformat() if current_user.last_login else None
     })
 
-@app.route('/api/auth/profile', methods=['PUT'])
+@auth_bp.route('/profile', methods=['PUT'])
 @token_required
 def update_profile(current_user):
     """Update current user profile"""
@@ -213,13 +257,16 @@ def update_profile(current_user):
         current_user.email = data['email']
     
     if 'password' in data and data['password']:
-        current_user.password_hash = hash_password(data['password'])
+        try:
+            current_user.password_hash = get_password_hasher(current_app).run(hash_password, data['password'])
+        except HashQueueFull:
+            return _retry_later('Too many requests in progress', 503, 1)
     
     db.session.commit()
     
     return jsonify({'message': 'Profile updated successfully'})
 
-@app.route('/api/auth/refresh', methods=['POST'])
+@auth_bp.route('/refresh', methods=['POST'])
 @token_required
 def refresh_token(current_user):
     """Refresh JWT token"""
@@ -230,10 +277,13 @@ def refresh_token(current_user):
         'expires_in': 86400
     })
 
-@app.route('/api/auth/logout', methods=['POST'])
+@auth_bp.route('/logout', methods=['POST'])
 @token_required
 def logout(current_user):
-    """User logout endpoint"""
-    # In a real application, you might want to blacklist the token
-    # For now, we'll just return a success message
+    """User logout endpoint: revokes the token used for this request until it expires"""
+    try:
+        revoke_token(current_app, g.token)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # already revoked by a concurrent logout
     return jsonify({'message': 'Logged out successfully'})
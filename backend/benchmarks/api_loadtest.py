@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+API load test for Cloud Health Dashboard
+Drives the main endpoints against a seeded database and reports throughput and latency percentiles
+
+Usage (from backend/):
+    python -m benchmarks.api_loadtest                                  # in-process, temporary seeded DB
+    python -m benchmarks.api_loadtest --database-url sqlite:////tmp/big.db --requests 500
+    python -m benchmarks.api_loadtest --target http://127.0.0.1:5000   # running gunicorn
+    python -m benchmarks.api_loadtest --save-baseline                  # store the regression baseline
+    API_LOADTEST=1 python -m pytest benchmarks/test_api_regression.py  # fail on regressions
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.reporting import latency_summary, load_results, write_results
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'api.json')
+LOGIN = {'username': 'admin', 'password': 'password123'}
+DEFAULT_TOLERANCE = 0.5  # allowed fractional growth over the baseline
+
+# name -> (method, path template, needs auth)
+SCENARIOS = {
+    'services': ('GET', '/api/services', True),
+    'service_metrics': ('GET', '/api/services/{service_id}/metrics', True),
+    'dashboard_stats': ('GET', '/api/dashboard/stats', True),
+    'incidents': ('GET', '/api/incidents', True),
+    'cost_analysis': ('GET', '/api/services/{service_id}/cost-analysis', True),
+    'login': ('POST', '/api/auth/login', False)
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the dashboard API')
+    parser.add_argument('--target', help='base URL of a running server (default: in-process WSGI)')
+    parser.add_argument('--database-url', help='seeded database for in-process runs (default: generate one)')
+    parser.add_argument('--services', type=int, default=50, help='services to generate for a fresh DB')
+    parser.add_argument('--days', type=int, default=7, help='days of metrics to generate for a fresh DB')
+    parser.add_argument('--interval', type=int, default=300, help='metric interval for a fresh DB')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--login-requests', type=int, default=20, help='requests for the bcrypt-bound login')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated endpoints to run')
+    parser.add_argument('--output', help='result JSON path (default: benchmarks/results/)')
+    parser.add_argument('--save-baseline', action='store_true', help=f'store results as {BASELINE_PATH}')
+    return parser.parse_args(argv)
+
+class InProcessClient:
+    """Per-thread Flask test clients calling the WSGI app directly"""
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._local = threading.local()
+
+    def request(self, method, path, json=None, headers=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=json, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+class HttpClient:
+    """Per-thread keep-alive sessions against a running server"""
+
+    def __init__(self, base_url):
+        import requests
+        self.requests = requests
+        self.base_url = base_url.rstrip('/')
+        self._local = threading.local()
+
+    def request(self, method, path, json=None, headers=None):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self.requests.Session()
+        response = session.request(method, self.base_url + path, json=json, headers=headers, timeout=60)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+def prepare_in_process(args):
+    """Point the app at a seeded database and return a client for it"""
+    if not args.database_url:
+        handle, path = tempfile.mkstemp(prefix='api-loadtest-', suffix='.db')
+        os.close(handle)
+        os.remove(path)
+        args.database_url = f'sqlite:///{path}'
+        seed = True
+    else:
+        seed = False
+
+    from app import create_app
+    # testing: quiet logging; the limiter still runs, with a limit the load test cannot reach
+    flask_app = create_app('testing', DATABASE_URL=args.database_url, RATE_LIMIT_DEFAULT='1000000 per minute')
+
+    if seed:
+        from init_db import generate_bulk_data
+        generate_bulk_data(services=args.services, days=args.days, interval=args.interval,
+                           incidents=args.services * 2, seed=42, app=flask_app)
+    return InProcessClient(flask_app)
+
+def run_scenario(client, name, total, concurrency, headers, service_ids):
+    method, template, needs_auth = SCENARIOS[name]
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def one(i):
+        path = template.format(service_id=service_ids[i % len(service_ids)])
+        body = LOGIN if name == 'login' else None
+        started = time.perf_counter()
+        status, _ = client.request(method, path, json=body, headers=headers if needs_auth else None)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    result = latency_summary(latencies)
+    result['throughput_rps'] = round(total / elapsed, 2) if elapsed else 0.0
+    result['statuses'] = statuses
+    return result
+
+def run_loadtest(args):
+    client = HttpClient(args.target) if args.target else prepare_in_process(args)
+
+    status, body = client.request('POST', '/api/auth/login', json=LOGIN)
+    if status != 200:
+        raise SystemExit(f'Login failed with status {status}; is the database seeded?')
+    headers = {'Authorization': f"Bearer {body['token']}"}
+    status, services = client.request('GET', '/api/services', headers=headers)
+    service_ids = [s['id'] for s in services] if status == 200 and services else [1]
+
+    results = {}
+    for name in [s.strip() for s in args.scenarios.split(',') if s.strip()]:
+        total = args.login_requests if name == 'login' else args.requests
+        results[name] = run_scenario(client, name, total, args.concurrency, headers, service_ids)
+        r = results[name]
+        print(f"  {name:16s} {r['throughput_rps']:>9.1f} req/s  p50 {r['p50_ms']:>8.2f}  "
+              f"p95 {r['p95_ms']:>8.2f}  p99 {r['p99_ms']:>8.2f} ms  {r['statuses']}")
+
+    config = {
+        'target': args.target or 'in-process',
+        'database': (args.database_url or '').split(':', 1)[0] or None,
+        'services': len(service_ids),
+        'requests': args.requests,
+        'login_requests': args.login_requests,
+        'concurrency': args.concurrency
+    }
+    return config, results
+
+def find_regressions(baseline, current, tolerance=DEFAULT_TOLERANCE, slack_ms=5.0, metric='p95_ms'):
+    """List endpoints whose latency grew past baseline * (1 + tolerance) + slack"""
+    regressions = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        limit = before[metric] * (1 + tolerance) + slack_ms
+        if result[metric] > limit:
+            regressions.append(f"{name}: {metric} {result[metric]:.2f}ms > limit {limit:.2f}ms "
+                               f"(baseline {before[metric]:.2f}ms)")
+    return regressions
+
+def main(argv=None):
+    args = parse_args(argv)
+    print('Running API load test...')
+    config, results = run_loadtest(args)
+    output = write_results('api', config, results, args.output)
+    print(f'Results written to {output}')
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        write_results('api', config, results, BASELINE_PATH)
+        print(f'Baseline saved to {BASELINE_PATH}')
+    elif os.path.exists(BASELINE_PATH):
+        regressions = find_regressions(load_results(BASELINE_PATH)['results'], results)
+        for line in regressions:
+            print(f'  REGRESSION {line}')
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
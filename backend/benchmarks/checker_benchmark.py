@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Health checker throughput benchmark for Cloud Health Dashboard
+Registers N synthetic services against local stub servers and drives the probe loop
+
+Usage (from backend/):
+    python -m benchmarks.checker_benchmark --services 200 --cycles 3 --latency 0.02
+    python -m benchmarks.checker_benchmark --hang-rate 0.05 --hang-seconds 1 --hedge   # tail latency with hedging
+    python -m benchmarks.checker_benchmark --compare benchmarks/results/<previous>.json
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.reporting import latency_summary, load_results, print_comparison, write_results
+from benchmarks.stub_server import StubBehavior, start_stub_servers
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark health checker throughput')
+    parser.add_argument('--services', type=int, default=100, help='number of synthetic services')
+    parser.add_argument('--servers', type=int, default=4, help='number of stub HTTP servers')
+    parser.add_argument('--cycles', type=int, default=3, help='probe cycles to run')
+    parser.add_argument('--interval', type=float, default=30.0, help='target cycle interval in seconds')
+    parser.add_argument('--latency', type=float, default=0.01, help='stub response latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='uniform latency jitter in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of 500 responses')
+    parser.add_argument('--payload-size', type=int, default=256, help='response body size in bytes')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='fraction of requests that hang')
+    parser.add_argument('--hang-seconds', type=float, default=30.0, help='how long hung requests stall')
+    parser.add_argument('--hedge', action='store_true', help='enable hedged probes (PROBE_HEDGE_ENABLED)')
+    parser.add_argument('--hedge-min-samples', type=int, default=3, help='probes per service before hedging starts')
+    parser.add_argument('--metric-persistence', choices=('all', 'changes'), default='all',
+                        help='METRIC_PERSISTENCE mode')
+    parser.add_argument('--sample-ratio', type=float, default=0.05, help='METRIC_SAMPLE_RATIO for --metric-persistence changes')
+    parser.add_argument('--retries', type=int, default=None, help='override MAX_RETRIES for probes')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for stub behavior')
+    parser.add_argument('--database-url', help='database to use (default: temporary SQLite file)')
+    parser.add_argument('--output', help='result JSON path (default: benchmarks/results/)')
+    parser.add_argument('--compare', help='previous result JSON to compare against')
+    return parser.parse_args(argv)
+
+class DbWriteTimer:
+    """Accumulate time spent in session commits (flush of pending rows plus the DB commit)"""
+
+    def __init__(self):
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+        self.seconds = 0.0
+        self.commits = 0
+        self._started = None
+        event.listen(Session, 'before_commit', self._before)
+        event.listen(Session, 'after_commit', self._after)
+
+    def _before(self, session):
+        self._started = time.perf_counter()
+
+    def _after(self, session):
+        if self._started is not None:
+            self.seconds += time.perf_counter() - self._started
+            self.commits += 1
+            self._started = None
+
+def run_benchmark(args):
+    if not args.database_url:
+        handle, path = tempfile.mkstemp(prefix='checker-bench-', suffix='.db')
+        os.close(handle)
+        args.database_url = f'sqlite:///{path}'
+
+    import checker
+    from app import create_app
+    from extensions import db
+    from models import Service, Metric
+
+    overrides = {'PROBE_HEDGE_ENABLED': args.hedge, 'PROBE_HEDGE_MIN_SAMPLES': args.hedge_min_samples,
+                 'METRIC_PERSISTENCE': args.metric_persistence, 'METRIC_SAMPLE_RATIO': args.sample_ratio}
+    if args.retries is not None:
+        overrides['MAX_RETRIES'] = args.retries
+    flask_app = create_app('testing', DATABASE_URL=args.database_url, **overrides)  # testing: quiet logging
+
+    servers = start_stub_servers(args.servers, lambda i: StubBehavior(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        payload_size=args.payload_size,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed + i
+    ))
+
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.bulk_insert_mappings(Service, [{
+            'name': f'bench-service-{i}',
+            'url': servers[i % len(servers)].url,
+            'service_type': 'api',
+            'cost_per_request': 0.0001,
+            'cost_per_gb_hour': 0.10,
+            'alert_thresholds': {'response_time': 2.0, 'cost': 0.001, 'error_rate': 5.0},
+            'status': 'unknown',
+            'uptime': 0.0,
+            'response_time': 0.0,
+            'error_count': 0,
+            'total_checks': 0
+        } for i in range(args.services)])
+        db.session.commit()
+
+        db_timer = DbWriteTimer()
+
+        # Record when each probe actually starts relative to its cycle's scheduled start
+        probe_starts = []
+        probe_durations = []
+        cycle_start = [0.0]
+        original_check = checker.check_service_health
+
+        def timed_check(service, *args, **kwargs):
+            started = time.perf_counter()
+            probe_starts.append(started - cycle_start[0])
+            try:
+                return original_check(service, *args, **kwargs)
+            finally:
+                probe_durations.append(time.perf_counter() - started)
+
+        checker.check_service_health = timed_check
+        tracemalloc.start()
+        cycle_times = []
+        try:
+            for _ in range(args.cycles):
+                cycle_start[0] = time.perf_counter()
+                checker.run_health_checks(flask_app)
+                cycle_times.append(time.perf_counter() - cycle_start[0])
+        finally:
+            checker.check_service_health = original_check
+            _, peak_traced = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            for server in servers:
+                server.stop()
+
+        probes = len(probe_durations)
+        hedged = Metric.query.filter_by(hedged=True).count()
+        failed = Metric.query.filter_by(error=True).count()
+        metric_rows = Metric.query.count()
+        total_time = sum(cycle_times)
+        results = {
+            'probes': probes,
+            'probes_per_sec': round(probes / total_time, 2) if total_time else 0.0,
+            'cycle_time': latency_summary(cycle_times),
+            'cycles_over_interval': sum(1 for t in cycle_times if t > args.interval),
+            'max_services_per_interval': int(probes / total_time * args.interval) if total_time else 0,
+            'scheduling_lag': latency_summary(probe_starts),
+            'probe_latency': latency_summary(probe_durations),
+            'hedged_probes': hedged,
+            'failed_probes': failed,
+            'metric_rows': metric_rows,
+            'db_write_seconds': round(db_timer.seconds, 4),
+            'db_commits': db_timer.commits,
+            'db_write_ms_per_probe': round(db_timer.seconds / probes * 1000, 3) if probes else 0.0,
+            'peak_traced_memory_mb': round(peak_traced / 1024 / 1024, 2),
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+        }
+
+    config = {
+        'services': args.services,
+        'servers': args.servers,
+        'cycles': args.cycles,
+        'interval': args.interval,
+        'stub': servers[0].behavior.to_dict() if servers else {},
+        'database': args.database_url.split(':', 1)[0],
+        'hedge': args.hedge,
+        'metric_persistence': args.metric_persistence,
+        'max_retries': flask_app.config['MAX_RETRIES']
+    }
+    return config, results
+
+def main(argv=None):
+    args = parse_args(argv)
+    config, results = run_benchmark(args)
+    output = write_results('checker', config, results, args.output)
+
+    print(f"Probed {results['probes']} services in {config['cycles']} cycles")
+    print(f"  probes/sec:           {results['probes_per_sec']}")
+    print(f"  cycle time p50/p99:   {results['cycle_time']['p50_ms']} / {results['cycle_time']['p99_ms']} ms")
+    print(f"  scheduling lag p50/p99: {results['scheduling_lag']['p50_ms']} / {results['scheduling_lag']['p99_ms']} ms")
+    print(f"  probe p50/p99:        {results['probe_latency']['p50_ms']} / {results['probe_latency']['p99_ms']} ms "
+          f"({results['hedged_probes']} hedged, {results['failed_probes']} failed)")
+    print(f"  metric rows written:  {results['metric_rows']} for {results['probes']} probes")
+    print(f"  db write time:        {results['db_write_seconds']} s ({results['db_write_ms_per_probe']} ms/probe)")
+    print(f"  peak traced memory:   {results['peak_traced_memory_mb']} MB (max RSS {results['max_rss_mb']} MB)")
+    print(f"  services per {config['interval']:.0f}s interval: {results['max_services_per_interval']}")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        print_comparison(load_results(args.compare), load_results(output))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Notification dispatcher benchmark for Cloud Health Dashboard
+Queues bursts of alert notifications and drains them into a local SMTP stub and webhook
+receiver, reporting digests sent, connections opened, retries and time to drain
+
+Usage (from backend/):
+    python -m benchmarks.notification_benchmark --notifications 500 --bursts 5
+    python -m benchmarks.notification_benchmark --fail-first 2   # exercise retry with backoff
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.notification_stubs import SmtpStub, WebhookReceiver
+from benchmarks.reporting import write_results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the notification dispatcher')
+    parser.add_argument('--notifications', type=int, default=500, help='notifications per channel')
+    parser.add_argument('--bursts', type=int, default=5, help='bursts to split them into')
+    parser.add_argument('--poll-interval', type=float, default=0.2, help='dispatcher poll interval in seconds')
+    parser.add_argument('--batch-size', type=int, default=50, help='notifications per digest')
+    parser.add_argument('--fail-first', type=int, default=0, help='deliveries each receiver rejects first')
+    parser.add_argument('--timeout', type=float, default=60.0, help='give up draining after this many seconds')
+    parser.add_argument('--output', help='result JSON path (default: benchmarks/results/)')
+    return parser.parse_args(argv)
+
+def run_benchmark(args):
+    from app import create_app
+    from extensions import db
+    from models import Notification
+    from notifications import enqueue_notification, start_notification_dispatcher
+
+    webhook = WebhookReceiver(fail_first=args.fail_first).start()
+    smtp = SmtpStub(fail_first=args.fail_first).start()
+    handle, path = tempfile.mkstemp(prefix='notify-bench-', suffix='.db')
+    os.close(handle)
+
+    flask_app = create_app(
+        'testing',
+        DATABASE_URL=f'sqlite:///{path}',
+        NOTIFICATION_CHANNELS=['email', 'slack'],
+        SLACK_WEBHOOK_URL=webhook.url,
+        EMAIL_SMTP_SERVER=smtp.address[0],
+        EMAIL_SMTP_PORT=smtp.address[1],
+        EMAIL_USE_TLS=False,
+        EMAIL_USERNAME='',
+        EMAIL_TO=['oncall@example.com'],
+        NOTIFICATION_POLL_INTERVAL=args.poll_interval,
+        NOTIFICATION_BATCH_SIZE=args.batch_size,
+        NOTIFICATION_RETRY_DELAY=0,
+        NOTIFICATION_RETRY_ATTEMPTS=args.fail_first + 2
+    )
+    with flask_app.app_context():
+        db.create_all()
+
+    dispatcher = start_notification_dispatcher(flask_app)
+    per_burst = max(1, args.notifications // args.bursts)
+    started = time.perf_counter()
+    enqueue_seconds = 0.0
+    try:
+        queued = 0
+        for burst in range(args.bursts):
+            with flask_app.app_context():
+                enqueue_started = time.perf_counter()
+                for i in range(per_burst):
+                    enqueue_notification('alert_firing', f'[HIGH] high_response_time on service {i}',
+                                         f'Response time exceeded threshold (burst {burst})', service_id=i)
+                db.session.commit()
+                enqueue_seconds += time.perf_counter() - enqueue_started
+            queued += per_burst
+            time.sleep(args.poll_interval * 2)
+
+        deadline = time.perf_counter() + args.timeout
+        with flask_app.app_context():
+            while time.perf_counter() < deadline:
+                remaining = Notification.query.filter(Notification.status.in_(('pending', 'sending'))).count()
+                if not remaining:
+                    break
+                db.session.remove()
+                time.sleep(0.05)
+            counts = {status: Notification.query.filter_by(status=status).count()
+                      for status in ('pending', 'sending', 'sent', 'failed')}
+            retried = Notification.query.filter(Notification.attempts > 1).count()
+        drain_seconds = time.perf_counter() - started
+    finally:
+        dispatcher.stop()
+        webhook.stop()
+        smtp.stop()
+        os.remove(path)
+
+    results = {
+        'queued_per_channel': queued,
+        'statuses': counts,
+        'retried_notifications': retried,
+        'slack_messages': len(webhook.messages),
+        'slack_connections': webhook.connections,
+        'email_messages': len(smtp.messages),
+        'smtp_connections': smtp.connections,
+        'enqueue_ms_per_notification': round(enqueue_seconds / (queued * 2) * 1000, 4) if queued else 0.0,
+        'drain_seconds': round(drain_seconds, 3)
+    }
+    config = {
+        'notifications': args.notifications,
+        'bursts': args.bursts,
+        'poll_interval': args.poll_interval,
+        'batch_size': args.batch_size,
+        'fail_first': args.fail_first
+    }
+    return config, results
+
+def main(argv=None):
+    args = parse_args(argv)
+    config, results = run_benchmark(args)
+    output = write_results('notifications', config, results, args.output)
+    print(f"Queued {results['queued_per_channel']} notifications per channel in {config['bursts']} bursts")
+    print(f"  statuses:             {results['statuses']} ({results['retried_notifications']} retried)")
+    print(f"  slack: {results['slack_messages']} digests over {results['slack_connections']} connection(s)")
+    print(f"  email: {results['email_messages']} digests over {results['smtp_connections']} connection(s)")
+    print(f"  enqueue cost:         {results['enqueue_ms_per_notification']} ms per outbox row")
+    print(f"  drained in:           {results['drain_seconds']} s")
+    print(f"Results written to {output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Local SMTP and webhook receivers for Cloud Health Dashboard notification runs
+Record every delivered message and connection so dispatcher batching, connection reuse
+and retries can be checked without real mail or Slack
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+class _Receiver:
+    """Shared bookkeeping: delivered messages, connections and injected failures"""
+
+    def __init__(self, fail_first=0):
+        self.messages = []
+        self.connections = 0
+        self.fail_first = fail_first  # reject this many deliveries before accepting
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def _should_fail(self):
+        with self._lock:
+            if self.failures < self.fail_first:
+                self.failures += 1
+                return True
+            return False
+
+    def _record(self, message):
+        with self._lock:
+            self.messages.append(message)
+
+    def _connected(self):
+        with self._lock:
+            self.connections += 1
+
+class WebhookReceiver(_Receiver):
+    """HTTP server on 127.0.0.1 accepting Slack-style JSON webhook posts"""
+
+    def __init__(self, fail_first=0, host='127.0.0.1', port=0):
+        super().__init__(fail_first)
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                receiver._connected()
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                status = 500 if receiver._should_fail() else 200
+                if status == 200:
+                    receiver._record(json.loads(body or b'{}'))
+                payload = b'ok' if status == 200 else b'error'
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/webhook'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class SmtpStub(_Receiver):
+    """Minimal plain-text SMTP server on 127.0.0.1 (no TLS or auth)"""
+
+    def __init__(self, fail_first=0, host='127.0.0.1', port=0):
+        super().__init__(fail_first)
+        receiver = self
+
+        class Handler(StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b'\r\n')
+
+            def handle(self):
+                receiver._connected()
+                self.reply('220 smtp-stub ready')
+                envelope = {'from': None, 'to': []}
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode(errors='replace').strip()
+                    verb = command[:4].upper()
+                    if verb in ('EHLO', 'HELO'):
+                        self.reply('250 smtp-stub')
+                    elif verb == 'MAIL':
+                        envelope = {'from': command[10:].strip('<>'), 'to': []}
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        envelope['to'].append(command[8:].strip('<>'))
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        data = []
+                        while True:
+                            data_line = self.rfile.readline()
+                            if not data_line or data_line in (b'.\r\n', b'.\n'):
+                                break
+                            data.append(data_line.decode(errors='replace'))
+                        if receiver._should_fail():
+                            self.reply('451 Temporary failure')
+                        else:
+                            receiver._record(dict(envelope, data=''.join(data)))
+                            self.reply('250 OK queued')
+                    elif verb in ('RSET', 'NOOP'):
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+        ThreadingTCPServer.allow_reuse_address = True
+        self.server = ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
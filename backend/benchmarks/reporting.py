@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Result helpers shared by the Cloud Health Dashboard benchmarks
+Percentiles, git revision stamping and JSON result files that can be compared across commits
+"""
+
+import json
+import math
+import os
+import platform
+import subprocess
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+def latency_summary(values):
+    """Summarize a list of durations in seconds as milliseconds"""
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(max(values) * 1000, 3) if values else 0.0
+    }
+
+def git_revision():
+    """Current git commit hash, or 'unknown' outside a checkout"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def write_results(name, config, results, output=None):
+    """Write a benchmark run to JSON and return the file path"""
+    revision = git_revision()
+    document = {
+        'benchmark': name,
+        'commit': revision,
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results
+    }
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        output = os.path.join(RESULTS_DIR, f'{name}-{revision}-{stamp}.json')
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    return output
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+def compare_results(baseline, current, prefix=''):
+    """Yield (key, baseline, current, percent change) for every numeric result"""
+    for key, value in current.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            yield from compare_results(baseline.get(key, {}), value, prefix=f'{name}.')
+        elif isinstance(value, (int, float)) and isinstance(baseline.get(key), (int, float)):
+            before = baseline[key]
+            change = ((value - before) / before * 100) if before else 0.0
+            yield name, before, value, change
+
+def print_comparison(baseline_doc, current_doc):
+    print(f"Comparing {baseline_doc.get('commit')} -> {current_doc.get('commit')}")
+    for name, before, after, change in compare_results(baseline_doc['results'], current_doc['results']):
+        print(f'  {name:45s} {before:>14.3f} {after:>14.3f} {change:>+8.1f}%')
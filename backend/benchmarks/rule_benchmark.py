@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Alert rule evaluation benchmark for Cloud Health Dashboard
+Compiles threshold rules for N synthetic services and times full evaluation cycles
+
+Usage (from backend/):
+    python -m benchmarks.rule_benchmark --services 10000 --cycles 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.reporting import latency_summary, write_results
+
+# A mix of rule types: last value, sliding-window averages and rates, and sketch percentiles
+RULE_TEMPLATES = {
+    'response_time': 2.0,
+    'cost': 0.01,
+    'error_rate': 20.0,
+    'p50_response_time': 1.0,
+    'p90_response_time': 1.5,
+    'p95_response_time': 2.0,
+    'p99_response_time': {'threshold': 3.0, 'window': '24h'}
+}
+AVG_WINDOWS = ('5m', '1h', '24h')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark alert rule evaluation')
+    parser.add_argument('--services', type=int, default=10000, help='number of synthetic services')
+    parser.add_argument('--cycles', type=int, default=5, help='evaluation cycles to time')
+    parser.add_argument('--breach-rate', type=float, default=0.01, help='fraction of services breaching')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--output', help='result JSON path (default: benchmarks/results/)')
+    return parser.parse_args(argv)
+
+class FakeService:
+    """Just the attributes the rule engine reads"""
+
+    def __init__(self, service_id, alert_thresholds):
+        self.id = service_id
+        self.name = f'bench-service-{service_id}'
+        self.alert_thresholds = alert_thresholds
+
+def build_services(count):
+    services = []
+    for service_id in range(1, count + 1):
+        thresholds = dict(RULE_TEMPLATES)
+        window = AVG_WINDOWS[service_id % len(AVG_WINDOWS)]
+        thresholds['response_time'] = {'threshold': 2.0, 'aggregation': 'avg', 'window': window}
+        services.append(FakeService(service_id, thresholds))
+    return services
+
+def run_benchmark(args):
+    from alert_rules import Observation, get_rule_engine
+    from app import create_app
+    from extensions import db
+    from latency_sketch import LatencySketch
+    from models import CostRollup
+    from sliding_window import get_window_registry
+
+    rng = random.Random(args.seed)
+    flask_app = create_app('testing', DATABASE_URL='sqlite:///:memory:')
+    services = build_services(args.services)
+
+    with flask_app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        hour = now.replace(minute=0, second=0, microsecond=0)
+
+        # One hourly sketch per service so percentile rules have data
+        rollups = []
+        for service in services:
+            sketch = LatencySketch()
+            for _ in range(20):
+                sketch.add(rng.lognormvariate(-1.5, 0.5))
+            rollups.append({'service_id': service.id, 'period': 'hour', 'bucket_start': hour,
+                            'total_cost': 0.0, 'request_count': 20, 'error_count': 0,
+                            'latency_sketch': sketch.to_dict()})
+        db.session.execute(CostRollup.__table__.insert(), rollups)
+        db.session.commit()
+
+        registry = get_window_registry(flask_app)
+        clock = time.time()
+        for service in services:
+            windows = registry.get(service.id)
+            for step in range(10):
+                windows.record(clock - step * 20, rng.lognormvariate(-1.5, 0.5), error=rng.random() < 0.05)
+
+        engine = get_rule_engine(flask_app)
+        started = time.perf_counter()
+        engine.sync(services)
+        compile_seconds = time.perf_counter() - started
+        rules = sum(len(group.rules) for group in engine._groups)
+
+        cycle_times = []
+        observed = 0
+        for _ in range(args.cycles):
+            observations = {}
+            for service in services:
+                breaching = rng.random() < args.breach_rate
+                observations[service.id] = Observation(
+                    rng.uniform(2.5, 4.0) if breaching else rng.lognormvariate(-1.5, 0.5),
+                    0.0001, 200, False
+                )
+            started = time.perf_counter()
+            observed += engine.evaluate(services, observations, datetime.utcnow())
+            db.session.commit()
+            cycle_times.append(time.perf_counter() - started)
+
+    results = {
+        'rules': rules,
+        'rule_groups': len(engine._groups),
+        'compile_ms': round(compile_seconds * 1000, 2),
+        'cycle': latency_summary(cycle_times),
+        'rules_per_sec': round(rules * len(cycle_times) / sum(cycle_times), 0),
+        'rules_reaching_state_machine': observed
+    }
+    config = {'services': args.services, 'cycles': args.cycles, 'breach_rate': args.breach_rate}
+    return config, results
+
+def main(argv=None):
+    args = parse_args(argv)
+    config, results = run_benchmark(args)
+    output = write_results('rules', config, results, args.output)
+    print(f"Evaluated {results['rules']:,} rules in {results['rule_groups']} groups for {config['services']:,} services")
+    print(f"  compile:          {results['compile_ms']} ms (once, and on threshold changes)")
+    print(f"  cycle p50/max:    {results['cycle']['p50_ms']} / {results['cycle']['max_ms']} ms")
+    print(f"  rules/sec:        {results['rules_per_sec']:,.0f}")
+    print(f"Results written to {output}")
+
+if __name__ == '__main__':
+    main()
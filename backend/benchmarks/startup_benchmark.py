@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for Cloud Health Dashboard
+Measures, in fresh interpreters, how long importing the app module, building the app and
+serving the first request take, and how many modules each step loads
+
+Usage (from backend/):
+    python -m benchmarks.startup_benchmark --runs 10
+    python -m benchmarks.startup_benchmark --backend-dir /path/to/other/checkout/backend
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.reporting import write_results
+
+# Runs in a child interpreter; works with both the factory and the older module-level app
+PROBE = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import app as appmod
+t1 = time.perf_counter()
+modules_after_import = len(sys.modules)
+flask_app = appmod.create_app() if hasattr(appmod, 'create_app') else appmod.app
+t2 = time.perf_counter()
+response = flask_app.test_client().get('/api/health')
+t3 = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'first_request_ms': (t3 - t2) * 1000,
+    'total_ms': (t3 - t0) * 1000,
+    'modules_after_import': modules_after_import,
+    'modules_total': len(sys.modules),
+    'status': response.status_code
+}))
+'''
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Measure app cold-start time')
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to start')
+    parser.add_argument('--backend-dir', default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help='backend directory to measure (default: this checkout)')
+    parser.add_argument('--output', help='result JSON path (default: benchmarks/results/)')
+    return parser.parse_args(argv)
+
+def measure_once(backend_dir, workdir):
+    env = dict(os.environ, FLASK_ENV='testing', PYTHONPATH=backend_dir,
+               DATABASE_URL=f'sqlite:///{workdir}/startup.db')
+    output = subprocess.check_output([sys.executable, '-c', PROBE], cwd=workdir, env=env,
+                                     stderr=subprocess.DEVNULL)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+def main(argv=None):
+    args = parse_args(argv)
+    samples = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(args.runs):
+            samples.append(measure_once(os.path.abspath(args.backend_dir), workdir))
+
+    results = {}
+    for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'total_ms'):
+        values = [s[key] for s in samples]
+        results[key] = {'median': round(statistics.median(values), 2), 'min': round(min(values), 2)}
+    results['modules_after_import'] = samples[-1]['modules_after_import']
+    results['modules_total'] = samples[-1]['modules_total']
+
+    output = write_results('startup', {'runs': args.runs, 'backend_dir': args.backend_dir}, results, args.output)
+    print(f"Cold start over {args.runs} runs (median / min, ms):")
+    for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'total_ms'):
+        print(f"  {key:18s} {results[key]['median']:>9.2f} / {results[key]['min']:.2f}")
+    print(f"  modules loaded by import: {results['modules_after_import']}, total: {results['modules_total']}")
+    print(f"Results written to {output}")
+
+if __name__ == '__main__':
+    main()
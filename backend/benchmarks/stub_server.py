@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Local stub HTTP servers for Cloud Health Dashboard benchmarks
+Serves health-check responses with configurable latency, errors, payload size and hangs
+"""
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubBehavior:
+    """Response behavior shared by all requests to one stub server"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, payload_size=64,
+                 hang_rate=0.0, hang_seconds=30.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.payload_size = payload_size
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.payload = b'x' * payload_size
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """Pick (delay, status_code) for the next request"""
+        with self._lock:
+            if self._random.random() < self.hang_rate:
+                return self.hang_seconds, 200
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            status = 500 if self._random.random() < self.error_rate else 200
+            return delay, status
+
+    def to_dict(self):
+        return {
+            'latency': self.latency,
+            'jitter': self.jitter,
+            'error_rate': self.error_rate,
+            'payload_size': self.payload_size,
+            'hang_rate': self.hang_rate,
+            'hang_seconds': self.hang_seconds
+        }
+
+def _make_handler(behavior):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            delay, status = behavior.sample()
+            if delay:
+                time.sleep(delay)
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/octet-stream')
+                self.send_header('Content-Length', str(len(behavior.payload)))
+                self.end_headers()
+                self.wfile.write(behavior.payload)
+            except (BrokenPipeError, ConnectionResetError):
+                # The prober gave up (timeout) before we answered
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+class StubServer:
+    """Threaded HTTP server on 127.0.0.1 running in a background thread"""
+
+    def __init__(self, behavior, host='127.0.0.1', port=0):
+        self.behavior = behavior
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(behavior))
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/health'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def start_stub_servers(count, behavior_factory):
+    """Start count stub servers, building each one's behavior from its index"""
+    return [StubServer(behavior_factory(i)).start() for i in range(count)]
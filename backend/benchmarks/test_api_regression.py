@@ -0,0 +1,35 @@
+"""
+Latency regression gate for the API load test
+Skipped unless API_LOADTEST=1 and a baseline exists (create one with --save-baseline)
+"""
+
+import os
+
+import pytest
+
+from benchmarks.api_loadtest import (BASELINE_PATH, DEFAULT_TOLERANCE, SCENARIOS, find_regressions,
+                                     parse_args, run_loadtest)
+from benchmarks.reporting import load_results
+
+pytestmark = pytest.mark.skipif(
+    os.getenv('API_LOADTEST') != '1' or not os.path.exists(BASELINE_PATH),
+    reason='set API_LOADTEST=1 and save a baseline with: python -m benchmarks.api_loadtest --save-baseline'
+)
+
+@pytest.fixture(scope='module')
+def loadtest_results():
+    args = parse_args(os.getenv('API_LOADTEST_ARGS', '').split())
+    _, results = run_loadtest(args)
+    return results
+
+@pytest.mark.parametrize('endpoint', list(SCENARIOS))
+def test_endpoint_latency_within_baseline(loadtest_results, endpoint):
+    baseline = load_results(BASELINE_PATH)['results']
+    if endpoint not in baseline or endpoint not in loadtest_results:
+        pytest.skip(f'{endpoint} not in baseline')
+    tolerance = float(os.getenv('API_LOADTEST_TOLERANCE', DEFAULT_TOLERANCE))
+    regressions = find_regressions(
+        {endpoint: baseline[endpoint]}, {endpoint: loadtest_results[endpoint]}, tolerance=tolerance
+    )
+    assert not regressions, regressions[0]
+    assert set(loadtest_results[endpoint]['statuses']) <= {'200'}, loadtest_results[endpoint]['statuses']
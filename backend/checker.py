@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Background health checker for Cloud Health Dashboard Phase 2
+Probes every registered service on a schedule and records metrics, incidents and alerts
+"""
+
+from datetime import datetime
+import logging
+import random
+import threading
+import time
+from flask import current_app
+from extensions import db
+from models import Service, Metric
+from monitoring import (SERVICE_HEALTH, ERROR_RATE, COST_METRICS, PROBES_SKIPPED, PROBE_PHASE_SECONDS,
+                        METRIC_ROWS, start_metrics_server)
+from cost_rollups import record_cost_rollup
+from cost_analyzer import prune_cost_cache
+from uptime_bitmaps import record_uptime
+from alert_engine import get_alert_engine
+from alert_rules import Observation, get_rule_engine
+from sliding_window import get_window_registry
+from outage_tracker import classify_failure, record_failure, resolve_outages
+from notifications import start_notification_dispatcher
+from circuit_breaker import probe_timeout, record_probe_result
+from maintenance_index import get_maintenance_index, maintenance_probe_due
+from probe_client import get_probe_client
+from probes import PHASES
+
+logger = logging.getLogger(__name__)
+
+# Enhanced health check function with cost calculation
+def check_service_health(service, evaluate_alerts=True, timeout=None, retries=None, hedge=True,
+                         maintenance=False):
+    """Check the health of a specific service with enhanced metrics
+
+    Returns the probe's Observation. run_health_checks passes evaluate_alerts=False and
+    evaluates every service's alert rules in one pass at the end of the cycle. timeout,
+    retries and hedge override the probe client's per-service defaults. A probe taken during
+    a maintenance window is recorded as a metric but opens no incident, raises no alert, does
+    not move the circuit breaker and leaves the minute out of the uptime bitmaps.
+    """
+    previous_status = service.status
+    start_time = time.time()
+    # Only the probe itself decides whether the service is down; a database error in the
+    # bookkeeping below propagates to the caller instead of opening an incident
+    try:
+        probe = get_probe_client(current_app).fetch(service, timeout=timeout, retries=retries, hedge=hedge)
+        probe_error = None
+    except Exception as e:
+        probe_error = e
+    
+    if probe_error is None:
+        response_time = probe.elapsed
+        status_code = probe.status_code
+        
+        # Calculate costs
+        request_size = probe.request_size
+        response_size = probe.response_size
+        cost = service.cost_per_request + (response_size / (1024**3)) * service.cost_per_gb_hour
+        
+        # Update service status
+        if status_code == 200:
+            service.status = 'healthy'
+            probe_uptime = 100.0
+        else:
+            service.status = 'degraded'
+            probe_uptime = 50.0
+            
+        service.response_time = response_time
+        service.last_check = datetime.utcnow()
+        service.total_checks += 1
+        
+        # Record enhanced metric
+        metric = Metric(
+            service_id=service.id,
+            timestamp=service.last_check,
+            response_time=response_time,
+            status_code=status_code,
+            error=False,
+            uptime=probe_uptime,
+            cost=cost,
+            request_size=request_size,
+            response_size=response_size,
+            hedged=probe.hedged,
+            phase_timings=probe.phases
+        )
+        persist_metric(metric, service, previous_status)
+        record_cost_rollup(service.id, metric.timestamp, cost, response_time=response_time)
+        
+        # Service.uptime is the share of today's minutes in which the service was healthy
+        if not maintenance:
+            service.uptime = record_uptime(service.id, service.last_check, service.status == 'healthy')
+        record_probe_phases(service, probe.phases)
+        
+        # Update Prometheus metrics
+        SERVICE_HEALTH.labels(service_name=service.name).set(1 if service.status == 'healthy' else 0)
+        COST_METRICS.labels(service_name=service.name).set(cost)
+        
+        # The service answered: close any outage it was in
+        if previous_status == 'down':
+            resolve_outages(service, service.last_check)
+        
+        record_window_stats(service, response_time)
+        observation = Observation(response_time, cost, status_code, False)
+        
+    else:
+        response_time = time.time() - start_time
+        service.status = 'down'
+        service.response_time = response_time
+        service.last_check = datetime.utcnow()
+        service.error_count += 1
+        service.total_checks += 1
+        
+        # Record error metric
+        metric = Metric(
+            service_id=service.id,
+            timestamp=service.last_check,
+            response_time=response_time,
+            status_code=0,
+            error=True,
+            uptime=0.0,
+            cost=0.0
+        )
+        persist_metric(metric, service, previous_status)
+        record_cost_rollup(service.id, metric.timestamp, 0.0, error=True)
+        
+        # Update Prometheus metrics
+        SERVICE_HEALTH.labels(service_name=service.name).set(0)
+        ERROR_RATE.labels(service_name=service.name).inc()
+        observation = Observation(None, None, 0, True)
+        
+        # Planned downtime is expected: no incident, and no errors left behind for the error-rate alerts
+        if not maintenance:
+            service.uptime = record_uptime(service.id, service.last_check, False)
+            
+            # Open or extend the incident for this outage
+            record_failure(service, classify_failure(probe_error), probe_error, service.last_check,
+                           sla_hours=current_app.config['DEFAULT_SLA_HOURS'])
+            
+            # Failed probes count towards the error rate but have no latency or cost to judge
+            record_window_stats(service, response_time, error=True)
+    
+    if not maintenance:
+        record_probe_result(service, observation.error, service.last_check, current_app.config)
+        if evaluate_alerts:
+            check_alert_thresholds(service, observation)
+    db.session.commit()
+    return observation
+
+def persist_metric(metric, service, previous_status):
+    """Add the probe's Metric row unless change-only persistence lets it go
+
+    With METRIC_PERSISTENCE=changes, status transitions are always stored and steady-state
+    probes only at METRIC_SAMPLE_RATIO; rollups and sketches still see every probe.
+    """
+    config = current_app.config
+    if config['METRIC_PERSISTENCE'] != 'changes':
+        reason = 'all'
+    elif service.status != previous_status:
+        reason = 'transition'
+    elif random.random() < config['METRIC_SAMPLE_RATIO']:
+        reason = 'sample'
+    else:
+        METRIC_ROWS.labels(outcome='skipped').inc()
+        return False
+    db.session.add(metric)
+    METRIC_ROWS.labels(outcome=reason).inc()
+    return True
+
+def record_probe_phases(service, phases):
+    """Feed a probe's phase timings into the Prometheus histograms"""
+    for name, value in zip(PHASES, phases or ()):
+        if value is not None:
+            PROBE_PHASE_SECONDS.labels(phase=name, service_type=service.service_type or 'api').observe(value / 1_000_000)
+
+def record_window_stats(service, response_time, error=False):
+    """Add the probe to the service's sliding windows and publish their totals on the service row"""
+    windows = get_window_registry(current_app).get(service.id)
+    now = time.time()
+    windows.record(now, response_time, error)
+    service.window_stats = {'as_of': service.last_check.isoformat(), 'windows': windows.snapshot(now)}
+    return windows
+
+def check_alert_thresholds(service, observation):
+    """Evaluate one service's compiled alert rules against its latest probe"""
+    if service.alert_thresholds:
+        get_rule_engine(current_app).evaluate_service(service, observation, service.last_check)
+
+def evaluate_alert_rules(app, services, observations, suppressed=()):
+    """Evaluate the alert rules of every service in one vectorized pass and commit the transitions"""
+    started = time.perf_counter()
+    observed = get_rule_engine(app).evaluate(services, observations, datetime.utcnow(), suppressed=suppressed)
+    db.session.commit()
+    logger.debug(f"Evaluated alert rules for {len(services)} services in "
+                 f"{(time.perf_counter() - started) * 1000:.1f}ms ({observed} reached the alert engine)")
+
+# Background health checker
+def run_health_checks(app):
+    """Run health checks for all services"""
+    with app.app_context():
+        services = Service.query.all()
+        observations = {}
+        in_maintenance = set()
+        now = datetime.utcnow()
+        probe_client = get_probe_client(app)
+        maintenance = get_maintenance_index(app)
+        for service in services:
+            # Services in a maintenance window are probed every MAINTENANCE_PROBE_INTERVAL at most
+            if maintenance.in_maintenance(service.id, now):
+                in_maintenance.add(service.id)
+                if not maintenance_probe_due(service, now, app.config['MAINTENANCE_PROBE_INTERVAL']):
+                    PROBES_SKIPPED.labels(service_name=service.name, reason='maintenance').inc()
+                    continue
+                try:
+                    check_service_health(service, evaluate_alerts=False, retries=0, hedge=False, maintenance=True)
+                except Exception as e:
+                    logger.error(f"Error checking service {service.name}: {e}")
+                    db.session.rollback()
+                continue
+            
+            # Services behind an open circuit breaker are only probed when a half-open probe is due
+            connect_timeout, read_timeout = probe_client.timeouts(service)
+            timeout = probe_timeout(service, now, app.config, default_timeout=read_timeout)
+            if timeout is None:
+                PROBES_SKIPPED.labels(service_name=service.name, reason='circuit_open').inc()
+                continue
+            probe_options = {}
+            if service.breaker_state == 'half_open':
+                # One short, unhedged attempt: the breaker decides what happens next
+                probe_options = {'timeout': (min(connect_timeout, timeout), timeout), 'retries': 0, 'hedge': False}
+            try:
+                observations[service.id] = check_service_health(service, evaluate_alerts=False, **probe_options)
+            except Exception as e:
+                logger.error(f"Error checking service {service.name}: {e}")
+                db.session.rollback()
+        
+        try:
+            evaluate_alert_rules(app, services, observations, suppressed=in_maintenance)
+        except Exception as e:
+            logger.error(f"Error evaluating alert rules: {e}")
+            # Discard the partial transitions and the alert counters that went with them
+            db.session.rollback()
+            get_alert_engine(app).forget()
+
+def run_housekeeping(app):
+    """Prune rows that have outlived their use, off the request path"""
+    with app.app_context():
+        try:
+            pruned = prune_cost_cache()
+            db.session.commit()
+            logger.debug(f"Pruned {pruned} stale cost cache entries")
+        except Exception as e:
+            logger.error(f"Error pruning the cost cache: {e}")
+            db.session.rollback()
+
+def schedule_health_checks(app):
+    """Schedule health checks every HEALTH_CHECK_INTERVAL seconds and housekeeping every HOUSEKEEPING_INTERVAL"""
+    import schedule
+    
+    scheduler = schedule.Scheduler()
+    scheduler.every(app.config['HEALTH_CHECK_INTERVAL']).seconds.do(run_health_checks, app)
+    scheduler.every(app.config['HOUSEKEEPING_INTERVAL']).seconds.do(run_housekeeping, app)
+    while True:
+        scheduler.run_pending()
+        time.sleep(1)
+
+def start_health_checker(app):
+    """Start the health check scheduler and the notification dispatcher in background threads"""
+    start_notification_dispatcher(app)
+    thread = threading.Thread(target=schedule_health_checks, args=(app,), daemon=True, name='health-checker')
+    thread.start()
+    logger.info("Health checker started")
+    return thread
+
+if __name__ == '__main__':
+    from app import create_app
+    
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    if app.config['PROMETHEUS_ENABLED']:
+        start_metrics_server(app.config['METRICS_PORT'])
+    start_notification_dispatcher(app)
+    schedule_health_checks(app)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Per-service circuit breaker for Cloud Health Dashboard Phase 2
+After BREAKER_FAILURE_THRESHOLD consecutive failed probes a service's breaker opens: regular
+probes stop and a single short-timeout half-open probe is sent every BREAKER_OPEN_INTERVAL
+seconds (doubling up to BREAKER_MAX_INTERVAL while the service stays down). A successful
+probe closes it again. State lives on the Service row so the API can show it.
+"""
+
+from datetime import timedelta
+from monitoring import CIRCUIT_BREAKER_STATE, CIRCUIT_BREAKER_TRANSITIONS
+
+BREAKER_STATES = {'closed': 0, 'half_open': 1, 'open': 2}  # Prometheus gauge values
+
+def _transition(service, state):
+    service.breaker_state = state
+    CIRCUIT_BREAKER_STATE.labels(service_name=service.name).set(BREAKER_STATES[state])
+    CIRCUIT_BREAKER_TRANSITIONS.labels(service_name=service.name, state=state).inc()
+
+def probe_timeout(service, now, config, default_timeout):
+    """Timeout for this cycle's probe of the service, or None to skip it while the breaker is open"""
+    state = service.breaker_state or 'closed'
+    if state == 'closed':
+        return default_timeout
+    if state == 'open' and service.breaker_next_probe_at and now < service.breaker_next_probe_at:
+        return None
+    if state == 'open':
+        _transition(service, 'half_open')
+    return min(default_timeout, config['BREAKER_PROBE_TIMEOUT'])
+
+def record_probe_result(service, failed, now, config):
+    """Advance the breaker after a probe; the caller commits with the probe's other writes"""
+    state = service.breaker_state or 'closed'
+    if not failed:
+        service.breaker_failures = 0
+        service.breaker_interval = None
+        service.breaker_next_probe_at = None
+        if state != 'closed':
+            _transition(service, 'closed')
+        return
+
+    service.breaker_failures = (service.breaker_failures or 0) + 1
+    if state == 'half_open':
+        # Still down: back off further before the next half-open probe
+        interval = min((service.breaker_interval or config['BREAKER_OPEN_INTERVAL']) * 2,
+                       config['BREAKER_MAX_INTERVAL'])
+    elif service.breaker_failures >= config['BREAKER_FAILURE_THRESHOLD']:
+        interval = config['BREAKER_OPEN_INTERVAL']
+    else:
+        return
+    service.breaker_interval = interval
+    service.breaker_next_probe_at = now + timedelta(seconds=interval)
+    _transition(service, 'open')
+
+def breaker_status(service):
+    """Breaker fields for the services API"""
+    return {
+        'state': service.breaker_state or 'closed',
+        'consecutive_failures': service.breaker_failures or 0,
+        'next_probe_at': service.breaker_next_probe_at.isoformat() if service.breaker_next_probe_at else None
+    }
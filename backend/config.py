@@ -20,9 +20,37 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Monitoring Configuration
+    HEALTH_CHECKER_ENABLED = os.getenv('HEALTH_CHECKER_ENABLED', 'True').lower() == 'true'
     HEALTH_CHECK_INTERVAL = int(os.getenv('HEALTH_CHECK_INTERVAL', '30'))  # seconds
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '10'))  # seconds
     MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
+    PROBE_CONNECT_TIMEOUT = float(os.getenv('PROBE_CONNECT_TIMEOUT', '3'))  # seconds; read uses REQUEST_TIMEOUT
+    PROBE_RETRY_BACKOFF = float(os.getenv('PROBE_RETRY_BACKOFF', '0.2'))  # seconds, doubled per retry
+    PROBE_HEDGE_ENABLED = os.getenv('PROBE_HEDGE_ENABLED', 'False').lower() == 'true'
+    PROBE_HEDGE_QUANTILE = float(os.getenv('PROBE_HEDGE_QUANTILE', '0.95'))  # hedge after this latency quantile
+    PROBE_HEDGE_MIN_DELAY = float(os.getenv('PROBE_HEDGE_MIN_DELAY', '0.05'))  # seconds
+    PROBE_HEDGE_MIN_SAMPLES = int(os.getenv('PROBE_HEDGE_MIN_SAMPLES', '20'))  # probes before hedging starts
+    PROBE_HEDGE_WINDOW = int(os.getenv('PROBE_HEDGE_WINDOW', '3600'))  # seconds of latency history per sketch
+    PROBE_HEDGE_WORKERS = int(os.getenv('PROBE_HEDGE_WORKERS', '8'))
+    DNS_CACHE_ENABLED = os.getenv('DNS_CACHE_ENABLED', 'True').lower() == 'true'
+    DNS_CACHE_MAX_ENTRIES = int(os.getenv('DNS_CACHE_MAX_ENTRIES', '4096'))
+    DNS_CACHE_MIN_TTL = int(os.getenv('DNS_CACHE_MIN_TTL', '5'))  # seconds; record TTLs are clamped
+    DNS_CACHE_MAX_TTL = int(os.getenv('DNS_CACHE_MAX_TTL', '3600'))  # to this range
+    DNS_CACHE_DEFAULT_TTL = int(os.getenv('DNS_CACHE_DEFAULT_TTL', '60'))  # when no TTL is known
+    DNS_CACHE_NEGATIVE_TTL = int(os.getenv('DNS_CACHE_NEGATIVE_TTL', '30'))  # cap for failed lookups
+    DNS_CACHE_REFRESH_AHEAD = float(os.getenv('DNS_CACHE_REFRESH_AHEAD', '0.1'))  # fraction of TTL left
+    DNS_CACHE_QUERY_TIMEOUT = float(os.getenv('DNS_CACHE_QUERY_TIMEOUT', '2'))  # seconds
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))  # failures before opening
+    BREAKER_OPEN_INTERVAL = int(os.getenv('BREAKER_OPEN_INTERVAL', '60'))  # seconds to first half-open probe
+    BREAKER_MAX_INTERVAL = int(os.getenv('BREAKER_MAX_INTERVAL', '900'))  # backoff cap while still down
+    BREAKER_PROBE_TIMEOUT = float(os.getenv('BREAKER_PROBE_TIMEOUT', '2'))  # half-open probe timeout
+    METRIC_PERSISTENCE = os.getenv('METRIC_PERSISTENCE', 'all')  # all, or changes (transitions + samples)
+    METRIC_SAMPLE_RATIO = float(os.getenv('METRIC_SAMPLE_RATIO', '0.05'))  # steady-state probes kept raw
+    MAINTENANCE_PROBE_INTERVAL = int(os.getenv('MAINTENANCE_PROBE_INTERVAL', '300'))  # seconds; 0 = no probes
+    MAINTENANCE_INDEX_REFRESH = int(os.getenv('MAINTENANCE_INDEX_REFRESH', '60'))  # seconds between reloads
+    HOUSEKEEPING_INTERVAL = int(os.getenv('HOUSEKEEPING_INTERVAL', '3600'))  # seconds between pruning passes
+    STATS_WINDOWS = os.getenv('STATS_WINDOWS', '5m,1h,24h')  # sliding windows kept per service
+    STATS_WINDOW_BUCKETS = int(os.getenv('STATS_WINDOW_BUCKETS', '60'))  # ring slots per window
     
     # Alert Configuration
     SLACK_WEBHOOK_URL = os.getenv('SLACK_WEBHOOK_URL', '')
@@ -31,6 +59,15 @@ class Config:
     EMAIL_USERNAME = os.getenv('EMAIL_USERNAME', '')
     EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD', '')
     EMAIL_FROM = os.getenv('EMAIL_FROM', 'alerts@cloudhealth.com')
+    EMAIL_TO = [a for a in os.getenv('EMAIL_TO', '').split(',') if a]  # alert recipients
+    EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() == 'true'
+    ALERT_FIRE_AFTER = int(os.getenv('ALERT_FIRE_AFTER', '3'))  # consecutive breaching checks
+    ALERT_RESOLVE_AFTER = int(os.getenv('ALERT_RESOLVE_AFTER', '3'))  # consecutive healthy checks
+    ALERT_ESCALATE_AFTER = int(os.getenv('ALERT_ESCALATE_AFTER', '20'))  # further breaches per escalation
+    ALERT_MAX_ESCALATION = int(os.getenv('ALERT_MAX_ESCALATION', '3'))
+    ALERT_ERROR_RATE_WINDOW = os.getenv('ALERT_ERROR_RATE_WINDOW', '5m')  # one of STATS_WINDOWS
+    ALERT_PERCENTILE_WINDOW = os.getenv('ALERT_PERCENTILE_WINDOW', '1h')  # for pNN_response_time thresholds
+    ALERT_PERCENTILE_REFRESH = int(os.getenv('ALERT_PERCENTILE_REFRESH', '60'))  # seconds between sketch merges
     
     # Prometheus Metrics Configuration
     PROMETHEUS_ENABLED = os.getenv('PROMETHEUS_ENABLED', 'True').lower() == 'true'
@@ -49,6 +86,7 @@ class Config:
     COST_ALERT_THRESHOLD = float(os.getenv('COST_ALERT_THRESHOLD', '0.001'))
     COST_OPTIMIZATION_ENABLED = os.getenv('COST_OPTIMIZATION_ENABLED', 'True').lower() == 'true'
     COST_FORECAST_DAYS = int(os.getenv('COST_FORECAST_DAYS', '30'))
+    COST_CACHE_MAX_ENTRIES = int(os.getenv('COST_CACHE_MAX_ENTRIES', '1024'))
     
     # SLA Configuration
     DEFAULT_SLA_HOURS = int(os.getenv('DEFAULT_SLA_HOURS', '4'))
@@ -60,12 +98,22 @@ class Config:
     PASSWORD_MIN_LENGTH = int(os.getenv('PASSWORD_MIN_LENGTH', '8'))
     MAX_LOGIN_ATTEMPTS = int(os.getenv('MAX_LOGIN_ATTEMPTS', '5'))
     LOGIN_LOCKOUT_DURATION = int(os.getenv('LOGIN_LOCKOUT_DURATION', '300'))  # 5 minutes
+    MAX_LOGIN_ATTEMPTS_PER_IP = int(os.getenv('MAX_LOGIN_ATTEMPTS_PER_IP', '20'))  # failures across usernames
+    LOGIN_HASH_WORKERS = int(os.getenv('LOGIN_HASH_WORKERS', '2'))  # bcrypt threads per worker process
+    LOGIN_HASH_QUEUE_DEPTH = int(os.getenv('LOGIN_HASH_QUEUE_DEPTH', '16'))  # pending checks before 503
+    LOGIN_HASH_TIMEOUT = float(os.getenv('LOGIN_HASH_TIMEOUT', '10'))  # seconds to wait for a check
+    TOKEN_REVOCATION_REFRESH = int(os.getenv('TOKEN_REVOCATION_REFRESH', '5'))  # seconds; other workers' logouts
+    TOKEN_REVOCATION_REBUILD = int(os.getenv('TOKEN_REVOCATION_REBUILD', '3600'))  # full reload drops expired IDs
+    TOKEN_REVOCATION_CAPACITY = int(os.getenv('TOKEN_REVOCATION_CAPACITY', '100000'))  # Bloom filter sizing
+    TOKEN_REVOCATION_ERROR_RATE = float(os.getenv('TOKEN_REVOCATION_ERROR_RATE', '0.001'))
     
     # Logging Configuration
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'health_dashboard.log')
     LOG_MAX_SIZE = int(os.getenv('LOG_MAX_SIZE', '10485760'))  # 10MB
     LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # text, json
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
     
     # CORS Configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
@@ -87,7 +135,7 @@ class Config:
     BACKUP_RETENTION_DAYS = int(os.getenv('BACKUP_RETENTION_DAYS', '30'))
     
     # Performance Configuration
-    MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', '100'))
+    MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', '12'))  # per worker, below GUNICORN_THREADS
     REQUEST_TIMEOUT_LIMIT = int(os.getenv('REQUEST_TIMEOUT_LIMIT', '30'))
     CACHE_TTL = int(os.getenv('CACHE_TTL', '300'))  # 5 minutes
     
@@ -95,11 +143,14 @@ class Config:
     NOTIFICATION_CHANNELS = os.getenv('NOTIFICATION_CHANNELS', 'email,slack').split(',')
     NOTIFICATION_RETRY_ATTEMPTS = int(os.getenv('NOTIFICATION_RETRY_ATTEMPTS', '3'))
     NOTIFICATION_RETRY_DELAY = int(os.getenv('NOTIFICATION_RETRY_DELAY', '60'))  # 1 minute
+    NOTIFICATION_POLL_INTERVAL = float(os.getenv('NOTIFICATION_POLL_INTERVAL', '5'))  # seconds
+    NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', '50'))  # per digest
+    NOTIFICATION_SENDING_LEASE = int(os.getenv('NOTIFICATION_SENDING_LEASE', '300'))  # seconds a claim is held
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
-    DATABASE_URL = os.getenv('DEV_DATABASE_URL', 'sqlite:///health_dashboard_dev.db')
+    DATABASE_URL = os.getenv('DEV_DATABASE_URL', Config.DATABASE_URL)
     LOG_LEVEL = 'DEBUG'
     CORS_ORIGINS = ['http://localhost:3000', 'http://127.0.0.1:3000']
 
@@ -4,14 +4,122 @@ Cost Analysis Service for Cloud Health Dashboard Phase 2
 Provides detailed cost tracking, analysis, and optimization recommendations
 """
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from app import db, Service, Metric
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Service, Metric, CostCacheEntry
+from monitoring import COST_CACHE_REQUESTS, COST_CACHE_SIZE
+from cost_rollups import get_cost_rollups, rollup_bucket_start
 import json
+import threading
+
+class CostSummaryCache:
+    """Size-bounded LRU of closed-day cost aggregates, backed by the cost_cache_entry table
+    
+    Keys include the current UTC date, so every entry expires at the day boundary.
+    Only the partial current day is read fresh on each request.
+    """
+    
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(max_entries=config['COST_CACHE_MAX_ENTRIES'])
+    
+    def get_closed_days(self, service_id, days):
+        """Get {date: {'total_cost', 'count'}} for the closed days of a window"""
+        today = datetime.utcnow().date()
+        key = f'daily_costs:{service_id}:{days}:{today.isoformat()}'
+        
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                COST_CACHE_REQUESTS.labels(result='hit').inc()
+                return self._entries[key]
+        
+        entry = CostCacheEntry.query.filter_by(cache_key=key).first()
+        if entry:
+            payload = entry.payload
+            self.persistent_hits += 1
+            COST_CACHE_REQUESTS.labels(result='persistent_hit').inc()
+        else:
+            payload = self._compute_closed_days(service_id, days, today)
+            self._persist(key, today, payload)
+            self.misses += 1
+            COST_CACHE_REQUESTS.labels(result='miss').inc()
+        
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            COST_CACHE_SIZE.set(len(self._entries))
+        return payload
+    
+    def clear(self):
+        """Drop all in-memory entries"""
+        with self._lock:
+            self._entries.clear()
+            COST_CACHE_SIZE.set(0)
+    
+    def stats(self):
+        """Get cache hit/miss counters"""
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'persistent_hits': self.persistent_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.persistent_hits) / lookups * 100, 1) if lookups else 0.0
+        }
+    
+    def _compute_closed_days(self, service_id, days, today):
+        """Build the closed-day aggregates from the daily rollups"""
+        start_date = datetime.utcnow() - timedelta(days=days)
+        return {
+            r.bucket_start.date().isoformat(): {'total_cost': r.total_cost, 'count': r.request_count}
+            for r in get_cost_rollups(service_id, 'day', start_date)
+            if r.bucket_start.date() < today
+        }
+    
+    def _persist(self, key, today, payload):
+        """Store closed-day aggregates in a session of their own, leaving the request's session untouched"""
+        with Session(db.engine) as session:
+            try:
+                session.add(CostCacheEntry(cache_key=key, as_of_date=today, payload=payload))
+                session.commit()
+            except IntegrityError:
+                # Another worker stored the same key first
+                session.rollback()
+
+def prune_cost_cache(today=None):
+    """Delete persisted entries of previous days; the caller commits"""
+    today = today or datetime.utcnow().date()
+    return CostCacheEntry.query.filter(CostCacheEntry.as_of_date < today).delete()
+
+def get_cost_summary_cache(app):
+    """The app's cost summary cache, shared across CostAnalyzer instances"""
+    cache = app.extensions.get('cost_summary_cache')
+    if cache is None:
+        cache = app.extensions['cost_summary_cache'] = CostSummaryCache.from_config(app.config)
+    return cache
 
 class CostAnalyzer:
     """Service for analyzing service costs and providing optimization insights"""
     
-    def __init__(self):
+    def __init__(self, cache=None):
+        self.cache = cache or get_cost_summary_cache(current_app)
         self.cost_thresholds = {
             'high': 0.001,  # $0.001 per request
             'medium': 0.0005,  # $0.0005 per request
@@ -24,14 +132,10 @@ class CostAnalyzer:
         if not service:
             return None
         
-        # Get metrics from specified time period
-        start_date = datetime.utcnow() - timedelta(days=days)
-        metrics = Metric.query.filter(
-            Metric.service_id == service_id,
-            Metric.timestamp >= start_date
-        ).all()
+        # Closed days come from the cache, the current day is always fresh
+        daily_totals = self._get_daily_totals(service_id, days)
         
-        if not metrics:
+        if not daily_totals:
             return {
                 'service_name': service.name,
                 'period_days': days,
@@ -43,15 +147,12 @@ class CostAnalyzer:
             }
         
         # Calculate costs
-        total_cost = sum(m.cost for m in metrics)
-        total_requests = len(metrics)
+        total_cost = sum(d['total_cost'] for d in daily_totals.values())
+        total_requests = sum(d['count'] for d in daily_totals.values())
         avg_cost_per_request = total_cost / total_requests if total_requests > 0 else 0
         
-        # Calculate daily costs for trend analysis
-        daily_costs = {}
-        for metric in metrics:
-            date = metric.timestamp.date().isoformat()
-            daily_costs[date] = daily_costs.get(date, 0) + metric.cost
+        # Daily costs for trend analysis
+        daily_costs = {date: d['total_cost'] for date, d in daily_totals.items()}
         
         # Determine cost trend
         cost_trend = self._analyze_cost_trend(daily_costs)
@@ -179,24 +280,12 @@ class CostAnalyzer:
         if not service:
             return None
         
-        # Get historical data for trend analysis
-        historical_metrics = Metric.query.filter(
-            Metric.service_id == service_id,
-            Metric.timestamp >= datetime.utcnow() - timedelta(days=90)  # 3 months of data
-        ).order_by(Metric.timestamp.asc()).all()
+        # Get historical daily totals for trend analysis
+        daily_costs = self._get_daily_totals(service_id, 90)  # 3 months of data
         
-        if len(historical_metrics) < 7:  # Need at least a week of data
+        if sum(d['count'] for d in daily_costs.values()) < 7:  # Need at least a week of data
             return None
         
-        # Calculate daily averages
-        daily_costs = {}
-        for metric in historical_metrics:
-            date = metric.timestamp.date().isoformat()
-            if date not in daily_costs:
-                daily_costs[date] = {'total_cost': 0, 'count': 0}
-            daily_costs[date]['total_cost'] += metric.cost
-            daily_costs[date]['count'] += 1
-        
         # Calculate average daily cost
         avg_daily_cost = sum(d['total_cost'] for d in daily_costs.values()) / len(daily_costs)
         
@@ -230,6 +319,17 @@ class CostAnalyzer:
             ]
         }
     
+    def _get_daily_totals(self, service_id, days):
+        """Get {date: {'total_cost', 'count'}} with cached closed days and the live current day"""
+        daily_totals = dict(self.cache.get_closed_days(service_id, days))
+        today = rollup_bucket_start(datetime.utcnow(), 'day')
+        for rollup in get_cost_rollups(service_id, 'day', today):
+            daily_totals[rollup.bucket_start.date().isoformat()] = {
+                'total_cost': rollup.total_cost,
+                'count': rollup.request_count
+            }
+        return daily_totals
+    
     def _analyze_cost_trend(self, daily_costs):
         """Analyze cost trend from daily cost data"""
         if len(daily_costs) < 2:
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Cost rollups for Cloud Health Dashboard Phase 2
+Running per-service cost and request counters and latency sketches per hour and day,
+maintained at probe time
+"""
+
+from datetime import datetime, timedelta
+from extensions import db
+from models import Metric, CostRollup, CostCacheEntry
+from latency_sketch import LatencySketch, merge_sketches
+from upserts import locked_row, upsert_increment
+
+ROLLUP_PERIODS = ('hour', 'day')
+
+def rollup_bucket_start(timestamp, period):
+    """Truncate a timestamp to the start of its hour or day bucket"""
+    if period == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def record_cost_rollup(service_id, timestamp, cost, error=False, response_time=None):
+    """Add one probe's cost (and latency, for answered probes) to the hourly and daily rollups
+
+    The counters are bumped with an upsert, so the checker and a web worker can both start a
+    bucket; the latency sketch is merged under the row lock that upsert holds. The caller commits.
+    """
+    for period in ROLLUP_PERIODS:
+        key = {'service_id': service_id, 'period': period, 'bucket_start': rollup_bucket_start(timestamp, period)}
+        upsert_increment(CostRollup, key, {
+            'total_cost': cost,
+            'request_count': 1,
+            'error_count': 1 if error else 0
+        })
+        if not error and response_time is not None:
+            rollup = locked_row(CostRollup, **key)
+            sketch = LatencySketch.from_dict(rollup.latency_sketch)
+            sketch.add(response_time)
+            rollup.latency_sketch = sketch.to_dict()
+
+def get_cost_rollups(service_id, period, since):
+    """Get rollup buckets for a service (or all services if None) starting at or after since"""
+    query = CostRollup.query.filter(
+        CostRollup.period == period,
+        CostRollup.bucket_start >= rollup_bucket_start(since, period)
+    )
+    if service_id is not None:
+        query = query.filter(CostRollup.service_id == service_id)
+    return query.order_by(CostRollup.bucket_start.asc()).all()
+
+def get_total_cost(since, now=None, raw_tail=True):
+    """Cost of every service's probes in since..now
+
+    Hour buckets that start inside the window come from the rollups. The part of the window
+    before the first of them comes from raw metrics, or, when raw metrics are sampled
+    (raw_tail=False), from that hour's bucket prorated by the share of it inside the window.
+    """
+    now = now or datetime.utcnow()
+    first_full_hour = rollup_bucket_start(since, 'hour')
+    if first_full_hour < since:
+        first_full_hour += timedelta(hours=1)
+    total = db.session.query(db.func.sum(CostRollup.total_cost)).filter(
+        CostRollup.period == 'hour',
+        CostRollup.bucket_start >= first_full_hour,
+        CostRollup.bucket_start <= now
+    ).scalar() or 0.0
+    if first_full_hour == since:
+        return total
+    if raw_tail:
+        tail = db.session.query(db.func.sum(Metric.cost)).filter(
+            Metric.timestamp >= since,
+            Metric.timestamp < min(first_full_hour, now)
+        ).scalar() or 0.0
+    else:
+        partial = db.session.query(db.func.sum(CostRollup.total_cost)).filter(
+            CostRollup.period == 'hour',
+            CostRollup.bucket_start == rollup_bucket_start(since, 'hour')
+        ).scalar() or 0.0
+        tail = partial * (first_full_hour - since).total_seconds() / 3600
+    return total + tail
+
+def _latency_sketch_rows(service_id, since, now):
+    """(service_id, sketch payload) for the rollup buckets covering since..now
+
+    Whole days come from day buckets and the partial days at either end from hour buckets,
+    so the window is exact to the hour.
+    """
+    first_full_day = rollup_bucket_start(since, 'day')
+    if first_full_day < since:
+        first_full_day += timedelta(days=1)
+    today = rollup_bucket_start(now, 'day')
+
+    # (period, first bucket, end of range); the last range runs up to and including now
+    if first_full_day < today:
+        ranges = [('hour', since, first_full_day), ('day', first_full_day, today), ('hour', today, None)]
+    else:
+        ranges = [('hour', since, None)]
+
+    for period, start, end in ranges:
+        query = db.session.query(CostRollup.service_id, CostRollup.latency_sketch).filter(
+            CostRollup.period == period,
+            CostRollup.bucket_start >= rollup_bucket_start(start, period),
+            CostRollup.bucket_start < end if end is not None else CostRollup.bucket_start <= now,
+            CostRollup.latency_sketch.isnot(None)
+        )
+        if service_id is not None:
+            query = query.filter(CostRollup.service_id == service_id)
+        yield from query
+
+def get_latency_sketch(service_id, since, now=None):
+    """Merge the latency sketches covering since..now for a service (or all services if None)"""
+    return merge_sketches(payload for _, payload in _latency_sketch_rows(service_id, since, now or datetime.utcnow()))
+
+def get_latency_sketches(since, now=None):
+    """Merged latency sketch per service id for since..now, in one pass over the rollups"""
+    sketches = {}
+    for service_id, payload in _latency_sketch_rows(None, since, now or datetime.utcnow()):
+        sketch = LatencySketch.from_dict(payload)
+        if service_id in sketches:
+            sketches[service_id].merge(sketch)
+        else:
+            sketches[service_id] = sketch
+    return sketches
+
+def rebuild_cost_rollups():
+    """Recompute all cost rollups from the raw metrics table (used after bulk loads)
+
+    Only meaningful while every probe has a Metric row (METRIC_PERSISTENCE=all).
+    """
+    totals = {}
+    rows = db.session.query(Metric.service_id, Metric.timestamp, Metric.cost, Metric.error,
+                            Metric.response_time)
+    for service_id, timestamp, cost, error, response_time in rows.yield_per(10000):
+        for period in ROLLUP_PERIODS:
+            key = (service_id, period, rollup_bucket_start(timestamp, period))
+            bucket = totals.get(key)
+            if bucket is None:
+                bucket = totals[key] = [0.0, 0, 0, LatencySketch()]
+            bucket[0] += cost or 0.0
+            bucket[1] += 1
+            if error:
+                bucket[2] += 1
+            else:
+                bucket[3].add(response_time)
+
+    CostRollup.query.delete()
+    CostCacheEntry.query.delete()
+    db.session.bulk_insert_mappings(CostRollup, [{
+        'service_id': service_id,
+        'period': period,
+        'bucket_start': bucket_start,
+        'total_cost': total_cost,
+        'request_count': request_count,
+        'error_count': error_count,
+        'latency_sketch': sketch.to_dict() if sketch.count else None
+    } for (service_id, period, bucket_start), (total_cost, request_count, error_count, sketch) in totals.items()])
+    db.session.commit()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+DNS cache for the Cloud Health Dashboard Phase 2 health checker
+Thousands of probed services share a handful of hostnames, so the checker resolves each name
+once per record TTL instead of once per probe. TTLs come from our own A/AAAA query to the
+resolv.conf nameservers; hosts-file names, dotless names (search domains) and anything the
+query cannot answer, NXDOMAIN and SERVFAIL included, go through the system resolver with
+DNS_CACHE_DEFAULT_TTL. Names neither one resolves are cached for at most
+DNS_CACHE_NEGATIVE_TTL, and an entry hit in the last DNS_CACHE_REFRESH_AHEAD fraction of its TTL is refreshed in the background.
+"""
+
+import ipaddress
+import random
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from monitoring import DNS_CACHE_REQUESTS, DNS_CACHE_SIZE
+
+QTYPE_A = 1
+QTYPE_CNAME = 5
+QTYPE_SOA = 6
+QTYPE_AAAA = 28
+RCODE_NXDOMAIN = 3
+
+class DnsLookupError(Exception):
+    """Our own query got no usable answer; the system resolver gets a try instead"""
+
+def system_resolve(host, port, socktype=socket.SOCK_STREAM):
+    """Uncached getaddrinfo, the default resolver for probes"""
+    return socket.getaddrinfo(host, port, type=socktype)
+
+def build_query(name, qtype, query_id):
+    """Wire-format recursive query for one name and record type"""
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)  # recursion desired, one question
+    labels = b''.join(bytes([len(label)]) + label.encode('idna') for label in name.strip('.').split('.') if label)
+    return header + labels + b'\x00' + struct.pack('!HH', qtype, 1)
+
+def _skip_name(data, offset):
+    while True:
+        length = data[offset]
+        if length == 0:
+            return offset + 1
+        if length & 0xC0 == 0xC0:  # compression pointer ends the name
+            return offset + 2
+        offset += 1 + length
+
+def _records(data, offset, count):
+    """[(type, ttl, rdata)] for count resource records starting at offset, and the offset after them"""
+    records = []
+    for _ in range(count):
+        offset = _skip_name(data, offset)
+        rtype, _, ttl, length = struct.unpack('!HHIH', data[offset:offset + 10])
+        offset += 10
+        records.append((rtype, ttl, data[offset:offset + length]))
+        offset += length
+    return records, offset
+
+def parse_response(data, query_id):
+    """(rcode, [(family, address)], answer TTL or None, negative TTL from the SOA or None)"""
+    if len(data) < 12:
+        raise DnsLookupError('Short DNS response')
+    response_id, flags, questions, answers, authorities, _ = struct.unpack('!HHHHHH', data[:12])
+    if response_id != query_id:
+        raise DnsLookupError('Mismatched DNS response id')
+    if flags & 0x0200:
+        raise DnsLookupError('Truncated DNS response')
+    try:
+        offset = 12
+        for _ in range(questions):
+            offset = _skip_name(data, offset) + 4
+        answer_records, offset = _records(data, offset, answers)
+        authority_records, _ = _records(data, offset, authorities)
+    except (IndexError, struct.error):
+        raise DnsLookupError('Malformed DNS response')
+
+    addresses, ttls = [], []
+    for rtype, ttl, rdata in answer_records:
+        if rtype == QTYPE_A and len(rdata) == 4:
+            addresses.append((socket.AF_INET, socket.inet_ntop(socket.AF_INET, rdata)))
+        elif rtype == QTYPE_AAAA and len(rdata) == 16:
+            addresses.append((socket.AF_INET6, socket.inet_ntop(socket.AF_INET6, rdata)))
+        elif rtype != QTYPE_CNAME:
+            continue
+        ttls.append(ttl)  # a CNAME in the chain expires the answer too
+
+    # With no addresses, the SOA's TTL and minimum bound how long the negative answer holds
+    negative_ttl = None
+    if not addresses:
+        for rtype, ttl, rdata in authority_records:
+            if rtype == QTYPE_SOA and len(rdata) >= 4:
+                negative_ttl = min(ttl, struct.unpack('!I', rdata[-4:])[0])
+    return flags & 0x0F, addresses, (min(ttls) if ttls else None), negative_ttl
+
+def read_nameservers(path='/etc/resolv.conf'):
+    try:
+        with open(path) as handle:
+            return [line.split()[1] for line in handle if line.startswith('nameserver') and len(line.split()) > 1]
+    except OSError:
+        return []
+
+def read_hosts(path='/etc/hosts'):
+    names = set()
+    try:
+        with open(path) as handle:
+            for line in handle:
+                names.update(name.lower() for name in line.split('#', 1)[0].split()[1:])
+    except OSError:
+        pass
+    return names
+
+class _Entry:
+    __slots__ = ('addresses', 'ttl', 'expires_at', 'refreshing')
+
+    def __init__(self, addresses, ttl, now):
+        self.addresses = addresses  # [(family, address)], empty for a cached failure
+        self.ttl = ttl
+        self.expires_at = now + ttl
+        self.refreshing = False
+
+class DnsCache:
+    """Size-bounded LRU of hostname -> addresses, expiring each entry after its record TTL"""
+
+    def __init__(self, max_entries=4096, min_ttl=5, max_ttl=3600, default_ttl=60, negative_ttl=30,
+                 refresh_ahead=0.1, query_timeout=2.0, nameservers=None, hosts=None):
+        self.max_entries = max_entries
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.refresh_ahead = refresh_ahead
+        self.query_timeout = query_timeout
+        self.nameservers = read_nameservers() if nameservers is None else nameservers
+        self.hosts = read_hosts() if hosts is None else hosts
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            max_entries=config['DNS_CACHE_MAX_ENTRIES'],
+            min_ttl=config['DNS_CACHE_MIN_TTL'],
+            max_ttl=config['DNS_CACHE_MAX_TTL'],
+            default_ttl=config['DNS_CACHE_DEFAULT_TTL'],
+            negative_ttl=config['DNS_CACHE_NEGATIVE_TTL'],
+            refresh_ahead=config['DNS_CACHE_REFRESH_AHEAD'],
+            query_timeout=config['DNS_CACHE_QUERY_TIMEOUT']
+        )
+
+    def resolve(self, host, port, socktype=socket.SOCK_STREAM):
+        """Drop-in for system_resolve: getaddrinfo-shaped results from the cache"""
+        try:
+            ipaddress.ip_address(host)
+            return system_resolve(host, port, socktype)  # literals never touch the network
+        except ValueError:
+            pass
+        key = host.lower().rstrip('.')
+        now = time.monotonic()
+        refresh = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at:
+                self._entries.move_to_end(key)
+                if entry.addresses:
+                    self.hits += 1
+                    DNS_CACHE_REQUESTS.labels(result='hit').inc()
+                    refresh = not entry.refreshing and entry.expires_at - now < entry.ttl * self.refresh_ahead
+                    entry.refreshing = entry.refreshing or refresh
+                else:
+                    self.negative_hits += 1
+                    DNS_CACHE_REQUESTS.labels(result='negative_hit').inc()
+            else:
+                entry = None
+                self.misses += 1
+                DNS_CACHE_REQUESTS.labels(result='miss').inc()
+
+        if refresh:
+            threading.Thread(target=self._refresh, args=(key,), daemon=True, name='dns-refresh').start()
+        if entry is None:
+            entry = self._store(key, self._lookup(key))
+        if not entry.addresses:
+            raise socket.gaierror(socket.EAI_NONAME, f'{host} did not resolve (cached for {entry.ttl}s)')
+        return self._addrinfo(entry.addresses, port, socktype)
+
+    def _refresh(self, key):
+        try:
+            self._store(key, self._lookup(key))
+            self.refreshes += 1
+            DNS_CACHE_REQUESTS.labels(result='refresh').inc()
+        except Exception:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+
+    def _store(self, key, result):
+        addresses, ttl = result
+        entry = _Entry(addresses, ttl, time.monotonic())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            DNS_CACHE_SIZE.set(len(self._entries))
+        return entry
+
+    def _lookup(self, name):
+        """(addresses, ttl) with the TTL clamped; empty addresses mean a negative entry"""
+        negative_ttl = None
+        if '.' in name and name not in self.hosts and self.nameservers:
+            try:
+                addresses, ttl, negative_ttl = self._query(name)
+                if addresses:
+                    return addresses, max(self.min_ttl, min(ttl, self.max_ttl))
+            except (DnsLookupError, OSError):
+                pass
+        # Our query asks for the absolute name only, so NXDOMAIN, SERVFAIL or an empty answer
+        # still goes through the system resolver and its search domains before it is cached
+        try:
+            infos = system_resolve(name, None)
+        except socket.gaierror:
+            if negative_ttl is not None:
+                return [], max(1, min(negative_ttl, self.negative_ttl))
+            return [], self.negative_ttl
+        addresses = list(dict.fromkeys((family, sockaddr[0]) for family, _, _, _, sockaddr in infos))
+        return addresses, self.default_ttl
+
+    def _query(self, name):
+        """A records (AAAA when there are none) from the first nameserver that answers"""
+        error = None
+        for nameserver in self.nameservers:
+            try:
+                rcode, addresses, ttl, negative_ttl = self._ask(nameserver, name, QTYPE_A)
+                if rcode == 0 and not addresses:
+                    rcode, addresses, ttl, negative_ttl = self._ask(nameserver, name, QTYPE_AAAA)
+            except (DnsLookupError, OSError) as e:
+                error = e
+                continue
+            if rcode in (0, RCODE_NXDOMAIN):
+                return addresses, ttl, negative_ttl
+            error = DnsLookupError(f'DNS rcode {rcode} from {nameserver}')
+        raise error or DnsLookupError('No nameservers')
+
+    def _ask(self, nameserver, name, qtype):
+        query_id = random.getrandbits(16)
+        family = socket.AF_INET6 if ':' in nameserver else socket.AF_INET
+        with socket.socket(family, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(self.query_timeout)
+            sock.connect((nameserver, 53))
+            sock.send(build_query(name, qtype, query_id))
+            deadline = time.monotonic() + self.query_timeout
+            while time.monotonic() < deadline:
+                reply = sock.recv(4096)
+                if len(reply) >= 2 and struct.unpack('!H', reply[:2])[0] == query_id:
+                    return parse_response(reply, query_id)
+        raise DnsLookupError(f'No answer from {nameserver}')
+
+    @staticmethod
+    def _addrinfo(addresses, port, socktype):
+        proto = socket.IPPROTO_UDP if socktype == socket.SOCK_DGRAM else socket.IPPROTO_TCP
+        return [(family, socktype, proto, '', (address, port) if family == socket.AF_INET else (address, port, 0, 0))
+                for family, address in addresses]
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            DNS_CACHE_SIZE.set(0)
+
+    def stats(self):
+        """Get cache hit/miss counters"""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'hit_rate': round((self.hits + self.negative_hits) / lookups * 100, 1) if lookups else 0.0
+        }
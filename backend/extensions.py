@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Flask extension instances for Cloud Health Dashboard Phase 2
+Created unbound so modules can import them freely; create_app() binds them to an application
+"""
+
+from flask_sqlalchemy import SQLAlchemy
+from flask_cors import CORS
+
+db = SQLAlchemy()
+cors = CORS()
@@ -0,0 +1,48 @@
+"""
+Gunicorn configuration for Cloud Health Dashboard Phase 2
+
+The app is created once in the master (preload) and workers are forked from it.
+The health checker runs as its own process (checker.py) so adding workers does not
+multiply probes and no probe threads exist in the master when it forks.
+
+Workers are threaded (gthread): each serves up to GUNICORN_THREADS requests at once, and
+MAX_CONCURRENT_REQUESTS (per worker) should stay below that so the spare threads can answer
+excess requests with a quick 503 instead of leaving them queued behind slow ones.
+"""
+
+import os
+import subprocess
+import sys
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
+timeout = 120
+preload_app = True
+wsgi_app = 'app:create_app()'
+
+checker_process = None
+
+def when_ready(server):
+    global checker_process
+    app = server.app.wsgi()
+    if app.config['HEALTH_CHECKER_ENABLED']:
+        checker_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'checker.py')
+        checker_process = subprocess.Popen([sys.executable, checker_path])
+        server.log.info("Started health checker (pid %s)", checker_process.pid)
+    if app.config['MAX_CONCURRENT_REQUESTS'] >= threads:
+        server.log.warning("MAX_CONCURRENT_REQUESTS (%s) is not below GUNICORN_THREADS (%s): the admission "
+                           "gate will never shed load", app.config['MAX_CONCURRENT_REQUESTS'], threads)
+
+def post_fork(server, worker):
+    # Drop any pooled connections inherited from the master without closing them for it
+    from extensions import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+def on_exit(server):
+    if checker_process and checker_process.poll() is None:
+        checker_process.terminate()
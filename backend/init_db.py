@@ -4,39 +4,57 @@ Enhanced Database initialization script for Cloud Health Dashboard Phase 2
 Creates tables and adds sample data for demonstration
 """
 
-from app import app, db, Service, Metric, Incident, Alert, User, Maintenance
+from app import create_app
+from extensions import db
+from models import Service, Metric, Incident, Alert, User, Maintenance, CostRollup, UptimeBitmap
+from cost_rollups import rebuild_cost_rollups
+from uptime_bitmaps import BITMAP_BYTES, mark, rebuild_uptime_bitmaps
+from sla_counters import rebuild_sla_counters
+from alert_engine import alert_dedup_key
+from latency_sketch import LatencySketch
 from datetime import datetime, timedelta
+import argparse
+import bisect
+import csv
+import io
+import math
 import random
 import hashlib
+import time
 import bcrypt
 
-def init_database():
+SAMPLE_USERS = [
+    {'username': 'admin', 'email': 'admin@cloudhealth.com', 'role': 'admin'},
+    {'username': 'operator', 'email': 'operator@cloudhealth.com', 'role': 'operator'},
+    {'username': 'developer', 'email': 'dev@cloudhealth.com', 'role': 'user'}
+]
+
+def create_sample_users():
+    """Create the default admin, operator and developer accounts"""
+    users = []
+    for user_data in SAMPLE_USERS:
+        password_hash = bcrypt.hashpw('password123'.encode('utf-8'), bcrypt.gensalt())
+        user = User(
+            username=user_data['username'],
+            email=user_data['email'],
+            password_hash=password_hash.decode('utf-8'),
+            role=user_data['role']
+        )
+        users.append(user)
+        db.session.add(user)
+    
+    db.session.commit()
+    return users
+
+def init_database(app=None):
     """Initialize the database with tables and enhanced sample data"""
+    app = app or create_app()
     with app.app_context():
         print("Creating database tables...")
         db.create_all()
         
         print("Creating sample users...")
-        # Create sample users
-        users = []
-        sample_users = [
-            {'username': 'admin', 'email': 'admin@cloudhealth.com', 'role': 'admin'},
-            {'username': 'operator', 'email': 'operator@cloudhealth.com', 'role': 'operator'},
-            {'username': 'developer', 'email': 'dev@cloudhealth.com', 'role': 'user'}
-        ]
-        
-        for user_data in sample_users:
-            password_hash = bcrypt.hashpw('password123'.encode('utf-8'), bcrypt.gensalt())
-            user = User(
-                username=user_data['username'],
-                email=user_data['email'],
-                password_hash=password_hash.decode('utf-8'),
-                role=user_data['role']
-            )
-            users.append(user)
-            db.session.add(user)
-        
-        db.session.commit()
+        users = create_sample_users()
         admin_user = users[0]
         
         print("Adding enhanced sample services...")
@@ -224,7 +242,8 @@ def init_database():
                 type=alert_info['type'],
                 message=alert_info['message'],
                 threshold=alert_info['threshold'],
-                severity=alert_info['severity']
+                severity=alert_info['severity'],
+                dedup_key=alert_dedup_key(alert_info['service_id'], alert_info['type'])
             )
             db.session.add(alert)
         
@@ -266,6 +285,10 @@ def init_database():
         
         db.session.commit()
         
+        print("Building cost rollups...")
+        rebuild_cost_rollups()
+        rebuild_uptime_bitmaps()
+        
         print("Database initialization completed successfully!")
         print(f"Created {len(users)} users")
         print(f"Created {len(services)} services")
@@ -278,5 +301,341 @@ def init_database():
         print("Username: operator, Password: password123")
         print("Username: developer, Password: password123")
 
+# Bulk data generation for load testing
+METRIC_COLUMNS = ('service_id', 'timestamp', 'response_time', 'status_code', 'error',
+                  'uptime', 'cost', 'request_size', 'response_size')
+SERVICE_TYPES = ['api', 'api', 'api', 'database', 'storage', 'compute']
+SERVICE_PROFILES = ['stable', 'stable', 'stable', 'stable', 'slow', 'flaky']
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+EPOCH = datetime(1970, 1, 1)
+
+def _epoch(timestamp):
+    """Seconds since the epoch for a naive UTC datetime"""
+    return (timestamp - EPOCH).total_seconds()
+
+class MetricWriter:
+    """Buffered metric inserts: COPY on PostgreSQL, DBAPI executemany everywhere else"""
+    
+    def __init__(self, engine, batch_size=50000):
+        self.batch_size = batch_size
+        self.connection = engine.raw_connection()
+        self.cursor = self.connection.cursor()
+        self.dialect = engine.dialect.name
+        self.use_copy = self.dialect == 'postgresql' and hasattr(self.cursor, 'copy_expert')
+        self.rows = []
+        self.written = 0
+        
+        table = Metric.__table__.name
+        columns = ', '.join(METRIC_COLUMNS)
+        marker = '?' if engine.dialect.paramstyle == 'qmark' else '%s'
+        self.insert_sql = f"INSERT INTO {table} ({columns}) VALUES ({', '.join([marker] * len(METRIC_COLUMNS))})"
+        self.copy_sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        
+        if self.dialect == 'sqlite':
+            # Bulk load only: trade durability for speed until the final commit
+            self.cursor.execute('PRAGMA synchronous = OFF')
+            self.cursor.execute('PRAGMA journal_mode = MEMORY')
+    
+    def format_timestamp(self, timestamp):
+        """Match SQLAlchemy's DateTime storage format on SQLite"""
+        if self.dialect == 'sqlite':
+            return timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')
+        return timestamp
+    
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if not self.rows:
+            return
+        if self.use_copy:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(self.rows)
+            buffer.seek(0)
+            self.cursor.copy_expert(self.copy_sql, buffer)
+        else:
+            self.cursor.executemany(self.insert_sql, self.rows)
+        self.connection.commit()
+        self.written += len(self.rows)
+        self.rows = []
+    
+    def close(self):
+        self.flush()
+        self.cursor.close()
+        self.connection.close()
+
+def _generate_outages(rng, service_ids, count, start, end):
+    """Spread count outages across services as {service_id: [(start_epoch, end_epoch)]}"""
+    outages = {service_id: [] for service_id in service_ids}
+    start_epoch = _epoch(start)
+    end_epoch = _epoch(end)
+    for _ in range(count):
+        service_id = rng.choice(service_ids)
+        outage_start = rng.uniform(start_epoch, end_epoch)
+        duration = min(rng.lognormvariate(math.log(1200), 1.0), 6 * 3600)  # median 20 minutes
+        outages[service_id].append((outage_start, min(outage_start + duration, end_epoch)))
+    for windows in outages.values():
+        windows.sort()
+    return outages
+
+def generate_bulk_data(services=100, days=30, interval=60, incidents=500, alerts=None,
+                       seed=42, batch_size=50000, reset=False, app=None):
+    """Generate a large, reproducible dataset of services, metrics, incidents and alerts"""
+    rng = random.Random(seed)
+    alerts = incidents * 2 if alerts is None else alerts
+    
+    app = app or create_app()
+    with app.app_context():
+        if reset:
+            print("Dropping existing tables...")
+            db.drop_all()
+        db.create_all()
+        
+        admin_user = User.query.filter_by(username='admin').first()
+        if admin_user is None:
+            print("Creating sample users...")
+            admin_user = create_sample_users()[0]
+        
+        print(f"Creating {services} synthetic services...")
+        profiles = {}
+        service_rows = []
+        for i in range(services):
+            service_type = rng.choice(SERVICE_TYPES)
+            start_hour = rng.randint(0, 22)
+            service = Service(
+                name=f"{service_type.title()} Service {i:05d}",
+                url=f"https://svc-{i:05d}.example.internal/health",
+                status='healthy',
+                owner_id=admin_user.id,
+                service_type=service_type,
+                cost_per_request=round(rng.uniform(0.00005, 0.001), 6),
+                cost_per_gb_hour=round(rng.uniform(0.05, 0.30), 2),
+                alert_thresholds={
+                    'response_time': rng.choice([1.0, 2.0, 3.0, 5.0]),
+                    'cost': 0.001,
+                    'error_rate': rng.choice([1.0, 2.0, 5.0])
+                },
+                maintenance_window=f"{rng.choice(WEEKDAYS)} {start_hour}:00-{start_hour + 2}:00 UTC"
+            )
+            service_rows.append(service)
+            db.session.add(service)
+        db.session.commit()
+        
+        for service in service_rows:
+            profile = rng.choice(SERVICE_PROFILES)
+            profiles[service.id] = {
+                'base_latency': rng.uniform(0.8, 2.5) if profile == 'slow' else rng.uniform(0.05, 0.4),
+                'error_probability': 0.03 if profile == 'flaky' else 0.001,
+                'response_size': rng.randint(200, 20000)
+            }
+        
+        end = datetime.utcnow().replace(second=0, microsecond=0)
+        start = end - timedelta(days=days)
+        service_ids = [s.id for s in service_rows]
+        outages = _generate_outages(rng, service_ids, incidents, start, end)
+        diurnal = [1 + 0.5 * math.sin(2 * math.pi * (hour - 9) / 24) for hour in range(24)]
+        
+        samples_per_service = int(days * 86400 // interval)
+        total_rows = samples_per_service * services
+        print(f"Generating {total_rows:,} metrics ({samples_per_service:,} per service)...")
+        
+        writer = MetricWriter(db.engine, batch_size)
+        
+        # Every service shares the same sample times, so format them once
+        start_epoch = _epoch(start)
+        steps = []
+        for step in range(samples_per_service):
+            timestamp = start + timedelta(seconds=step * interval)
+            epoch = start_epoch + step * interval
+            steps.append((epoch, writer.format_timestamp(timestamp), int(epoch // 3600), diurnal[timestamp.hour],
+                          int(epoch // 86400), int(epoch % 86400 // 60)))
+        
+        rollups = []
+        uptime_rows = []
+        started = time.time()
+        for service in service_rows:
+            profile = profiles[service.id]
+            base_latency = profile['base_latency']
+            error_probability = profile['error_probability']
+            base_response_size = profile['response_size']
+            windows = outages[service.id]
+            window_starts = [w[0] for w in windows]
+            cost_per_request = service.cost_per_request
+            cost_per_byte = service.cost_per_gb_hour / (1024 ** 3)
+            hourly = {}
+            bitmaps = {}
+            
+            for epoch, timestamp, hour_bucket, diurnal_factor, day_bucket, minute in steps:
+                index = bisect.bisect_right(window_starts, epoch) - 1
+                in_outage = index >= 0 and epoch < windows[index][1]
+                
+                if in_outage or rng.random() < error_probability / 3:
+                    # Connection failure or timeout
+                    row = (service.id, timestamp, rng.uniform(5.0, 10.0), 0, True, 0.0, 0.0, 0, 0)
+                else:
+                    latency = rng.lognormvariate(0, 0.35) * base_latency * diurnal_factor
+                    status_code = 200
+                    if rng.random() < error_probability:
+                        status_code = rng.choice([500, 502, 503])
+                    response_size = int(base_response_size * rng.uniform(0.8, 1.2))
+                    cost = cost_per_request + response_size * cost_per_byte
+                    row = (service.id, timestamp, latency, status_code, False,
+                           100.0 if status_code == 200 else 50.0, cost, rng.randint(100, 600), response_size)
+                writer.add(row)
+                
+                totals = hourly.get(hour_bucket)
+                if totals is None:
+                    totals = hourly[hour_bucket] = [0.0, 0, 0, LatencySketch()]
+                totals[0] += row[6]
+                totals[1] += 1
+                if row[4]:
+                    totals[2] += 1
+                else:
+                    totals[3].add(row[2])
+                
+                bits = bitmaps.get(day_bucket)
+                if bits is None:
+                    bits = bitmaps[day_bucket] = (bytearray(BITMAP_BYTES), bytearray(BITMAP_BYTES))
+                mark(*bits, minute, not row[4] and row[3] == 200)
+            
+            for day_bucket, (probed, up) in bitmaps.items():
+                uptime_rows.append({
+                    'service_id': service.id,
+                    'day': (EPOCH + timedelta(days=day_bucket)).date(),
+                    'probed': bytes(probed),
+                    'up': bytes(up)
+                })
+            
+            daily = {}
+            for hour_bucket, (total_cost, request_count, error_count, sketch) in hourly.items():
+                rollups.append((service.id, 'hour', hour_bucket * 3600, total_cost, request_count, error_count, sketch))
+                totals = daily.get(hour_bucket // 24)
+                if totals is None:
+                    totals = daily[hour_bucket // 24] = [0.0, 0, 0, LatencySketch()]
+                totals[0] += total_cost
+                totals[1] += request_count
+                totals[2] += error_count
+                totals[3].merge(sketch)
+            for day_bucket, (total_cost, request_count, error_count, sketch) in daily.items():
+                rollups.append((service.id, 'day', day_bucket * 86400, total_cost, request_count, error_count, sketch))
+            
+            if writer.written:
+                elapsed = time.time() - started
+                print(f"  {writer.written:,}/{total_rows:,} metrics ({writer.written / elapsed:,.0f} rows/s)", end='\r')
+        writer.close()
+        elapsed = time.time() - started
+        print(f"\nWrote {writer.written:,} metrics in {elapsed:.1f}s ({writer.written / max(elapsed, 1e-9):,.0f} rows/s)")
+        
+        print("Writing cost rollups...")
+        db.session.execute(CostRollup.__table__.insert(), [{
+            'service_id': service_id,
+            'period': period,
+            'bucket_start': EPOCH + timedelta(seconds=bucket_epoch),
+            'total_cost': total_cost,
+            'request_count': request_count,
+            'error_count': error_count,
+            'latency_sketch': sketch.to_dict() if sketch.count else None
+        } for service_id, period, bucket_epoch, total_cost, request_count, error_count, sketch in rollups])
+        db.session.execute(UptimeBitmap.__table__.insert(), uptime_rows)
+        db.session.commit()
+        
+        print("Writing incidents and alerts...")
+        incident_rows = []
+        alert_rows = []
+        now_epoch = _epoch(end)
+        names = {s.id: s.name for s in service_rows}
+        for service_id, windows in outages.items():
+            for outage_start, outage_end in windows:
+                created_at = EPOCH + timedelta(seconds=outage_start)
+                ongoing = outage_end >= now_epoch
+                resolved_at = None if ongoing else EPOCH + timedelta(seconds=outage_end)
+                sla_hours = rng.choice([1, 2, 4, 8])
+                incident_rows.append({
+                    'service_id': service_id,
+                    'title': f"Service {names[service_id]} is down",
+                    'description': f"Service {names[service_id]} stopped responding to health checks",
+                    'severity': rng.choice(['high', 'high', 'critical', 'medium']),
+                    'status': 'open' if ongoing else 'resolved',
+                    'created_at': created_at,
+                    'resolved_at': resolved_at,
+                    'sla_target': created_at + timedelta(hours=sla_hours),
+                    'actual_resolution_time': None if ongoing else (outage_end - outage_start) / 3600,
+                    'failure_class': 'connection',
+                    'last_seen_at': EPOCH + timedelta(seconds=max(outage_start, min(outage_end, now_epoch) - interval)),
+                    'failure_count': max(1, int((min(outage_end, now_epoch) - outage_start) // interval))
+                })
+                alert_rows.append({
+                    'service_id': service_id,
+                    'type': 'service_down',
+                    'status': 'firing' if ongoing else 'resolved',
+                    'dedup_key': alert_dedup_key(service_id, 'service_down'),
+                    'message': 'Service is not responding to health checks',
+                    'threshold': None,
+                    'triggered_at': created_at,
+                    'resolved_at': resolved_at,
+                    'severity': 'high',
+                    'notification_sent': True,
+                    'escalation_level': 1
+                })
+        
+        for _ in range(alerts):
+            service = rng.choice(service_rows)
+            threshold = service.alert_thresholds['response_time']
+            observed = threshold * rng.uniform(1.05, 3.0)
+            triggered_at = start + timedelta(seconds=rng.uniform(0, days * 86400))
+            alert_rows.append({
+                'service_id': service.id,
+                'type': 'high_response_time',
+                'status': 'resolved',
+                'dedup_key': alert_dedup_key(service.id, 'high_response_time'),
+                'message': f'Response time {observed:.3f}s exceeded threshold {threshold}s',
+                'threshold': threshold,
+                'triggered_at': triggered_at,
+                'resolved_at': triggered_at + timedelta(minutes=rng.randint(1, 120)),
+                'severity': 'medium',
+                'notification_sent': True,
+                'escalation_level': 1
+            })
+        
+        if incident_rows:
+            db.session.execute(Incident.__table__.insert(), incident_rows)
+        if alert_rows:
+            db.session.execute(Alert.__table__.insert(), alert_rows)
+        db.session.commit()
+        rebuild_sla_counters()
+        
+        print("Bulk data generation completed successfully!")
+        print(f"Created {services} services, {writer.written:,} metrics, "
+              f"{len(incident_rows)} incidents and {len(alert_rows)} alerts")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Initialize the database with demo data, or generate a large dataset with --services'
+    )
+    parser.add_argument('--services', type=int, help='number of synthetic services (enables bulk mode)')
+    parser.add_argument('--days', type=int, default=30, help='days of metric history per service')
+    parser.add_argument('--interval', type=int, default=60, help='seconds between metrics')
+    parser.add_argument('--incidents', type=int, default=500, help='number of outages/incidents')
+    parser.add_argument('--alerts', type=int, help='number of threshold alerts (default: 2x incidents)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for reproducible data')
+    parser.add_argument('--batch-size', type=int, default=50000, help='metrics per insert batch')
+    parser.add_argument('--reset', action='store_true', help='drop all tables before generating')
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
-    init_database()
+    args = parse_args()
+    if args.services:
+        generate_bulk_data(
+            services=args.services,
+            days=args.days,
+            interval=args.interval,
+            incidents=args.incidents,
+            alerts=args.alerts,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            reset=args.reset
+        )
+    else:
+        init_database()
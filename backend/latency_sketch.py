@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Latency quantile sketches for Cloud Health Dashboard Phase 2
+A small DDSketch: log-spaced bins with bounded relative error, mergeable across rollup buckets
+so p50/p90/p99 for any window come from merging per-bucket sketches
+"""
+
+import math
+import re
+
+DEFAULT_RELATIVE_ACCURACY = 0.01  # quantiles are within 1% of the true value
+DEFAULT_MAX_BINS = 2048
+MIN_TRACKED_VALUE = 1e-6  # seconds; smaller latencies land in the zero bin
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+PERCENTILE_THRESHOLD = re.compile(r'^p(\d{1,2}(?:\.\d+)?)_response_time$')
+
+def percentile_threshold(key):
+    """Quantile (0-1) for an alert threshold key like 'p95_response_time', else None"""
+    match = PERCENTILE_THRESHOLD.match(key)
+    return float(match.group(1)) / 100 if match else None
+
+class LatencySketch:
+    """DDSketch over positive values with relative accuracy alpha"""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, max_bins=DEFAULT_MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value, weight=1):
+        if value is None:
+            return
+        if value < MIN_TRACKED_VALUE:
+            self.zero_count += weight
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse_lowest()
+        self.count += weight
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+
+    def merge(self, other):
+        """Fold another sketch (same accuracy) into this one"""
+        if other is None or not other.count:
+            return self
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Cannot merge sketches with different relative accuracy')
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        while len(self.bins) > self.max_bins:
+            self._collapse_lowest()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = other.min if self.min is None or other.min < self.min else self.min
+        self.max = other.max if self.max is None or other.max > self.max else self.max
+        return self
+
+    def quantile(self, q):
+        """Value at quantile q (0-1), or None for an empty sketch"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def mean(self):
+        """Mean from bin midpoints (within the sketch's relative accuracy), or None if empty"""
+        if not self.count:
+            return None
+        total = sum(2 * self.gamma ** key / (self.gamma + 1) * count for key, count in self.bins.items())
+        return total / self.count
+
+    def quantiles(self, qs=DEFAULT_QUANTILES):
+        """{'p50': ..., 'p90': ..., 'p99': ...} for the given quantiles"""
+        return {f'p{q * 100:g}': self.quantile(q) for q in qs}
+
+    def _collapse_lowest(self):
+        """Merge the two lowest bins, trading accuracy at the fast end for bounded size"""
+        lowest, second = sorted(self.bins)[:2]
+        self.bins[second] += self.bins.pop(lowest)
+
+    def to_dict(self):
+        """Compact JSON form stored on rollup rows"""
+        return {
+            'a': self.relative_accuracy,
+            'z': self.zero_count,
+            'n': self.count,
+            'min': self.min,
+            'max': self.max,
+            'b': {str(key): count for key, count in self.bins.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        sketch = cls(relative_accuracy=data.get('a', DEFAULT_RELATIVE_ACCURACY))
+        sketch.zero_count = data.get('z', 0)
+        sketch.count = data.get('n', 0)
+        sketch.min = data.get('min')
+        sketch.max = data.get('max')
+        sketch.bins = {int(key): count for key, count in data.get('b', {}).items()}
+        return sketch
+
+def merge_sketches(payloads):
+    """Merge stored sketch payloads into one sketch"""
+    merged = LatencySketch()
+    for payload in payloads:
+        if payload:
+            merged.merge(LatencySketch.from_dict(payload))
+    return merged
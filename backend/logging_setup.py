@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Logging pipeline for Cloud Health Dashboard Phase 2
+Moves log formatting and disk I/O off the request and probe threads
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from monitoring import LOG_RECORDS_DROPPED
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_queue_handler = None
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Any thread may log; the increment must not lose drops to a race
+            with self._lock:
+                self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.utcfromtimestamp(record.created).isoformat() + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+def setup_logging(level='INFO', log_file='health_dashboard.log', max_bytes=10485760,
+                  backup_count=5, json_format=False, queue_size=10000):
+    """Route root logging through a bounded queue to rotating file and console handlers
+
+    Returns the queue handler so callers can read its drop counter. Only the first call
+    in a process builds the pipeline; later calls (e.g. several create_app() calls) reuse it.
+    """
+    global _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().setLevel(level)
+        return _queue_handler
+
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(log_queue)
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _start_listener(queue_handler, listener)
+    _queue_handler = queue_handler
+    os.register_at_fork(after_in_child=_restart_after_fork)
+    return queue_handler
+
+def _start_listener(queue_handler, listener):
+    queue_handler.listener = listener
+    listener.start()
+    atexit.register(listener.stop)
+
+def _restart_after_fork():
+    """Give a forked child (e.g. a gunicorn worker) its own queue and listener thread"""
+    old_listener = _queue_handler.listener
+    atexit.unregister(old_listener.stop)
+    log_queue = queue.Queue(maxsize=old_listener.queue.maxsize)
+    _queue_handler.queue = log_queue
+    listener = QueueListener(log_queue, *old_listener.handlers, respect_handler_level=True)
+    _start_listener(_queue_handler, listener)
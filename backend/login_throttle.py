@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Login throttling for Cloud Health Dashboard Phase 2
+Failed logins are counted per username and per client address. Once either reaches its
+limit (MAX_LOGIN_ATTEMPTS, MAX_LOGIN_ATTEMPTS_PER_IP), further attempts are refused for
+LOGIN_LOCKOUT_DURATION seconds before any password is hashed. bcrypt itself runs on a small
+dedicated executor whose queue is capped at LOGIN_HASH_QUEUE_DEPTH, so a login flood ties up
+at most that many request threads and the rest of the API keeps its workers.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from monitoring import LOGIN_HASH_QUEUE, RATE_LIMITER_ERRORS
+
+logger = logging.getLogger(__name__)
+
+class HashQueueFull(Exception):
+    """The password executor is saturated; the login should be retried later"""
+
+class MemoryCounters:
+    """Expiring failure counters in this process; each failure pushes the expiry out again"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._counters = OrderedDict()  # key -> [count, expires_at]
+        self._lock = threading.Lock()
+
+    def incr(self, key, ttl, now):
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter[1] <= now:
+                counter = self._counters[key] = [0, 0]
+                while len(self._counters) > self.max_keys:
+                    self._counters.popitem(last=False)
+            self._counters.move_to_end(key)
+            counter[0] += 1
+            counter[1] = now + ttl
+            return counter[0]
+
+    def get(self, keys, now):
+        """[(count, seconds left)] per key, (0, 0) when absent or expired"""
+        with self._lock:
+            result = []
+            for key in keys:
+                counter = self._counters.get(key)
+                live = counter is not None and counter[1] > now
+                result.append((counter[0], counter[1] - now) if live else (0, 0))
+            return result
+
+    def delete(self, key):
+        with self._lock:
+            self._counters.pop(key, None)
+
+class RedisCounters:
+    """The same counters in Redis (INCR + EXPIRE), shared by every worker"""
+
+    def __init__(self, client, prefix='login:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url):
+        import redis
+        return cls(redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25))
+
+    def incr(self, key, ttl, now):
+        pipe = self.client.pipeline()
+        pipe.incr(self.prefix + key)
+        pipe.expire(self.prefix + key, int(ttl))
+        return pipe.execute()[0]
+
+    def get(self, keys, now):
+        pipe = self.client.pipeline()
+        for key in keys:
+            pipe.get(self.prefix + key)
+            pipe.ttl(self.prefix + key)
+        replies = pipe.execute()
+        return [(int(count or 0), max(ttl, 0)) for count, ttl in zip(replies[::2], replies[1::2])]
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+def counters_from_url(url):
+    """Failure counters in the same store as the rate limiter (RATE_LIMIT_STORAGE_URL)"""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCounters.from_url(url)
+    return MemoryCounters()
+
+class LoginThrottle:
+    """Per-username and per-address failed login counters with a lockout"""
+
+    def __init__(self, counters, max_attempts, max_attempts_per_ip, lockout_duration):
+        self.counters = counters
+        self.max_attempts = max_attempts
+        self.max_attempts_per_ip = max_attempts_per_ip
+        self.lockout_duration = lockout_duration
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            counters=counters_from_url(config['RATE_LIMIT_STORAGE_URL']),
+            max_attempts=config['MAX_LOGIN_ATTEMPTS'],
+            max_attempts_per_ip=config['MAX_LOGIN_ATTEMPTS_PER_IP'],
+            lockout_duration=config['LOGIN_LOCKOUT_DURATION']
+        )
+
+    @staticmethod
+    def _keys(username, address):
+        return f'user:{(username or "").lower()}', f'ip:{address}'
+
+    def locked_for(self, username, address):
+        """Seconds until a login for this username from this address may be tried, 0 if now"""
+        try:
+            (user_failures, user_ttl), (ip_failures, ip_ttl) = self.counters.get(
+                self._keys(username, address), time.time())
+        except Exception as e:
+            # Like the rate limiter, an unreachable store lets logins through
+            RATE_LIMITER_ERRORS.inc()
+            logger.warning(f"Login throttle storage unavailable: {e}")
+            return 0
+        wait = 0
+        if user_failures >= self.max_attempts:
+            wait = max(wait, user_ttl)
+        if ip_failures >= self.max_attempts_per_ip:
+            wait = max(wait, ip_ttl)
+        return wait
+
+    def failed(self, username, address):
+        now = time.time()
+        try:
+            for key in self._keys(username, address):
+                self.counters.incr(key, self.lockout_duration, now)
+        except Exception as e:
+            RATE_LIMITER_ERRORS.inc()
+            logger.warning(f"Login throttle storage unavailable: {e}")
+
+    def succeeded(self, username):
+        """Clear the username's failures (the address keeps its count)"""
+        try:
+            self.counters.delete(self._keys(username, None)[0])
+        except Exception as e:
+            RATE_LIMITER_ERRORS.inc()
+            logger.warning(f"Login throttle storage unavailable: {e}")
+
+class PasswordHasher:
+    """Runs bcrypt on its own threads with a bounded number of waiting requests"""
+
+    def __init__(self, workers=2, queue_depth=16, timeout=10):
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            workers=config['LOGIN_HASH_WORKERS'],
+            queue_depth=config['LOGIN_HASH_QUEUE_DEPTH'],
+            timeout=config['LOGIN_HASH_TIMEOUT']
+        )
+
+    def run(self, fn, *args):
+        """fn(*args) on a hash thread; raises HashQueueFull instead of queueing past the limit"""
+        with self._lock:
+            if self.pending >= self.queue_depth:
+                raise HashQueueFull(f'{self.pending} password checks already pending')
+            self.pending += 1
+        LOGIN_HASH_QUEUE.inc()
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HashQueueFull(f'Password check did not finish within {self.timeout}s')
+
+    def _done(self, future):
+        with self._lock:
+            self.pending -= 1
+        LOGIN_HASH_QUEUE.dec()
+
+def get_login_throttle(app):
+    """The app's login throttle, built from its config on first use"""
+    throttle = app.extensions.get('login_throttle')
+    if throttle is None:
+        throttle = app.extensions['login_throttle'] = LoginThrottle.from_config(app.config)
+    return throttle
+
+def get_password_hasher(app):
+    """The app's password hashing executor, built from its config on first use"""
+    hasher = app.extensions.get('password_hasher')
+    if hasher is None:
+        hasher = app.extensions['password_hasher'] = PasswordHasher.from_config(app.config)
+    return hasher
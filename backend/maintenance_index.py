@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Maintenance window index for Cloud Health Dashboard Phase 2
+Scheduled Maintenance rows and each service's recurring maintenance_window string
+("Sun 2:00-4:00 UTC") are parsed once into sorted, merged interval lists per service, so
+"is this service in maintenance?" is a binary search per probe instead of a query and a
+string parse. The index is rebuilt every MAINTENANCE_INDEX_REFRESH seconds, or at once
+when this process changes the schedule.
+"""
+
+import logging
+import re
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+from extensions import db
+from models import Maintenance, Service
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+MINUTES_PER_DAY = 1440
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+_WINDOW = re.compile(
+    r'^(?P<days>[a-z]+(?:\s*-\s*[a-z]+)?)\s+(?P<start>\d{1,2}):(?P<start_min>\d{2})\s*-\s*'
+    r'(?P<end>\d{1,2}):(?P<end_min>\d{2})(?:\s+utc)?$'
+)
+
+def _weekday(name):
+    """Day index (Monday is 0) from a name or an abbreviation of at least three letters"""
+    for index, day in enumerate(WEEKDAYS):
+        if len(name) >= 3 and day.startswith(name):
+            return index
+    raise ValueError(f"Unknown weekday '{name}'")
+
+def _days(spec):
+    if spec in ('daily', 'everyday'):
+        return list(range(7))
+    if spec == 'weekdays':
+        return list(range(5))
+    if spec == 'weekends':
+        return [5, 6]
+    first, _, last = (part.strip() for part in spec.partition('-'))
+    first = _weekday(first)
+    if not last:
+        return [first]
+    last = _weekday(last)
+    return [(first + offset) % 7 for offset in range((last - first) % 7 + 1)]
+
+def parse_maintenance_window(text):
+    """Weekly (start, end) minute-of-week intervals for strings like 'Sun 2:00-4:00 UTC'
+
+    Several windows may be separated by commas or semicolons. Day ranges ('Mon-Fri'), 'Daily',
+    'Weekdays' and 'Weekends' are accepted, and a window that ends before it starts runs past
+    midnight. Times are UTC. Raises ValueError for anything else.
+    """
+    intervals = []
+    for part in re.split(r'[;,]', (text or '').lower()):
+        part = ' '.join(part.split())
+        if not part:
+            continue
+        match = _WINDOW.match(part)
+        if match is None:
+            raise ValueError(f"Unrecognised maintenance window '{part}'")
+        start = int(match['start']) * 60 + int(match['start_min'])
+        end = int(match['end']) * 60 + int(match['end_min'])
+        if start >= MINUTES_PER_DAY or end > MINUTES_PER_DAY or int(match['start_min']) > 59 \
+                or int(match['end_min']) > 59:
+            raise ValueError(f"Invalid time in maintenance window '{part}'")
+        length = (end - start) % MINUTES_PER_DAY or MINUTES_PER_DAY
+        for day in _days(match['days']):
+            begin = day * MINUTES_PER_DAY + start
+            if begin + length <= MINUTES_PER_WEEK:
+                intervals.append((begin, begin + length))
+            else:  # Sunday night into Monday morning wraps around the week
+                intervals.append((begin, MINUTES_PER_WEEK))
+                intervals.append((0, begin + length - MINUTES_PER_WEEK))
+    return intervals
+
+def minute_of_week(timestamp):
+    return timestamp.weekday() * MINUTES_PER_DAY + timestamp.hour * 60 + timestamp.minute
+
+class Intervals:
+    """Sorted, non-overlapping half-open intervals with a binary-search membership test"""
+
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)  # overlapping or touching: merge
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __contains__(self, point):
+        i = bisect_right(self.starts, point) - 1
+        return i >= 0 and point < self.ends[i]
+
+class MaintenanceIndex:
+    """Per-service recurring and scheduled maintenance intervals; one per app"""
+
+    def __init__(self, refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self._weekly = {}  # service_id -> Intervals of minutes of the week
+        self._scheduled = {}  # service_id -> Intervals of datetimes
+        self._built_at = None
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(refresh_interval=config['MAINTENANCE_INDEX_REFRESH'])
+
+    def load(self, now=None):
+        """Rebuild the index from the services and the Maintenance rows that have not ended"""
+        now = now or datetime.utcnow()
+        weekly = {}
+        for service_id, name, window in db.session.query(Service.id, Service.name, Service.maintenance_window):
+            if not window:
+                continue
+            try:
+                intervals = Intervals(parse_maintenance_window(window))
+            except ValueError as e:
+                logger.warning(f"Ignoring maintenance window of service {name}: {e}")
+                continue
+            if intervals:
+                weekly[service_id] = intervals
+
+        scheduled = {}
+        rows = db.session.query(Maintenance.service_id, Maintenance.start_time, Maintenance.end_time).filter(
+            Maintenance.end_time > now,
+            Maintenance.status != 'completed'
+        )
+        for service_id, start_time, end_time in rows:
+            scheduled.setdefault(service_id, []).append((start_time, end_time))
+
+        with self._lock:
+            self._weekly = weekly
+            self._scheduled = {service_id: Intervals(spans) for service_id, spans in scheduled.items()}
+            self._built_at = time.monotonic()
+
+    def invalidate(self):
+        """Rebuild on the next lookup (after this process changed the schedule)"""
+        self._built_at = None
+
+    def refresh(self, now=None):
+        built_at = self._built_at
+        if built_at is None or time.monotonic() - built_at >= self.refresh_interval:
+            self.load(now)
+
+    def in_maintenance(self, service_id, now=None):
+        """Whether the service is inside a recurring or scheduled maintenance window at now (UTC)"""
+        now = now or datetime.utcnow()
+        self.refresh(now)
+        self.lookups += 1
+        weekly = self._weekly.get(service_id)
+        scheduled = self._scheduled.get(service_id)
+        found = (weekly is not None and minute_of_week(now) in weekly) or \
+                (scheduled is not None and now in scheduled)
+        self.matches += found
+        return found
+
+    def stats(self):
+        """Get index size and lookup counters"""
+        return {
+            'recurring_services': len(self._weekly),
+            'recurring_windows': sum(len(intervals) for intervals in self._weekly.values()),
+            'scheduled_services': len(self._scheduled),
+            'scheduled_windows': sum(len(intervals) for intervals in self._scheduled.values()),
+            'lookups': self.lookups,
+            'matches': self.matches
+        }
+
+def maintenance_probe_due(service, now, interval):
+    """Whether a service in maintenance gets its down-sampled probe: every interval seconds, never if 0"""
+    if interval <= 0:
+        return False
+    return service.last_check is None or (now - service.last_check).total_seconds() >= interval
+
+def get_maintenance_index(app):
+    """The app's maintenance index, built from the database on first lookup"""
+    index = app.extensions.get('maintenance_index')
+    if index is None:
+        index = app.extensions['maintenance_index'] = MaintenanceIndex.from_config(app.config)
+    return index
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Database models for Cloud Health Dashboard Phase 2
+"""
+
+from datetime import datetime
+from extensions import db
+
+# Enhanced Database Models
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
+    role = db.Column(db.String(20), default='user')  # user, admin, operator
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_login = db.Column(db.DateTime)
+
+class Service(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    url = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), default='unknown')
+    last_check = db.Column(db.DateTime, default=datetime.utcnow)
+    uptime = db.Column(db.Float, default=0.0)
+    response_time = db.Column(db.Float, default=0.0)
+    error_count = db.Column(db.Integer, default=0)
+    total_checks = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    service_type = db.Column(db.String(50), default='api')  # api, database, storage, etc.
+    cost_per_request = db.Column(db.Float, default=0.0001)
+    cost_per_gb_hour = db.Column(db.Float, default=0.10)
+    alert_thresholds = db.Column(db.JSON)  # Store alert thresholds as JSON
+    maintenance_window = db.Column(db.String(100))  # e.g., "Sun 2:00-4:00 UTC"
+    window_stats = db.Column(db.JSON)  # Sliding-window totals published by the checker
+    connect_timeout = db.Column(db.Float)  # Probe timeouts in seconds; None uses the config defaults
+    read_timeout = db.Column(db.Float)
+    dns_cache_bypass = db.Column(db.Boolean, default=False)  # Resolve on every probe (DNS is what's monitored)
+    breaker_state = db.Column(db.String(20), default='closed')  # closed, open, half_open
+    breaker_failures = db.Column(db.Integer, default=0)  # Consecutive failed probes
+    breaker_interval = db.Column(db.Float)  # Seconds between half-open probes while open
+    breaker_next_probe_at = db.Column(db.DateTime)
+
+class Metric(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    response_time = db.Column(db.Float)
+    status_code = db.Column(db.Integer)
+    error = db.Column(db.Boolean, default=False)
+    uptime = db.Column(db.Float)
+    cost = db.Column(db.Float, default=0.0)
+    request_size = db.Column(db.Integer, default=0)  # Request size in bytes
+    response_size = db.Column(db.Integer, default=0)  # Response size in bytes
+    hedged = db.Column(db.Boolean, default=False)  # A hedged second request was sent
+    phase_timings = db.Column(db.JSON)  # [dns, connect, tls, ttfb, body] in microseconds, null if skipped
+
+class Incident(db.Model):
+    __table_args__ = (db.Index('ix_incident_service_status', 'service_id', 'status'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    severity = db.Column(db.String(20), default='medium')
+    status = db.Column(db.String(20), default='open')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime)
+    assigned_to = db.Column(db.Integer, db.ForeignKey('user.id'))
+    resolution_notes = db.Column(db.Text)
+    sla_target = db.Column(db.DateTime)  # SLA target for resolution
+    actual_resolution_time = db.Column(db.Float)  # Time to resolve in hours
+    failure_class = db.Column(db.String(50))  # timeout, connection, error; None for manual incidents
+    last_seen_at = db.Column(db.DateTime)  # Most recent failed probe for checker-opened incidents
+    failure_count = db.Column(db.Integer, default=1)
+
+class Alert(db.Model):
+    __table_args__ = (db.Index('ix_alert_dedup_status', 'dedup_key', 'status'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    type = db.Column(db.String(50), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    threshold = db.Column(db.Float)
+    triggered_at = db.Column(db.DateTime, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime)
+    severity = db.Column(db.String(20), default='medium')
+    notification_sent = db.Column(db.Boolean, default=False)
+    escalation_level = db.Column(db.Integer, default=1)
+    status = db.Column(db.String(20), default='firing')  # firing, resolved
+    dedup_key = db.Column(db.String(100))  # "<service_id>:<type>", one firing alert per key
+    breach_count = db.Column(db.Integer, default=1)  # Breaching checks seen while pending/firing
+    last_value = db.Column(db.Float)  # Observed value at the last state change
+
+class Notification(db.Model):
+    """Outbox row: one pending message for one channel, written in the same transaction as its event"""
+    __table_args__ = (db.Index('ix_notification_channel_status_due', 'channel', 'status', 'next_attempt_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(20), nullable=False)  # email, slack
+    event_type = db.Column(db.String(50), nullable=False)  # alert_firing, alert_resolved, incident_opened, ...
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'))
+    alert_id = db.Column(db.Integer, db.ForeignKey('alert.id'))
+    incident_id = db.Column(db.Integer, db.ForeignKey('incident.id'))
+    severity = db.Column(db.String(20), default='medium')
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text)
+    status = db.Column(db.String(20), default='pending')  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+class Maintenance(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), default='scheduled')  # scheduled, in_progress, completed
+    type = db.Column(db.String(50), default='planned')  # planned, emergency
+    impact_level = db.Column(db.String(20), default='low')  # low, medium, high
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+
+class CostRollup(db.Model):
+    """Running cost and request counters and a latency sketch per service and hour/day bucket"""
+    __table_args__ = (db.UniqueConstraint('service_id', 'period', 'bucket_start'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    period = db.Column(db.String(10), nullable=False)  # hour, day
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    total_cost = db.Column(db.Float, default=0.0)
+    request_count = db.Column(db.Integer, default=0)
+    error_count = db.Column(db.Integer, default=0)
+    latency_sketch = db.Column(db.JSON)  # LatencySketch.to_dict() of answered probes' response times
+
+class SlaCounter(db.Model):
+    """Resolved incidents with an SLA target and how many met it, per resolution day, service and severity"""
+    __table_args__ = (db.UniqueConstraint('day', 'service_id', 'severity'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    severity = db.Column(db.String(20), nullable=False)
+    resolved_count = db.Column(db.Integer, default=0)
+    met_count = db.Column(db.Integer, default=0)  # Resolved at or before their own sla_target
+    resolution_hours = db.Column(db.Float, default=0.0)  # Sum, for the average time to resolve
+
+class UptimeBitmap(db.Model):
+    """Per-minute availability of one service over one UTC day, as two packed 1440-bit bitmaps"""
+    __table_args__ = (db.UniqueConstraint('service_id', 'day'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    probed = db.Column(db.LargeBinary(180))  # Minutes with at least one probe
+    up = db.Column(db.LargeBinary(180))  # Minutes in which every probe found the service healthy
+
+class CostCacheEntry(db.Model):
+    """Persisted closed-day cost aggregates, valid until the next day boundary"""
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(200), unique=True, nullable=False)
+    as_of_date = db.Column(db.Date, nullable=False)  # first day not covered by the payload
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RevokedToken(db.Model):
+    """JWT IDs of tokens revoked before they expire (logout); rows are pruned once the token expires"""
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # cursor for incremental reloads
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
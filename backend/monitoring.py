@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for Cloud Health Dashboard Phase 2
+"""
+
+from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+
+REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'])
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency')
+SERVICE_HEALTH = Gauge('service_health_status', 'Service health status', ['service_name'])
+ERROR_RATE = Counter('service_errors_total', 'Total service errors', ['service_name'])
+COST_METRICS = Gauge('service_cost_total', 'Service cost in dollars', ['service_name'])
+COST_CACHE_REQUESTS = Counter('cost_cache_requests_total', 'Cost analysis cache lookups', ['result'])
+COST_CACHE_SIZE = Gauge('cost_cache_entries', 'Entries held in the in-memory cost analysis cache')
+PROBE_PHASE_SECONDS = Histogram('service_probe_phase_seconds', 'Probe duration by phase (dns, connect, tls, ttfb, body)',
+                                ['phase', 'service_type'],
+                                buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10))
+METRIC_ROWS = Counter('probe_metric_rows_total', 'Probe results by persistence outcome (all, transition, sample, skipped)',
+                      ['outcome'])
+DNS_CACHE_REQUESTS = Counter('dns_cache_requests_total', 'Checker DNS cache lookups', ['result'])
+DNS_CACHE_SIZE = Gauge('dns_cache_entries', 'Hostnames held in the checker DNS cache')
+PROBE_RETRIES = Counter('service_probe_retries_total', 'Probe attempts retried after a transient failure',
+                        ['service_name'])
+PROBE_HEDGES = Counter('service_probe_hedges_total', 'Hedged probes by outcome', ['service_name', 'outcome'])
+CIRCUIT_BREAKER_STATE = Gauge('service_circuit_breaker_state',
+                              'Circuit breaker state per service (0 closed, 1 half-open, 2 open)', ['service_name'])
+CIRCUIT_BREAKER_TRANSITIONS = Counter('service_circuit_breaker_transitions_total',
+                                      'Circuit breaker state changes', ['service_name', 'state'])
+PROBES_SKIPPED = Counter('service_probes_skipped_total',
+                         'Probes skipped by an open circuit breaker or a maintenance window',
+                         ['service_name', 'reason'])
+API_REJECTIONS = Counter('http_requests_rejected_total', 'API requests refused by admission control or rate limits',
+                         ['endpoint', 'reason'])
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'API requests being served by this process')
+RATE_LIMITER_ERRORS = Counter('rate_limiter_storage_errors_total', 'Rate limit checks let through because storage failed')
+LOGIN_ATTEMPTS = Counter('login_attempts_total', 'Login attempts by outcome (success, failure, locked, busy)',
+                         ['outcome'])
+LOGIN_HASH_QUEUE = Gauge('login_hash_queue_depth', 'Password checks queued or running on the bcrypt executor')
+TOKEN_REVOCATION_CHECKS = Counter('token_revocation_checks_total',
+                                  'Token revocation lookups (clear, false_positive, revoked)', ['result'])
+REVOKED_TOKENS = Gauge('revoked_tokens_loaded', 'Unexpired revoked token IDs held by this process')
+LOG_RECORDS_DROPPED = Counter('log_records_dropped_total', 'Log records dropped because the log queue was full')
+
+def start_metrics_server(port):
+    """Serve this process's metrics over HTTP (the checker runs outside the web workers)"""
+    from prometheus_client import start_http_server
+    start_http_server(port)
+
+def render_metrics():
+    """Prometheus exposition payload and content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Notification dispatcher for Cloud Health Dashboard Phase 2
+Alert and incident events are written to a persistent outbox in the same transaction as the
+state change; one worker per channel drains it in the background, coalescing whatever piled
+up since the last poll into a single digest, over a reused SMTP or HTTP connection, with
+exponential backoff on failure. Claimed rows hold a lease of NOTIFICATION_SENDING_LEASE seconds;
+rows still 'sending' after it (their worker died mid-delivery) return to the queue.
+"""
+
+import logging
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from flask import current_app
+from sqlalchemy import update
+from extensions import db
+from models import Notification, Alert
+
+logger = logging.getLogger(__name__)
+
+def enabled_channels(config):
+    """Channels listed in NOTIFICATION_CHANNELS that have somewhere to deliver to"""
+    channels = []
+    for channel in (c.strip() for c in config['NOTIFICATION_CHANNELS']):
+        if channel == 'slack' and config['SLACK_WEBHOOK_URL']:
+            channels.append(channel)
+        elif channel == 'email' and config['EMAIL_TO']:
+            channels.append(channel)
+    return channels
+
+def enqueue_notification(event_type, subject, body, severity='medium', service_id=None,
+                         alert=None, incident=None):
+    """Add one outbox row per enabled channel to the current session; the caller commits"""
+    rows = []
+    for channel in enabled_channels(current_app.config):
+        row = Notification(
+            channel=channel,
+            event_type=event_type,
+            service_id=service_id,
+            alert_id=alert.id if alert is not None else None,
+            incident_id=incident.id if incident is not None else None,
+            severity=severity,
+            subject=subject[:200],
+            body=body,
+            status='pending',
+            attempts=0,
+            next_attempt_at=datetime.utcnow()
+        )
+        db.session.add(row)
+        rows.append(row)
+    return rows
+
+def notify_alert(alert, event_type, service_name=None):
+    """Queue alert_firing / alert_escalated / alert_resolved for an Alert (flushed, so it has an id)"""
+    target = service_name or f"service {alert.service_id}"
+    if event_type == 'alert_resolved':
+        subject = f"[RESOLVED] {alert.type} on {target}"
+    else:
+        level = f" (escalation {alert.escalation_level})" if event_type == 'alert_escalated' else ''
+        subject = f"[{alert.severity.upper()}] {alert.type} on {target}{level}"
+    return enqueue_notification(event_type, subject, alert.message, severity=alert.severity,
+                                service_id=alert.service_id, alert=alert)
+
+def notify_incident(incident, event_type):
+    """Queue incident_opened / incident_resolved for an Incident (flushed, so it has an id)"""
+    if event_type == 'incident_resolved':
+        subject = f"[RESOLVED] {incident.title}"
+        body = incident.resolution_notes or incident.description
+    else:
+        subject = f"[{(incident.severity or 'medium').upper()}] {incident.title}"
+        body = incident.description
+    return enqueue_notification(event_type, subject, body, severity=incident.severity,
+                                service_id=incident.service_id, incident=incident)
+
+def build_digest(rows):
+    """(subject, text) for one message covering every row of a batch"""
+    if len(rows) == 1:
+        return rows[0].subject, rows[0].body or ''
+    subject = f"[Cloud Health] {len(rows)} notifications"
+    lines = [f"{len(rows)} events since the last notification:", '']
+    for row in rows:
+        lines.append(f"- {row.created_at:%Y-%m-%d %H:%M:%S} UTC {row.subject}")
+        if row.body:
+            lines.append(f"  {row.body}")
+    return subject, '\n'.join(lines)
+
+class SlackSender:
+    """Posts to the Slack webhook over one keep-alive session"""
+
+    def __init__(self, config):
+        self.url = config['SLACK_WEBHOOK_URL']
+        self.timeout = config['REQUEST_TIMEOUT']
+        self._session = None
+
+    def send(self, subject, text):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        response = self._session.post(self.url, json={'text': f"*{subject}*\n{text}"}, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+class EmailSender:
+    """Sends through one SMTP connection, reconnecting when the server drops it"""
+
+    def __init__(self, config):
+        self.host = config['EMAIL_SMTP_SERVER']
+        self.port = config['EMAIL_SMTP_PORT']
+        self.username = config['EMAIL_USERNAME']
+        self.password = config['EMAIL_PASSWORD']
+        self.use_tls = config['EMAIL_USE_TLS']
+        self.sender = config['EMAIL_FROM']
+        self.recipients = config['EMAIL_TO']
+        self.timeout = config['REQUEST_TIMEOUT']
+        self._smtp = None
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password)
+        self._smtp = smtp
+
+    def send(self, subject, text):
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        message.set_content(text)
+
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Idle connection closed by the server: reconnect once and retry
+            self._smtp = None
+            self._connect()
+            self._smtp.send_message(message)
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+SENDERS = {'email': EmailSender, 'slack': SlackSender}
+
+class ChannelWorker:
+    """Drains one channel's outbox: claim due rows, send one digest, record the outcome"""
+
+    def __init__(self, app, channel, sender=None):
+        self.app = app
+        self.channel = channel
+        self.sender = sender or SENDERS[channel](app.config)
+        self.batch_size = app.config['NOTIFICATION_BATCH_SIZE']
+        self.max_attempts = app.config['NOTIFICATION_RETRY_ATTEMPTS']
+        self.retry_delay = app.config['NOTIFICATION_RETRY_DELAY']
+        self.lease = timedelta(seconds=app.config['NOTIFICATION_SENDING_LEASE'])
+        self._swept_at = None
+        self.sent_messages = 0
+        self.sent_notifications = 0
+
+    def claim(self, now):
+        """Mark up to batch_size due rows as sending until now + lease and return them, oldest first
+
+        Only rows this worker's own UPDATE moved out of 'pending' are returned, so two dispatcher
+        processes polling the same channel never both send a row.
+        """
+        ids = self._due_ids(now)
+        if not ids:
+            return []
+        claim = {'status': 'sending', 'next_attempt_at': now + self.lease}
+        if db.engine.dialect.update_returning:
+            claimed = [row.id for row in db.session.execute(
+                update(Notification)
+                .where(Notification.id.in_(ids), Notification.status == 'pending')
+                .values(claim)
+                .returning(Notification.id)
+            )]
+        else:
+            # One conditional UPDATE per row: a row count of 1 means this worker won it
+            claimed = [notification_id for notification_id in ids if db.session.execute(
+                update(Notification)
+                .where(Notification.id == notification_id, Notification.status == 'pending')
+                .values(claim)
+            ).rowcount == 1]
+        db.session.commit()
+        if not claimed:
+            return []
+        return Notification.query.filter(Notification.id.in_(claimed)) \
+            .order_by(Notification.created_at.asc()).all()
+
+    def _due_ids(self, now):
+        due = db.session.query(Notification.id).filter(
+            Notification.channel == self.channel,
+            Notification.status == 'pending',
+            Notification.next_attempt_at <= now
+        ).order_by(Notification.created_at.asc()).limit(self.batch_size).all()
+        return [row.id for row in due]
+
+    def run_once(self):
+        """Send one digest if anything is due; returns the number of notifications it covered"""
+        with self.app.app_context():
+            now = datetime.utcnow()
+            self.sweep(now)
+            rows = self.claim(now)
+            if not rows:
+                return 0
+            ids = [row.id for row in rows]
+            try:
+                subject, text = build_digest(rows)
+                self.sender.send(subject, text)
+                self._record_success(rows, now)
+            except Exception as e:
+                # Whatever failed, delivery or bookkeeping, the rows must not stay 'sending';
+                # a digest that went out before the error may be delivered twice
+                logger.warning(f"Sending {len(ids)} {self.channel} notification(s) failed: {e}")
+                db.session.rollback()
+                self.sender.close()
+                self._release(ids, now, e)
+                return 0
+            return len(rows)
+
+    def sweep(self, now):
+        """Return this channel's rows whose lease expired while 'sending' to the queue, once per lease"""
+        if self._swept_at is not None and now - self._swept_at < self.lease:
+            return 0
+        self._swept_at = now
+        expired = [row.id for row in db.session.query(Notification.id).filter(
+            Notification.channel == self.channel,
+            Notification.status == 'sending',
+            Notification.next_attempt_at <= now
+        )]
+        if expired:
+            logger.warning(f"Returning {len(expired)} {self.channel} notification(s) with an expired lease")
+            self._release(expired, now, 'Delivery lease expired')
+        return len(expired)
+
+    def _record_success(self, rows, now):
+        for row in rows:
+            row.status = 'sent'
+            row.sent_at = now
+            row.attempts += 1
+        alert_ids = {row.alert_id for row in rows if row.alert_id is not None}
+        if alert_ids:
+            Alert.query.filter(Alert.id.in_(alert_ids)).update(
+                {'notification_sent': True}, synchronize_session=False)
+        db.session.commit()
+        self.sent_messages += 1
+        self.sent_notifications += len(rows)
+
+    def _release(self, ids, now, error):
+        """Record a failed attempt for rows this worker still holds; the lease sweep covers a failure here"""
+        try:
+            rows = Notification.query.filter(Notification.id.in_(ids), Notification.status == 'sending').all()
+            self._record_failure(rows, now, error)
+        except Exception as e:
+            logger.error(f"Could not return {len(ids)} {self.channel} notification(s) to the queue: {e}")
+            db.session.rollback()
+
+    def _record_failure(self, rows, now, error):
+        for row in rows:
+            row.attempts += 1
+            row.last_error = str(error)[:1000]
+            if row.attempts >= self.max_attempts:
+                row.status = 'failed'
+            else:
+                row.status = 'pending'
+                row.next_attempt_at = now + timedelta(seconds=self.retry_delay * 2 ** (row.attempts - 1))
+        db.session.commit()
+
+class NotificationDispatcher:
+    """A worker thread per enabled channel, polling the outbox every NOTIFICATION_POLL_INTERVAL seconds
+
+    Everything queued between two polls goes out as one digest per channel.
+    """
+
+    def __init__(self, app, senders=None):
+        self.app = app
+        self.poll_interval = app.config['NOTIFICATION_POLL_INTERVAL']
+        senders = senders or {}
+        self.workers = [ChannelWorker(app, channel, senders.get(channel))
+                        for channel in enabled_channels(app.config)]
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for worker in self.workers:
+            thread = threading.Thread(target=self._run, args=(worker,), daemon=True,
+                                      name=f'notify-{worker.channel}')
+            thread.start()
+            self._threads.append(thread)
+        if self.workers:
+            logger.info(f"Notification dispatcher started for {', '.join(w.channel for w in self.workers)}")
+        return self
+
+    def _run(self, worker):
+        while not self._stop.is_set():
+            try:
+                sent = worker.run_once()
+            except Exception as e:
+                logger.error(f"Notification worker {worker.channel} failed: {e}")
+                sent = 0
+            # Drain a backlog back to back; otherwise wait for the next burst to collect
+            if sent < worker.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        for worker in self.workers:
+            worker.sender.close()
+
+def start_notification_dispatcher(app, senders=None):
+    """Start the outbox workers for the app's enabled channels"""
+    dispatcher = NotificationDispatcher(app, senders).start()
+    app.extensions['notification_dispatcher'] = dispatcher
+    return dispatcher
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Outage tracking for Cloud Health Dashboard Phase 2
+Keeps at most one open incident per service and failure class, updated in place while the
+outage lasts and resolved automatically once the service answers again
+"""
+
+import socket
+from datetime import timedelta
+from extensions import db
+from models import Incident
+from notifications import notify_incident
+from sla_counters import count_resolution
+
+FAILURE_CLASSES = ('timeout', 'connection', 'error')
+DEFAULT_SLA_HOURS = 4
+
+def classify_failure(error):
+    """Map a probe exception to a failure class"""
+    import requests
+
+    if isinstance(error, (requests.exceptions.Timeout, socket.timeout)):
+        return 'timeout'
+    if isinstance(error, (requests.exceptions.ConnectionError, ConnectionError, socket.gaierror)):
+        return 'connection'
+    return 'error'
+
+def record_failure(service, failure_class, error, seen_at, sla_hours=DEFAULT_SLA_HOURS):
+    """Open an incident for this outage or bump the one already open
+
+    Uses the (service_id, status) index; the caller commits.
+    """
+    incident = Incident.query.filter_by(
+        service_id=service.id,
+        status='open',
+        failure_class=failure_class
+    ).order_by(Incident.created_at.desc()).first()
+
+    if incident is None:
+        incident = Incident(
+            service_id=service.id,
+            title=f"Service {service.name} is down",
+            description=f"Service {service.name} at {service.url} is not responding. Error: {error}",
+            severity='high',
+            status='open',
+            created_at=seen_at,
+            sla_target=seen_at + timedelta(hours=sla_hours),
+            failure_class=failure_class,
+            last_seen_at=seen_at,
+            failure_count=1
+        )
+        db.session.add(incident)
+        db.session.flush()
+        notify_incident(incident, 'incident_opened')
+    else:
+        incident.last_seen_at = seen_at
+        incident.failure_count = (incident.failure_count or 0) + 1
+        incident.description = (f"Service {service.name} at {service.url} is not responding. "
+                                f"Last error: {error}")
+    return incident
+
+def resolve_outages(service, resolved_at):
+    """Auto-resolve the checker-opened incidents of a service that answered a probe
+
+    Incidents filed by hand (no failure class) are left for an operator. Returns the
+    incidents resolved; the caller commits.
+    """
+    incidents = Incident.query.filter(
+        Incident.service_id == service.id,
+        Incident.status == 'open',
+        Incident.failure_class.isnot(None)
+    ).all()
+
+    for incident in incidents:
+        incident.status = 'resolved'
+        incident.resolved_at = resolved_at
+        incident.resolution_notes = (f"Auto-resolved: service recovered after "
+                                     f"{incident.failure_count} failed checks")
+        incident.actual_resolution_time = (resolved_at - incident.created_at).total_seconds() / 3600
+        count_resolution(incident)
+        notify_incident(incident, 'incident_resolved')
+    return incidents
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Probe client for Cloud Health Dashboard Phase 2
+Runs a service's health probe (see probes.py) with its own connect/read timeouts and retries
+failures to connect up to MAX_RETRIES; a read timeout is final. When PROBE_HEDGE_ENABLED, a second
+request is sent if the first has not answered within the service's recent p95 latency, and whichever
+answers first wins. Every attempt, retry and hedge of one probe shares a budget of one read timeout.
+"""
+
+import socket
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from latency_sketch import LatencySketch
+from monitoring import PROBE_HEDGES, PROBE_RETRIES
+from probes import ConnectPhaseError, resolve_probe
+from dns_cache import DnsCache, system_resolve
+
+ProbeResult = namedtuple('ProbeResult', 'status_code request_size response_size phases elapsed attempts hedged')
+
+# Worth retrying: the request never reached the target. A read timeout means a hung service,
+# which a second attempt would only wait out again.
+RETRYABLE_ERRORS = (ConnectPhaseError, socket.gaierror)
+
+class HedgeDelays:
+    """Recent probe latency per service, kept as two rotating sketches of PROBE_HEDGE_WINDOW seconds each"""
+
+    def __init__(self, window, quantile, min_samples, min_delay):
+        self.window = window
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._sketches = {}  # service_id -> [rotated_at, previous, current]
+        self._lock = threading.Lock()
+
+    def _entry(self, service_id, now):
+        entry = self._sketches.get(service_id)
+        if entry is None:
+            entry = self._sketches[service_id] = [now, LatencySketch(), LatencySketch()]
+        elif now - entry[0] >= self.window:
+            entry[:] = [now, entry[2], LatencySketch()]
+        return entry
+
+    def observe(self, service_id, latency, now=None):
+        with self._lock:
+            self._entry(service_id, now or time.monotonic())[2].add(latency)
+
+    def delay(self, service_id, now=None):
+        """Seconds to wait before hedging, or None while there is too little history"""
+        with self._lock:
+            _, previous, current = self._entry(service_id, now or time.monotonic())
+            if previous.count + current.count < self.min_samples:
+                return None
+            merged = LatencySketch()
+            merged.merge(previous)
+            merged.merge(current)
+        return max(merged.quantile(self.quantile), self.min_delay)
+
+class ProbeClient:
+    """Timeouts, retries and hedging for health probes; one per app, shared by the checker"""
+
+    def __init__(self, connect_timeout, read_timeout, max_retries, retry_backoff,
+                 hedge_enabled=False, hedge_delays=None, hedge_workers=8, dns_cache=None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.hedge_enabled = hedge_enabled
+        self.hedge_delays = hedge_delays
+        self.dns_cache = dns_cache
+        self._executor = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix='probe-hedge') \
+            if hedge_enabled else None
+
+    @classmethod
+    def from_config(cls, config):
+        delays = HedgeDelays(
+            window=config['PROBE_HEDGE_WINDOW'],
+            quantile=config['PROBE_HEDGE_QUANTILE'],
+            min_samples=config['PROBE_HEDGE_MIN_SAMPLES'],
+            min_delay=config['PROBE_HEDGE_MIN_DELAY']
+        )
+        return cls(
+            connect_timeout=config['PROBE_CONNECT_TIMEOUT'],
+            read_timeout=config['REQUEST_TIMEOUT'],
+            max_retries=config['MAX_RETRIES'],
+            retry_backoff=config['PROBE_RETRY_BACKOFF'],
+            hedge_enabled=config['PROBE_HEDGE_ENABLED'],
+            hedge_delays=delays,
+            hedge_workers=config['PROBE_HEDGE_WORKERS'],
+            dns_cache=DnsCache.from_config(config) if config['DNS_CACHE_ENABLED'] else None
+        )
+
+    def timeouts(self, service):
+        """(connect, read) timeout for the service, falling back to the configured defaults"""
+        read = service.read_timeout or self.read_timeout
+        return min(service.connect_timeout or self.connect_timeout, read), read
+
+    def fetch(self, service, timeout=None, retries=None, hedge=True):
+        """Probe the service; raises the last error once every attempt has failed
+
+        timeout is a (connect, read) pair and defaults to the service's own; a half-open
+        circuit breaker probe passes a short one with retries=0 and hedge=False. The read
+        timeout is also the budget for the whole call: retries get only what is left of it.
+        """
+        probe = resolve_probe(service)
+        resolve = system_resolve if self.dns_cache is None or service.dns_cache_bypass else self.dns_cache.resolve
+        timeout = timeout or self.timeouts(service)
+        retries = self.max_retries if retries is None else retries
+        hedge_after = self.hedge_delays.delay(service.id) if hedge and self.hedge_enabled else None
+        deadline = time.monotonic() + timeout[1]
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.monotonic()
+            remaining = deadline - start
+            attempt_timeout = (min(timeout[0], remaining), min(timeout[1], remaining))
+            try:
+                if hedge_after is not None and hedge_after < attempt_timeout[1]:
+                    response, hedged = self._hedged(probe, service, attempt_timeout, resolve, hedge_after, deadline)
+                else:
+                    response, hedged = probe(service, attempt_timeout, resolve), False
+            except RETRYABLE_ERRORS:
+                # A dropped SYN should not mark the service down on its own, if there is time to retry
+                backoff = self.retry_backoff * 2 ** (attempt - 1)
+                if attempt > retries or time.monotonic() + backoff >= deadline:
+                    raise
+                PROBE_RETRIES.labels(service_name=service.name).inc()
+                time.sleep(backoff)
+                continue
+            elapsed = time.monotonic() - start
+            if self.hedge_enabled:
+                self.hedge_delays.observe(service.id, elapsed)
+            return ProbeResult(*response, elapsed, attempt, hedged)
+
+    def _hedged(self, probe, service, timeout, resolve, hedge_after, deadline):
+        primary = self._executor.submit(probe, service, timeout, resolve)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            PROBE_HEDGES.labels(service_name=service.name, outcome='not_sent').inc()
+            return primary.result(), False
+
+        hedge = self._executor.submit(probe, service, timeout, resolve)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                # Out of budget: both requests are left to hit their own socket timeouts
+                PROBE_HEDGES.labels(service_name=service.name, outcome='both_failed').inc()
+                raise socket.timeout(f"No answer within {timeout[1]:.3f}s")
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                # The slower request is left to finish (or time out) on its own
+                outcome = 'hedge_won' if future is hedge else 'primary_won'
+                PROBE_HEDGES.labels(service_name=service.name, outcome=outcome).inc()
+                return response, True
+        PROBE_HEDGES.labels(service_name=service.name, outcome='both_failed').inc()
+        raise error
+
+def get_probe_client(app):
+    """The app's probe client, built from its config on first use"""
+    client = app.extensions.get('probe_client')
+    if client is None:
+        client = app.extensions['probe_client'] = ProbeClient.from_config(app.config)
+    return client
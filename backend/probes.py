@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Probe registry for Cloud Health Dashboard Phase 2
+Chooses the cheapest adequate check for a service from its URL scheme and service_type:
+an HTTP GET for http(s) URLs, a bare TCP connect for tcp://, and a one-round-trip protocol
+handshake for postgres://, redis:// and dns:// targets. Every probe times its DNS, connect,
+TLS, time-to-first-byte and body phases on the monotonic perf_counter clock.
+"""
+
+import http.client
+import random
+import socket
+import ssl
+import struct
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlsplit
+from dns_cache import QTYPE_A, build_query, system_resolve
+
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'body')
+MAX_REDIRECTS = 5
+USER_AGENT = 'CloudHealthDashboard/2.0'
+
+# Status codes follow HTTP so the checker's healthy (200) / degraded (other) logic applies to every probe
+ProbeResponse = namedtuple('ProbeResponse', 'status_code request_size response_size phases')
+
+class ProbeError(Exception):
+    """The target answered, but not with the protocol we expected"""
+
+class ConnectPhaseError(Exception):
+    """No connection was established, so the target did no work and a retry is cheap"""
+
+class ConnectTimeout(ConnectPhaseError, socket.timeout):
+    """Connecting timed out (still a socket.timeout to callers classifying failures)"""
+
+class ConnectError(ConnectPhaseError, ConnectionError):
+    """Connecting was refused or the host was unreachable"""
+
+class PhaseTimer:
+    """Per-phase durations in whole microseconds, None for phases a probe never went through"""
+
+    __slots__ = ('durations',)
+
+    def __init__(self):
+        self.durations = [None] * len(PHASES)
+
+    @contextmanager
+    def phase(self, name):
+        index = PHASES.index(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = int((time.perf_counter() - started) * 1_000_000)
+            self.durations[index] = (self.durations[index] or 0) + elapsed  # redirects add up
+
+def decode_phases(durations):
+    """Stored microsecond list -> {'dns': seconds, ...} for the API"""
+    if not durations:
+        return None
+    return {name: (value / 1_000_000 if value is not None else None) for name, value in zip(PHASES, durations)}
+
+_PROBES = {}  # (service_type or None, scheme) -> probe(service, timeout, resolve)
+
+def register_probe(scheme, probe, service_type=None):
+    """Register probe(service, (connect, read) timeout, resolve) -> ProbeResponse for a scheme
+
+    resolve(host, port, socktype) returns getaddrinfo-shaped results (cached or not). A
+    service_type-specific probe takes precedence over the scheme's default.
+    """
+    _PROBES[(service_type, scheme)] = probe
+    return probe
+
+def resolve_probe(service):
+    """The probe for a service; URLs without a known scheme fall back to HTTP"""
+    scheme = urlsplit(service.url).scheme.lower()
+    return (_PROBES.get((service.service_type, scheme))
+            or _PROBES.get((None, scheme))
+            or _PROBES[(None, 'http')])
+
+def _address(url, default_port):
+    parts = urlsplit(url)
+    if not parts.hostname:
+        raise ProbeError(f"No host in {url}")
+    return parts.hostname, parts.port or default_port
+
+def _connect(host, port, timeout, timer, resolve):
+    """Resolve and connect (timed separately), trying each address like socket.create_connection"""
+    with timer.phase('dns'):
+        addresses = resolve(host, port)
+    error = None
+    with timer.phase('connect'):
+        for family, socktype, proto, _, sockaddr in addresses:
+            sock = socket.socket(family, socktype, proto)
+            sock.settimeout(timeout[0])
+            try:
+                sock.connect(sockaddr)
+            except OSError as e:
+                sock.close()
+                error = e
+                continue
+            sock.settimeout(timeout[1])
+            return sock
+    if isinstance(error, socket.timeout):
+        raise ConnectTimeout(f"Connecting to {host}:{port} timed out") from error
+    raise ConnectError(f"Could not connect to {host}:{port}: {error or 'no addresses'}") from error
+
+def _recv_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('Connection closed by peer')
+        data += chunk
+    return data
+
+_tls_context = None
+
+def _tls():
+    global _tls_context
+    if _tls_context is None:
+        _tls_context = ssl.create_default_context()
+    return _tls_context
+
+def http_probe(service, timeout, resolve=system_resolve):
+    """GET the service URL over a fresh connection, following redirects"""
+    timer = PhaseTimer()
+    url = service.url
+    request_size = 0
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        secure = parts.scheme == 'https'
+        host, port = _address(url, 443 if secure else 80)
+        sock = _connect(host, port, timeout, timer, resolve)
+        try:
+            if secure:
+                with timer.phase('tls'):
+                    sock = _tls().wrap_socket(sock, server_hostname=host)
+            connection = http.client.HTTPConnection(host, port, timeout=timeout[1])
+            connection.sock = sock
+            headers = {'Host': parts.netloc.rsplit('@', 1)[-1], 'User-Agent': USER_AGENT,
+                       'Accept': '*/*', 'Connection': 'close'}
+            path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+            request_size += len(str(headers).encode('utf-8'))
+            with timer.phase('ttfb'):
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+            with timer.phase('body'):
+                body = response.read()
+        finally:
+            sock.close()
+        location = response.getheader('Location')
+        if response.status in (301, 302, 303, 307, 308) and location:
+            url = urljoin(url, location)
+            continue
+        return ProbeResponse(response.status, request_size, len(body), timer.durations)
+    raise ProbeError(f"More than {MAX_REDIRECTS} redirects from {service.url}")
+
+def tcp_probe(service, timeout, resolve=system_resolve):
+    """The port accepts connections"""
+    timer = PhaseTimer()
+    _connect(*_address(service.url, 80), timeout, timer, resolve).close()
+    return ProbeResponse(200, 0, 0, timer.durations)
+
+POSTGRES_SSL_REQUEST = struct.pack('!ii', 8, 80877103)
+
+def postgres_probe(service, timeout, resolve=system_resolve):
+    """SSLRequest handshake: any PostgreSQL server answers 'S' or 'N' without credentials"""
+    timer = PhaseTimer()
+    with _connect(*_address(service.url, 5432), timeout, timer, resolve) as sock:
+        with timer.phase('ttfb'):
+            sock.sendall(POSTGRES_SSL_REQUEST)
+            reply = _recv_exactly(sock, 1)
+    if reply not in (b'S', b'N'):
+        raise ProbeError(f"Unexpected PostgreSQL handshake reply {reply!r}")
+    return ProbeResponse(200, len(POSTGRES_SSL_REQUEST), 1, timer.durations)
+
+def redis_probe(service, timeout, resolve=system_resolve):
+    """Inline PING; an auth error still proves the server is up, LOADING and similar mean degraded"""
+    timer = PhaseTimer()
+    with _connect(*_address(service.url, 6379), timeout, timer, resolve) as sock:
+        with timer.phase('ttfb'):
+            sock.sendall(b'PING\r\n')
+            reply = sock.makefile('rb').readline(512)
+    if reply.startswith(b'+PONG') or reply.startswith(b'-NOAUTH'):
+        return ProbeResponse(200, 6, len(reply), timer.durations)
+    if reply.startswith(b'-'):
+        return ProbeResponse(503, 6, len(reply), timer.durations)
+    raise ProbeError(f"Unexpected Redis reply {reply[:40]!r}")
+
+def dns_probe(service, timeout, resolve=system_resolve):
+    """One UDP A query (dns://server[:port]/name); SERVFAIL or NXDOMAIN count as degraded"""
+    timer = PhaseTimer()
+    name = urlsplit(service.url).path.strip('/') or 'localhost'
+    with timer.phase('dns'):
+        family, socktype, proto, _, sockaddr = resolve(*_address(service.url, 53), socket.SOCK_DGRAM)[0]
+    query_id = random.getrandbits(16)
+    query = build_query(name, QTYPE_A, query_id)
+    with socket.socket(family, socktype, proto) as sock:
+        sock.settimeout(timeout[1])
+        sock.connect(sockaddr)
+        with timer.phase('ttfb'):
+            sock.send(query)
+            while True:
+                reply = sock.recv(512)
+                if len(reply) >= 12 and struct.unpack('!H', reply[:2])[0] == query_id:
+                    break
+    rcode = reply[3] & 0x0F
+    return ProbeResponse(200 if rcode == 0 else 503, len(query), len(reply), timer.durations)
+
+register_probe('http', http_probe)
+register_probe('https', http_probe)
+register_probe('tcp', tcp_probe)
+register_probe('postgres', postgres_probe)
+register_probe('postgresql', postgres_probe)
+register_probe('redis', redis_probe)
+register_probe('dns', dns_probe)
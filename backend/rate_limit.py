@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+API rate limiting and admission control for Cloud Health Dashboard Phase 2
+Every request first passes a per-process concurrency gate (MAX_CONCURRENT_REQUESTS in
+flight, 503 beyond that; it needs threaded workers, see gunicorn.conf.py) and then a token bucket keyed by caller and endpoint
+(RATE_LIMIT_DEFAULT, 429 when empty). Callers are identified by the user id of a valid
+bearer token, or by client address. Buckets live in process memory (memory://) or in
+Redis (redis://, shared by every worker); if Redis is unreachable, requests are let through.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, jsonify, request
+from monitoring import API_REJECTIONS, RATE_LIMITER_ERRORS, REQUEST_COUNT, REQUESTS_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_RATE = re.compile(r'^(\d+)\s*(?:per|/)\s*(\d+)?\s*(second|minute|hour|day)s?$')
+
+def parse_rate(text):
+    """'100 per minute', '10/second' or '1000 per 5 minutes' -> (limit, period seconds)"""
+    match = _RATE.match(' '.join(text.lower().split()))
+    if match is None:
+        raise ValueError(f"Invalid rate limit '{text}'")
+    limit, count, unit = match.groups()
+    return int(limit), int(count or 1) * PERIODS[unit]
+
+class MemoryStorage:
+    """Token buckets in this process, least recently used dropped beyond max_keys"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    def acquire(self, key, capacity, rate, now):
+        """Take a token: (allowed, tokens left, seconds until the next token)"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now]
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            allowed = bucket[0] >= 1
+            if allowed:
+                bucket[0] -= 1
+            tokens = bucket[0]
+        return allowed, tokens, max(0.0, (1 - tokens) / rate)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+# The same bucket arithmetic, run atomically inside Redis
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1])
+if tokens == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + math.max(0, now - tonumber(state[2])) * rate)
+end
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+class RedisStorage:
+    """Token buckets in Redis, shared by every worker; keys expire once their bucket is full again"""
+
+    def __init__(self, client, prefix='ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url):
+        import redis
+        return cls(redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25))
+
+    def acquire(self, key, capacity, rate, now):
+        allowed, tokens = self._script(keys=[self.prefix + key], args=[capacity, rate, now])
+        tokens = float(tokens)
+        return bool(allowed), tokens, max(0.0, (1 - tokens) / rate)
+
+    def clear(self):
+        for key in self.client.scan_iter(f'{self.prefix}*'):
+            self.client.delete(key)
+
+def storage_from_url(url):
+    """memory:// or redis[s]://host:port/db"""
+    if url.startswith('memory://'):
+        return MemoryStorage()
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisStorage.from_url(url)
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URL '{url}'")
+
+class RateLimiter:
+    """Token bucket per caller and endpoint: bursts up to the limit, refilled at limit per period"""
+
+    def __init__(self, storage, default_limit):
+        self.storage = storage
+        self.default_limit = default_limit
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(storage_from_url(config['RATE_LIMIT_STORAGE_URL']), parse_rate(config['RATE_LIMIT_DEFAULT']))
+
+    def hit(self, key, limit=None):
+        """(allowed, limit, remaining, retry_after seconds); storage failures allow the request"""
+        capacity, period = limit or self.default_limit
+        try:
+            allowed, tokens, retry_after = self.storage.acquire(key, capacity, capacity / period, time.time())
+        except Exception as e:
+            RATE_LIMITER_ERRORS.inc()
+            logger.warning(f"Rate limit storage unavailable, allowing request: {e}")
+            return True, capacity, capacity, 0.0
+        return allowed, capacity, int(tokens), retry_after
+
+class AdmissionGate:
+    """Caps the requests in flight in this process; excess requests are shed, not queued"""
+
+    def __init__(self, max_concurrent):
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            if self.in_flight >= self.max_concurrent:
+                return False
+            self.in_flight += 1
+        REQUESTS_IN_FLIGHT.inc()
+        return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+        REQUESTS_IN_FLIGHT.dec()
+
+def rate_limit(limit):
+    """Give a view its own limit, e.g. @rate_limit('10 per minute') directly under the route decorator"""
+    parsed = parse_rate(limit)
+
+    def decorator(f):
+        f.rate_limit = parsed
+        return f
+    return decorator
+
+def exempt(f):
+    """Exclude a view (health checks, metrics scrapes) from rate limiting; it still passes the gate"""
+    f.rate_limit_exempt = True
+    return f
+
+def caller_identity():
+    """'user:<id>' for a valid bearer token, otherwise 'ip:<client address>'"""
+    import jwt
+    token = request.headers.get('Authorization', '')
+    if token:
+        if token.startswith('Bearer '):
+            token = token[7:]
+        try:
+            payload = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            return f"user:{payload['user_id']}"
+        except (jwt.InvalidTokenError, KeyError):
+            pass
+    return f'ip:{request.remote_addr}'
+
+def _reject(status, reason, message, retry_after):
+    endpoint = request.endpoint or 'unknown'
+    API_REJECTIONS.labels(endpoint=endpoint, reason=reason).inc()
+    REQUEST_COUNT.labels(method=request.method, endpoint=request.path, status=status).inc()
+    response = jsonify({'error': message, 'retry_after': retry_after})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def init_rate_limiting(app):
+    """Install the admission gate and the rate limiter as request hooks"""
+    gate = app.extensions['admission_gate'] = AdmissionGate(app.config['MAX_CONCURRENT_REQUESTS'])
+    limiter = None
+    if app.config['RATE_LIMIT_ENABLED']:
+        limiter = app.extensions['rate_limiter'] = RateLimiter.from_config(app.config)
+
+    @app.before_request
+    def admit():
+        if not gate.enter():
+            return _reject(503, 'overloaded', 'Server is overloaded, try again shortly', 1)
+        g.admitted = True
+        if limiter is None or request.endpoint is None:
+            return None
+        view = app.view_functions.get(request.endpoint)
+        if getattr(view, 'rate_limit_exempt', False):
+            return None
+        allowed, limit, remaining, retry_after = limiter.hit(
+            f'{caller_identity()}:{request.endpoint}', getattr(view, 'rate_limit', None))
+        g.rate_limit = (limit, remaining)
+        if not allowed:
+            return _reject(429, 'rate_limited', 'Rate limit exceeded', max(1, math.ceil(retry_after)))
+        return None
+
+    @app.after_request
+    def rate_limit_headers(response):
+        state = g.get('rate_limit')
+        if state is not None:
+            response.headers['X-RateLimit-Limit'] = str(state[0])
+            response.headers['X-RateLimit-Remaining'] = str(state[1])
+        return response
+
+    @app.teardown_request
+    def release(error=None):
+        if g.pop('admitted', False):
+            gate.leave()
@@ -0,0 +1,15 @@
+"""
+API blueprints for Cloud Health Dashboard Phase 2
+"""
+
+def register_blueprints(app):
+    """Import and register every API blueprint"""
+    from auth import auth_bp
+    from routes.services import services_bp
+    from routes.incidents import incidents_bp
+    from routes.maintenance import maintenance_bp
+    from routes.cost import cost_bp
+    from routes.dashboard import dashboard_bp
+    
+    for blueprint in (auth_bp, services_bp, incidents_bp, maintenance_bp, cost_bp, dashboard_bp):
+        app.register_blueprint(blueprint)
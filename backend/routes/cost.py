@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Cost analysis endpoints for Cloud Health Dashboard Phase 2
+"""
+
+from flask import Blueprint, jsonify, request
+from datetime import datetime, timedelta
+from models import Service
+from auth import token_required
+from cost_rollups import get_cost_rollups
+
+cost_bp = Blueprint('cost', __name__, url_prefix='/api')
+
+@cost_bp.route('/services/<int:service_id>/cost-analysis', methods=['GET'])
+@token_required
+def get_service_cost_analysis(current_user, service_id):
+    """Get cost analysis for a specific service"""
+    service = Service.query.get_or_404(service_id)
+    
+    # Read daily cost rollups for the last 30 days
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    rollups = get_cost_rollups(service_id, 'day', thirty_days_ago)
+    
+    total_cost = sum(r.total_cost for r in rollups)
+    total_requests = sum(r.request_count for r in rollups)
+    avg_cost_per_request = total_cost / total_requests if total_requests > 0 else 0
+    
+    # Calculate cost trends
+    daily_costs = {r.bucket_start.date().isoformat(): r.total_cost for r in rollups}
+    
+    return jsonify({
+        'service_name': service.name,
+        'total_cost_30_days': round(total_cost, 6),
+        'total_requests_30_days': total_requests,
+        'avg_cost_per_request': round(avg_cost_per_request, 6),
+        'daily_costs': daily_costs,
+        'cost_per_request': service.cost_per_request,
+        'cost_per_gb_hour': service.cost_per_gb_hour
+    })
+
+@cost_bp.route('/cost/summary', methods=['GET'])
+@token_required
+def get_cost_summary(current_user):
+    """Get the cost summary across all services"""
+    from cost_analyzer import CostAnalyzer
+    days = request.args.get('days', 30, type=int)
+    return jsonify(CostAnalyzer().get_all_services_cost_summary(days))
+
+@cost_bp.route('/services/<int:service_id>/cost-forecast', methods=['GET'])
+@token_required
+def get_service_cost_forecast(current_user, service_id):
+    """Get a cost forecast for a specific service"""
+    from cost_analyzer import CostAnalyzer
+    Service.query.get_or_404(service_id)
+    days_ahead = request.args.get('days', 30, type=int)
+    forecast = CostAnalyzer().get_cost_forecast(service_id, days_ahead)
+    if forecast is None:
+        return jsonify({'error': 'Not enough history to forecast'}), 404
+    return jsonify(forecast)
+
+@cost_bp.route('/services/<int:service_id>/cost-recommendations', methods=['GET'])
+@token_required
+def get_service_cost_recommendations(current_user, service_id):
+    """Get cost optimization recommendations for a specific service"""
+    from cost_analyzer import CostAnalyzer
+    Service.query.get_or_404(service_id)
+    return jsonify(CostAnalyzer().get_cost_optimization_recommendations(service_id))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Health, dashboard statistics and Prometheus endpoints for Cloud Health Dashboard Phase 2
+"""
+
+from flask import Blueprint, current_app, jsonify
+from datetime import datetime, timedelta
+from models import Service, Incident
+from monitoring import REQUEST_COUNT, render_metrics
+from auth import token_required
+from rate_limit import exempt
+from cost_rollups import get_latency_sketch, get_total_cost
+from sla_counters import get_sla_compliance
+
+dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api')
+
+@dashboard_bp.route('/health')
+@exempt
+def health():
+    """Overall system health endpoint"""
+    REQUEST_COUNT.labels(method='GET', endpoint='/api/health', status=200).inc()
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat(),
+        'version': '2.0.0',
+        'phase': 'Phase 2 - Enhanced Monitoring',
+        'features': [
+            'Advanced cost tracking',
+            'Enhanced alerting',
+            'Maintenance scheduling',
+            'User management',
+            'SLA monitoring'
+        ]
+    })
+
+@dashboard_bp.route('/dashboard/stats')
+@token_required
+def dashboard_stats(current_user):
+    """Get enhanced dashboard statistics"""
+    total_services = Service.query.count()
+    healthy_services = Service.query.filter_by(status='healthy').count()
+    down_services = Service.query.filter_by(status='down').count()
+    open_incidents = Incident.query.filter_by(status='open').count()
+    
+    # Hourly rollups for the last hour, plus the raw metrics before the first whole bucket
+    one_hour_ago = datetime.utcnow() - timedelta(hours=1)
+    total_cost_last_hour = get_total_cost(
+        one_hour_ago, raw_tail=current_app.config['METRIC_PERSISTENCE'] == 'all')
+    
+    # Average and tail latency across all services from the merged hourly sketches, which see
+    # every probe even when raw metrics are sampled
+    latency_sketch = get_latency_sketch(None, one_hour_ago)
+    avg_response_time = latency_sketch.mean() or 0
+    latency_percentiles = latency_sketch.quantiles()
+    
+    # SLA compliance against each incident's own target, from the incremental counters
+    sla_compliance = get_sla_compliance()['compliance_percent'] or 0
+    
+    REQUEST_COUNT.labels(method='GET', endpoint='/api/dashboard/stats', status=200).inc()
+    
+    return jsonify({
+        'total_services': total_services,
+        'healthy_services': healthy_services,
+        'down_services': down_services,
+        'open_incidents': open_incidents,
+        'avg_response_time': round(avg_response_time, 3),
+        'response_time_percentiles': {k: round(v, 3) if v is not None else None
+                                      for k, v in latency_percentiles.items()},
+        'total_cost_last_hour': round(total_cost_last_hour, 6),
+        'sla_compliance': round(sla_compliance, 1),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@dashboard_bp.route('/metrics')
+@exempt
+def prometheus_metrics():
+    """Prometheus metrics endpoint"""
+    payload, content_type = render_metrics()
+    return payload, 200, {'Content-Type': content_type}
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Incident management endpoints for Cloud Health Dashboard Phase 2
+"""
+
+from flask import Blueprint, jsonify, request
+from datetime import datetime, timedelta
+from extensions import db
+from models import Incident
+from monitoring import REQUEST_COUNT
+from auth import token_required
+from notifications import notify_incident
+from sla_counters import get_sla_compliance, count_resolution
+
+incidents_bp = Blueprint('incidents', __name__, url_prefix='/api/incidents')
+
+@incidents_bp.route('', methods=['GET'])
+@token_required
+def get_incidents(current_user):
+    """Get all incidents with enhanced data, optionally filtered by ?status= and ?service_id="""
+    query = Incident.query
+    if request.args.get('status'):
+        query = query.filter(Incident.status == request.args['status'])
+    if request.args.get('service_id', type=int):
+        query = query.filter(Incident.service_id == request.args.get('service_id', type=int))
+    incidents = query.order_by(Incident.created_at.desc()).all()
+    REQUEST_COUNT.labels(method='GET', endpoint='/api/incidents', status=200).inc()
+    
+    return jsonify([{
+        'id': i.id,
+        'service_id': i.service_id,
+        'title': i.title,
+        'description': i.description,
+        'severity': i.severity,
+        'status': i.status,
+        'created_at': i.created_at.isoformat(),
+        'resolved_at': i.resolved_at.isoformat() if i.resolved_at else None,
+        'assigned_to': i.assigned_to,
+        'resolution_notes': i.resolution_notes,
+        'sla_target': i.sla_target.isoformat() if i.sla_target else None,
+        'actual_resolution_time': i.actual_resolution_time,
+        'failure_class': i.failure_class,
+        'last_seen_at': i.last_seen_at.isoformat() if i.last_seen_at else None,
+        'failure_count': i.failure_count
+    } for i in incidents])
+
+@incidents_bp.route('/sla', methods=['GET'])
+@token_required
+def get_sla(current_user):
+    """SLA compliance from the incremental counters, over ?days= (all time if omitted), ?service_id= and ?severity="""
+    compliance = get_sla_compliance(
+        days=request.args.get('days', type=int),
+        service_id=request.args.get('service_id', type=int),
+        severity=request.args.get('severity')
+    )
+    REQUEST_COUNT.labels(method='GET', endpoint='/api/incidents/sla', status=200).inc()
+    return jsonify(compliance)
+
+@incidents_bp.route('', methods=['POST'])
+@token_required
+def create_incident(current_user):
+    """Create a new incident with enhanced data"""
+    data = request.get_json()
+    
+    if not data or 'title' not in data or 'service_id' not in data:
+        return jsonify({'error': 'Title and service_id are required'}), 400
+    
+    incident = Incident(
+        service_id=data['service_id'],
+        title=data['title'],
+        description=data.get('description', ''),
+        severity=data.get('severity', 'medium'),
+        assigned_to=data.get('assigned_to'),
+        sla_target=datetime.utcnow() + timedelta(hours=data.get('sla_hours', 4))
+    )
+    
+    db.session.add(incident)
+    db.session.flush()
+    notify_incident(incident, 'incident_opened')
+    db.session.commit()
+    
+    REQUEST_COUNT.labels(method='POST', endpoint='/api/incidents', status=201).inc()
+    return jsonify({
+        'id': incident.id,
+        'title': incident.title,
+        'status': incident.status
+    }), 201
+
+@incidents_bp.route('/<int:incident_id>/resolve', methods=['POST'])
+@token_required
+def resolve_incident(current_user, incident_id):
+    """Resolve an incident with enhanced tracking"""
+    incident = Incident.query.get_or_404(incident_id)
+    data = request.get_json()
+    
+    # Re-resolving moves the incident to its new resolution day in the SLA counters
+    if incident.status == 'resolved':
+        count_resolution(incident, sign=-1)
+    
+    incident.status = 'resolved'
+    incident.resolved_at = datetime.utcnow()
+    incident.resolution_notes = data.get('resolution_notes', '')
+    
+    # Calculate actual resolution time
+    if incident.sla_target:
+        resolution_time = (incident.resolved_at - incident.created_at).total_seconds() / 3600  # hours
+        incident.actual_resolution_time = resolution_time
+    
+    count_resolution(incident)
+    notify_incident(incident, 'incident_resolved')
+    db.session.commit()
+    
+    REQUEST_COUNT.labels(method='POST', endpoint=f'/api/incidents/{incident_id}/resolve', status=200).inc()
+    return jsonify({'message': 'Incident resolved successfully'})
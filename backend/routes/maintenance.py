@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Maintenance scheduling endpoints for Cloud Health Dashboard Phase 2
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+from datetime import datetime
+from extensions import db
+from models import Maintenance
+from auth import token_required
+from maintenance_index import get_maintenance_index
+
+maintenance_bp = Blueprint('maintenance', __name__, url_prefix='/api/maintenance')
+
+@maintenance_bp.route('', methods=['GET'])
+@token_required
+def get_maintenance_schedules(current_user):
+    """Get maintenance schedules"""
+    maintenance = Maintenance.query.order_by(Maintenance.start_time.desc()).all()
+    
+    return jsonify([{
+        'id': m.id,
+        'service_id': m.service_id,
+        'title': m.title,
+        'description': m.description,
+        'start_time': m.start_time.isoformat(),
+        'end_time': m.end_time.isoformat(),
+        'status': m.status,
+        'type': m.type,
+        'impact_level': m.impact_level
+    } for m in maintenance])
+
+@maintenance_bp.route('', methods=['POST'])
+@token_required
+def create_maintenance_schedule(current_user):
+    """Create a maintenance schedule"""
+    data = request.get_json()
+    
+    if not data or 'title' not in data or 'service_id' not in data:
+        return jsonify({'error': 'Title and service_id are required'}), 400
+    
+    maintenance = Maintenance(
+        service_id=data['service_id'],
+        title=data['title'],
+        description=data.get('description', ''),
+        start_time=datetime.fromisoformat(data['start_time']),
+        end_time=datetime.fromisoformat(data['end_time']),
+        type=data.get('type', 'planned'),
+        impact_level=data.get('impact_level', 'low'),
+        created_by=current_user.id
+    )
+    
+    db.session.add(maintenance)
+    db.session.commit()
+    get_maintenance_index(current_app).invalidate()
+    
+    return jsonify({
+        'id': maintenance.id,
+        'title': maintenance.title,
+        'status': maintenance.status
+    }), 201
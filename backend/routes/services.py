@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Service registration and metrics endpoints for Cloud Health Dashboard Phase 2
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+from datetime import datetime, timedelta
+from extensions import db
+from models import Service, Metric
+from monitoring import REQUEST_COUNT
+from auth import token_required
+from cost_rollups import get_latency_sketch
+from sliding_window import parse_window
+from circuit_breaker import breaker_status
+from probes import decode_phases
+from uptime_bitmaps import SLA_WINDOWS, get_availability
+from maintenance_index import get_maintenance_index, parse_maintenance_window
+
+services_bp = Blueprint('services', __name__, url_prefix='/api/services')
+
+@services_bp.route('', methods=['GET'])
+@token_required
+def get_services(current_user):
+    """Get all monitored services"""
+    REQUEST_COUNT.labels(method='GET', endpoint='/api/services', status=200).inc()
+    services = Service.query.all()
+    maintenance = get_maintenance_index(current_app)
+    now = datetime.utcnow()
+    return jsonify([{
+        'id': s.id,
+        'name': s.name,
+        'url': s.url,
+        'status': s.status,
+        'last_check': s.last_check.isoformat() if s.last_check else None,
+        'uptime': s.uptime,
+        'response_time': s.response_time,
+        'error_count': s.error_count,
+        'total_checks': s.total_checks,
+        'service_type': s.service_type,
+        'cost_per_request': s.cost_per_request,
+        'cost_per_gb_hour': s.cost_per_gb_hour,
+        'alert_thresholds': s.alert_thresholds,
+        'maintenance_window': s.maintenance_window,
+        'in_maintenance': maintenance.in_maintenance(s.id, now),
+        'connect_timeout': s.connect_timeout,
+        'read_timeout': s.read_timeout,
+        'dns_cache_bypass': bool(s.dns_cache_bypass),
+        'window_stats': s.window_stats,
+        'circuit_breaker': breaker_status(s)
+    } for s in services])
+
+@services_bp.route('', methods=['POST'])
+@token_required
+def add_service(current_user):
+    """Add a new service to monitor"""
+    data = request.get_json()
+    
+    if not data or 'name' not in data or 'url' not in data:
+        return jsonify({'error': 'Name and URL are required'}), 400
+    
+    try:
+        parse_maintenance_window(data.get('maintenance_window', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    service = Service(
+        name=data['name'],
+        url=data['url'],
+        owner_id=current_user.id,
+        service_type=data.get('service_type', 'api'),
+        cost_per_request=data.get('cost_per_request', 0.0001),
+        cost_per_gb_hour=data.get('cost_per_gb_hour', 0.10),
+        alert_thresholds=data.get('alert_thresholds', {}),
+        maintenance_window=data.get('maintenance_window', ''),
+        connect_timeout=data.get('connect_timeout'),
+        read_timeout=data.get('read_timeout'),
+        dns_cache_bypass=bool(data.get('dns_cache_bypass', False))
+    )
+    
+    db.session.add(service)
+    db.session.commit()
+    maintenance = get_maintenance_index(current_app)
+    maintenance.invalidate()
+    
+    # Perform initial health check
+    from checker import check_service_health
+    check_service_health(service, maintenance=maintenance.in_maintenance(service.id))
+    
+    REQUEST_COUNT.labels(method='POST', endpoint='/api/services', status=201).inc()
+    return jsonify({
+        'id': service.id,
+        'name': service.name,
+        'url': service.url,
+        'status': service.status
+    }), 201
+
+@services_bp.route('/<int:service_id>/metrics', methods=['GET'])
+@token_required
+def get_service_metrics(current_user, service_id):
+    """Get metrics for a specific service with enhanced data"""
+    service = Service.query.get_or_404(service_id)
+    
+    # Get metrics from last 24 hours
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    metrics = Metric.query.filter(
+        Metric.service_id == service_id,
+        Metric.timestamp >= yesterday
+    ).order_by(Metric.timestamp.desc()).all()
+    
+    REQUEST_COUNT.labels(method='GET', endpoint=f'/api/services/{service_id}/metrics', status=200).inc()
+    
+    return jsonify([{
+        'timestamp': m.timestamp.isoformat(),
+        'response_time': m.response_time,
+        'status_code': m.status_code,
+        'error': m.error,
+        'uptime': m.uptime,
+        'cost': m.cost,
+        'request_size': m.request_size,
+        'response_size': m.response_size,
+        'hedged': m.hedged,
+        'phases': decode_phases(m.phase_timings)
+    } for m in metrics])
+
+@services_bp.route('/<int:service_id>/uptime', methods=['GET'])
+@token_required
+def get_service_uptime(current_user, service_id):
+    """Get availability over ?windows= (default 30d,90d,365d) from the per-minute uptime bitmaps"""
+    Service.query.get_or_404(service_id)
+    windows = [w.strip() for w in request.args.get('windows', ','.join(SLA_WINDOWS)).split(',') if w.strip()]
+    try:
+        availability = get_availability(service_id, windows)
+    except ValueError:
+        return jsonify({'error': f"Invalid windows: {request.args.get('windows')}"}), 400
+    
+    REQUEST_COUNT.labels(method='GET', endpoint=f'/api/services/{service_id}/uptime', status=200).inc()
+    return jsonify({
+        'service_id': service_id,
+        'windows': availability
+    })
+
+@services_bp.route('/<int:service_id>/latency', methods=['GET'])
+@token_required
+def get_service_latency(current_user, service_id):
+    """Get latency percentiles for a service over ?window= (e.g. 1h, 24h, 7d) from rollup sketches"""
+    Service.query.get_or_404(service_id)
+    window = request.args.get('window', '24h')
+    try:
+        seconds = parse_window(window)
+    except ValueError:
+        return jsonify({'error': f'Invalid window: {window}'}), 400
+    
+    now = datetime.utcnow()
+    sketch = get_latency_sketch(service_id, now - timedelta(seconds=seconds), now)
+    
+    REQUEST_COUNT.labels(method='GET', endpoint=f'/api/services/{service_id}/latency', status=200).inc()
+    return jsonify({
+        'service_id': service_id,
+        'window': window,
+        'count': sketch.count,
+        'min': sketch.min,
+        'max': sketch.max,
+        **sketch.quantiles()
+    })
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+SLA compliance counters for Cloud Health Dashboard Phase 2
+Every resolution of an incident with an SLA target bumps a counter row for its resolution
+day, service and severity, judged against the incident's own sla_target. Compliance over
+any window is a SUM over those rows instead of a scan of every resolved incident.
+"""
+
+from datetime import datetime, timedelta
+from extensions import db
+from models import Incident, SlaCounter
+from upserts import upsert_increment
+
+def met_sla(incident):
+    return incident.resolved_at <= incident.sla_target
+
+def count_resolution(incident, sign=1):
+    """Add (sign=1) or retract (sign=-1) a resolved incident's outcome; the caller commits
+
+    Incidents without an SLA target or resolution time are not counted. The change is one
+    upsert, so the checker and web workers resolving on the same day cannot lose updates.
+    """
+    if incident.sla_target is None or incident.resolved_at is None:
+        return
+    key = {'day': incident.resolved_at.date(), 'service_id': incident.service_id,
+           'severity': incident.severity or 'medium'}
+    upsert_increment(SlaCounter, key, {
+        'resolved_count': sign,
+        'met_count': sign if met_sla(incident) else 0,
+        'resolution_hours': sign * (incident.resolved_at - incident.created_at).total_seconds() / 3600
+    })
+
+def get_sla_compliance(days=None, service_id=None, severity=None, now=None):
+    """Resolved, met and compliance percent over the last `days` days (all time if None), by severity"""
+    query = db.session.query(
+        SlaCounter.severity,
+        db.func.sum(SlaCounter.resolved_count),
+        db.func.sum(SlaCounter.met_count),
+        db.func.sum(SlaCounter.resolution_hours)
+    )
+    if days is not None:
+        since = ((now or datetime.utcnow()) - timedelta(days=days)).date()
+        query = query.filter(SlaCounter.day > since)
+    if service_id is not None:
+        query = query.filter(SlaCounter.service_id == service_id)
+    if severity is not None:
+        query = query.filter(SlaCounter.severity == severity)
+
+    def summary(resolved, met, hours):
+        return {
+            'resolved': resolved,
+            'met': met,
+            'compliance_percent': round(met / resolved * 100, 1) if resolved else None,
+            'avg_resolution_hours': round(hours / resolved, 2) if resolved else None
+        }
+
+    by_severity = {}
+    totals = [0, 0, 0.0]
+    for row_severity, resolved, met, hours in query.group_by(SlaCounter.severity):
+        resolved, met, hours = int(resolved or 0), int(met or 0), hours or 0.0
+        by_severity[row_severity] = summary(resolved, met, hours)
+        totals[0] += resolved
+        totals[1] += met
+        totals[2] += hours
+    return dict(summary(*totals), by_severity=by_severity)
+
+def rebuild_sla_counters():
+    """Recompute every counter from the incidents table (used after bulk loads)"""
+    counters = {}
+    rows = db.session.query(Incident.service_id, Incident.severity, Incident.created_at,
+                            Incident.resolved_at, Incident.sla_target).filter(
+        Incident.status == 'resolved',
+        Incident.sla_target.isnot(None),
+        Incident.resolved_at.isnot(None)
+    )
+    for service_id, severity, created_at, resolved_at, sla_target in rows.yield_per(10000):
+        key = (resolved_at.date(), service_id, severity or 'medium')
+        counter = counters.get(key)
+        if counter is None:
+            counter = counters[key] = [0, 0, 0.0]
+        counter[0] += 1
+        counter[1] += 1 if resolved_at <= sla_target else 0
+        counter[2] += (resolved_at - created_at).total_seconds() / 3600
+
+    SlaCounter.query.delete()
+    db.session.bulk_insert_mappings(SlaCounter, [{
+        'day': day,
+        'service_id': service_id,
+        'severity': severity,
+        'resolved_count': resolved,
+        'met_count': met,
+        'resolution_hours': hours
+    } for (day, service_id, severity), (resolved, met, hours) in counters.items()])
+    db.session.commit()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Sliding-window probe counters for Cloud Health Dashboard Phase 2
+Per-service request, error and latency totals over recent windows (5m/1h/24h by default),
+kept in time-bucketed ring arrays so each probe is an O(1) update and no metric scan is needed
+"""
+
+import threading
+from array import array
+
+WINDOW_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+def parse_window(spec):
+    """Window length in seconds from a spec like '300', '5m', '1h' or '24h'"""
+    spec = spec.strip().lower()
+    if spec[-1:] in WINDOW_UNITS:
+        return int(float(spec[:-1]) * WINDOW_UNITS[spec[-1]])
+    return int(spec)
+
+def parse_windows(specs):
+    """Window name -> seconds from a comma-separated string or a list of specs"""
+    if isinstance(specs, str):
+        specs = specs.split(',')
+    return {spec.strip(): parse_window(spec) for spec in specs if spec.strip()}
+
+class SlidingWindow:
+    """Request, error and latency totals over the last `seconds`, in `buckets` ring slots"""
+    __slots__ = ('seconds', 'bucket_seconds', 'size', 'head', 'counts', 'errors', 'latency',
+                 'total_count', 'total_errors', 'total_latency')
+
+    def __init__(self, seconds, buckets=60):
+        self.size = max(1, buckets)
+        self.seconds = seconds
+        self.bucket_seconds = seconds / self.size
+        self.head = None  # absolute index of the newest bucket
+        self.counts = array('l', [0]) * self.size
+        self.errors = array('l', [0]) * self.size
+        self.latency = array('d', [0.0]) * self.size
+        self.total_count = 0
+        self.total_errors = 0
+        self.total_latency = 0.0
+
+    def _advance(self, now):
+        """Expire buckets that slid out of the window; amortized O(1) per bucket of elapsed time"""
+        index = int(now // self.bucket_seconds)
+        if index == self.head:
+            return index
+        if self.head is None or index - self.head >= self.size:
+            for slot in range(self.size):
+                self.counts[slot] = self.errors[slot] = 0
+                self.latency[slot] = 0.0
+            self.total_count = self.total_errors = 0
+            self.total_latency = 0.0
+        elif index > self.head:
+            for absolute in range(self.head + 1, index + 1):
+                slot = absolute % self.size
+                self.total_count -= self.counts[slot]
+                self.total_errors -= self.errors[slot]
+                self.total_latency -= self.latency[slot]
+                self.counts[slot] = self.errors[slot] = 0
+                self.latency[slot] = 0.0
+        else:
+            return index  # a late sample from the clock going back
+        self.head = index
+        return index
+
+    def add(self, now, latency, error=False):
+        slot = self._advance(now) % self.size
+        self.counts[slot] += 1
+        self.total_count += 1
+        if error:
+            self.errors[slot] += 1
+            self.total_errors += 1
+        else:
+            self.latency[slot] += latency
+            self.total_latency += latency
+
+    def totals(self, now):
+        """(requests, errors, latency sum of successful requests) in the window ending at now"""
+        self._advance(now)
+        return self.total_count, self.total_errors, max(self.total_latency, 0.0)
+
+class ServiceWindows:
+    """The configured windows for one service"""
+
+    def __init__(self, windows, buckets=60):
+        self.windows = {name: SlidingWindow(seconds, buckets) for name, seconds in windows.items()}
+
+    def record(self, now, latency, error=False):
+        for window in self.windows.values():
+            window.add(now, latency, error)
+
+    def stats(self, name, now):
+        """Requests, errors, error rate (%) and mean latency for one window; rates are None when empty"""
+        requests, errors, latency_sum = self.windows[name].totals(now)
+        successes = requests - errors
+        return {
+            'requests': requests,
+            'errors': errors,
+            'error_rate': round(errors / requests * 100, 2) if requests else None,
+            'avg_response_time': round(latency_sum / successes, 4) if successes else None
+        }
+
+    def snapshot(self, now):
+        return {name: self.stats(name, now) for name in self.windows}
+
+class WindowRegistry:
+    """ServiceWindows per service id, created on first probe"""
+
+    def __init__(self, windows, buckets=60):
+        self.windows = windows
+        self.buckets = buckets
+        self._services = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        windows = parse_windows(config['STATS_WINDOWS'])
+        alert_window = config['ALERT_ERROR_RATE_WINDOW']
+        windows.setdefault(alert_window, parse_window(alert_window))  # the alert window is always kept
+        return cls(windows, config['STATS_WINDOW_BUCKETS'])
+
+    def get(self, service_id):
+        service_windows = self._services.get(service_id)
+        if service_windows is None:
+            with self._lock:
+                service_windows = self._services.setdefault(
+                    service_id, ServiceWindows(self.windows, self.buckets))
+        return service_windows
+
+def get_window_registry(app):
+    """The app's sliding-window registry, created from its config on first use"""
+    registry = app.extensions.get('window_registry')
+    if registry is None:
+        registry = app.extensions['window_registry'] = WindowRegistry.from_config(app.config)
+    return registry
@@ -0,0 +1,28 @@
+"""
+Shared fixtures for the Cloud Health Dashboard Phase 2 unit tests
+"""
+
+import pytest
+
+@pytest.fixture
+def app(tmp_path):
+    """An app on a fresh SQLite file with every table created"""
+    from app import create_app
+    from extensions import db
+
+    app = create_app('testing', DATABASE_URL=f'sqlite:///{tmp_path / "test.db"}')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def service(app):
+    from extensions import db
+    from models import Service
+
+    service = Service(name='api', url='http://127.0.0.1:1/', service_type='api',
+                      cost_per_request=0.001, cost_per_gb_hour=0.1)
+    db.session.add(service)
+    db.session.commit()
+    return service
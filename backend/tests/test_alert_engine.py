@@ -0,0 +1,71 @@
+"""
+Tests for alert hysteresis, deduplication and escalation
+"""
+
+from datetime import datetime
+import pytest
+from alert_engine import AlertStateEngine, alert_dedup_key
+from extensions import db
+from models import Alert
+
+NOW = datetime(2024, 5, 1, 10, 0)
+
+@pytest.fixture
+def engine(app):
+    return AlertStateEngine(fire_after=3, resolve_after=2, escalate_after=2, max_escalation=3)
+
+def _feed(engine, service, pattern, alert_type='response_time'):
+    """Observe a string of B (breach) / o (ok); returns what each observation wrote"""
+    written = []
+    for mark in pattern:
+        written.append(engine.observe(service, alert_type, breached=mark == 'B', value=5.0, threshold=2.0,
+                                      severity='high', message='slow', now=NOW))
+    db.session.commit()
+    return written
+
+def test_fires_only_after_consecutive_breaches(engine, service):
+    assert _feed(engine, service, 'BBoBB') == [None] * 5
+    assert Alert.query.count() == 0
+    fired = _feed(engine, service, 'B')[0]
+    assert fired.status == 'firing'
+    assert fired.dedup_key == alert_dedup_key(service.id, 'response_time')
+    assert fired.breach_count == 3
+
+def test_further_breaches_reuse_the_firing_alert_and_escalate(engine, service):
+    fired = _feed(engine, service, 'BBB')[2]
+    assert fired.escalation_level == 1
+    levels = []
+    for _ in range(6):
+        alert = _feed(engine, service, 'B')[0]
+        levels.append(alert.escalation_level if alert is not None else None)
+    # Every escalate_after breaches, capped at max_escalation
+    assert levels == [None, 2, None, 3, None, None]
+    assert Alert.query.count() == 1
+
+def test_resolves_after_consecutive_recoveries(engine, service):
+    fired = _feed(engine, service, 'BBB')[2]
+    assert _feed(engine, service, 'oBo') == [None] * 3  # a breach resets the recovery count
+    resolved = _feed(engine, service, 'o')[0]
+    assert resolved.id == fired.id
+    assert resolved.status == 'resolved'
+    assert alert_dedup_key(service.id, 'response_time') not in engine.tracked_keys()
+
+def test_refires_as_a_new_alert_after_clearing(engine, service):
+    first = _feed(engine, service, 'BBBoo')[2]
+    assert _feed(engine, service, 'BB') == [None, None]  # hysteresis applies again
+    second = _feed(engine, service, 'B')[0]
+    assert second.id != first.id
+    assert [alert.status for alert in Alert.query.order_by(Alert.id)] == ['resolved', 'firing']
+
+def test_alert_types_are_deduplicated_separately(engine, service):
+    _feed(engine, service, 'BBB', 'response_time')
+    _feed(engine, service, 'BBB', 'error_rate')
+    assert sorted(alert.type for alert in Alert.query) == ['error_rate', 'response_time']
+
+def test_firing_alerts_are_resumed_from_the_database(app, engine, service):
+    fired = _feed(engine, service, 'BBB')[2]
+    restarted = AlertStateEngine(fire_after=3, resolve_after=2)
+    assert alert_dedup_key(service.id, 'response_time') in restarted.tracked_keys()
+    assert _feed(restarted, service, 'B') == [None]  # no duplicate row
+    assert _feed(restarted, service, 'oo')[1].id == fired.id
+    assert Alert.query.count() == 1
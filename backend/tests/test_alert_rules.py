@@ -0,0 +1,98 @@
+"""
+Tests for compiling and evaluating alert rules
+"""
+
+from datetime import datetime
+import pytest
+from alert_rules import AlertRuleEngine, Observation, RuleError, compile_rule, compile_thresholds
+from extensions import db
+from models import Alert, Service
+
+NOW = datetime(2024, 5, 1, 10, 0)
+
+def test_legacy_and_dict_rules(app):
+    rule = compile_rule('response_time', 2.0, app.config)
+    assert (rule.metric, rule.aggregation, rule.window, rule.comparison, rule.threshold) == (
+        'response_time', 'last', None, '>', 2.0)
+    rule = compile_rule('error_rate', {'threshold': 5, 'comparison': '>='}, app.config)
+    assert (rule.aggregation, rule.window, rule.comparison) == ('rate', app.config['ALERT_ERROR_RATE_WINDOW'], '>=')
+    rule = compile_rule('p95_response_time', 1.5, app.config)
+    assert (rule.aggregation, rule.window) == ('p95', app.config['ALERT_PERCENTILE_WINDOW'])
+
+def test_windows_are_normalised_to_the_registry_names(app):
+    assert compile_rule('error_rate', {'threshold': 5, 'window': '300'}, app.config).window == '5m'
+    assert compile_rule('error_rate', {'threshold': 5, 'window': 3600}, app.config).window == '1h'
+    assert compile_rule('p99_response_time', {'threshold': 1, 'window': '60m'}, app.config).window == '1h'
+    # Percentiles come from rollup sketches, so any span works for them
+    assert compile_rule('p99_response_time', {'threshold': 1, 'window': '7d'}, app.config).window == '7d'
+
+@pytest.mark.parametrize('key, spec', [
+    ('error_rate', {'threshold': 5, 'window': '10m'}),  # not a kept sliding window
+    ('error_rate', {'threshold': 5, 'window': 'soon'}),
+    ('response_time', {'threshold': 1, 'aggregation': 'avg', 'window': '2h'}),
+    ('response_time', {'threshold': 1, 'comparison': '=='}),
+    ('response_time', {'threshold': 'slow'}),
+    ('cost', {'threshold': 1, 'aggregation': 'rate'}),
+    ('disk', 1),
+])
+def test_invalid_rules_raise(app, key, spec):
+    with pytest.raises(RuleError):
+        compile_rule(key, spec, app.config)
+
+def test_invalid_entries_are_skipped(app):
+    rules = compile_thresholds({'response_time': 2, 'error_rate': {'threshold': 5, 'window': '10m'}}, app.config)
+    assert [rule.key for rule in rules] == ['response_time']
+
+def _services(thresholds):
+    services = []
+    for i, spec in enumerate(thresholds):
+        service = Service(name=f'svc{i}', url=f'http://127.0.0.1:1/{i}', alert_thresholds=spec)
+        db.session.add(service)
+        services.append(service)
+    db.session.commit()
+    return services
+
+def test_rules_with_one_signature_share_a_group(app):
+    services = _services([{'response_time': 1.0}, {'response_time': 2.0},
+                          {'response_time': {'threshold': 3.0, 'comparison': '<'}}, {'cost': 0.1}])
+    engine = AlertRuleEngine(app)
+    engine.sync(services)
+    sizes = sorted((group.metric, group.compare.__name__, len(group.service_ids)) for group in engine._groups)
+    assert sizes == [('cost', 'gt', 1), ('response_time', 'gt', 2), ('response_time', 'lt', 1)]
+
+    services[3].alert_thresholds = {'cost': 0.2}
+    engine.sync(services[:3] + [services[3]])
+    assert len(engine._groups) == 3
+    engine.sync(services[:3])
+    assert len(engine._groups) == 2
+
+def test_comparisons_and_missing_observations(app):
+    app.config['ALERT_FIRE_AFTER'] = 1
+    app.extensions.pop('alert_engine', None)
+    above, at, below, silent = _services([
+        {'response_time': 1.0}, {'response_time': {'threshold': 1.0, 'comparison': '>='}},
+        {'response_time': {'threshold': 1.0, 'comparison': '<='}}, {'response_time': 1.0}])
+    observations = {
+        above.id: Observation(1.5, 0.0, 200, False),
+        at.id: Observation(1.0, 0.0, 200, False),
+        below.id: Observation(1.0, 0.0, 200, False),
+        # silent has no observation; a failed probe has no response time to compare
+    }
+    engine = AlertRuleEngine(app)
+    assert engine.evaluate([above, at, below, silent], observations, NOW) == 3
+    db.session.commit()
+    assert sorted(alert.service_id for alert in Alert.query) == sorted([above.id, at.id, below.id])
+
+    # Missing values are neither breaches nor recoveries: firing alerts stay as they are
+    failed = {above.id: Observation(None, None, 0, True)}
+    assert engine.evaluate([above, at, below, silent], failed, NOW) == 0
+    assert {alert.status for alert in Alert.query} == {'firing'}
+
+def test_suppressed_services_are_skipped(app):
+    app.config['ALERT_FIRE_AFTER'] = 1
+    app.extensions.pop('alert_engine', None)
+    service, = _services([{'response_time': 1.0}])
+    engine = AlertRuleEngine(app)
+    assert engine.evaluate([service], {service.id: Observation(5.0, 0, 200, False)}, NOW,
+                           suppressed={service.id}) == 0
+    assert Alert.query.count() == 0
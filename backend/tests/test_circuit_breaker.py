@@ -0,0 +1,64 @@
+"""
+Tests for the per-service circuit breaker
+"""
+
+from datetime import datetime, timedelta
+from circuit_breaker import breaker_status, probe_timeout, record_probe_result
+from models import Service
+
+CONFIG = {'BREAKER_FAILURE_THRESHOLD': 3, 'BREAKER_OPEN_INTERVAL': 60, 'BREAKER_MAX_INTERVAL': 200,
+          'BREAKER_PROBE_TIMEOUT': 2}
+NOW = datetime(2024, 5, 1, 10, 0)
+
+def _service():
+    return Service(name='api', url='http://127.0.0.1:1/', breaker_state='closed', breaker_failures=0)
+
+def _fail(service, times, now=NOW):
+    for _ in range(times):
+        record_probe_result(service, True, now, CONFIG)
+
+def test_opens_after_consecutive_failures():
+    service = _service()
+    _fail(service, 2)
+    assert service.breaker_state == 'closed'
+    record_probe_result(service, False, NOW, CONFIG)  # a success resets the count
+    _fail(service, 2)
+    assert service.breaker_state == 'closed'
+    _fail(service, 1)
+    assert service.breaker_state == 'open'
+    assert service.breaker_next_probe_at == NOW + timedelta(seconds=60)
+    assert breaker_status(service) == {'state': 'open', 'consecutive_failures': 3,
+                                       'next_probe_at': (NOW + timedelta(seconds=60)).isoformat()}
+
+def test_closed_breaker_uses_the_default_timeout():
+    assert probe_timeout(_service(), NOW, CONFIG, default_timeout=10) == 10
+
+def test_open_breaker_skips_probes_until_the_half_open_probe_is_due():
+    service = _service()
+    _fail(service, 3)
+    assert probe_timeout(service, NOW + timedelta(seconds=59), CONFIG, default_timeout=10) is None
+    assert service.breaker_state == 'open'
+    assert probe_timeout(service, NOW + timedelta(seconds=60), CONFIG, default_timeout=10) == 2
+    assert service.breaker_state == 'half_open'
+    assert probe_timeout(service, NOW, CONFIG, default_timeout=1) == 1  # never longer than the default
+
+def test_failed_half_open_probe_reopens_with_backoff():
+    service = _service()
+    _fail(service, 3)
+    intervals = []
+    for _ in range(3):
+        due = service.breaker_next_probe_at
+        assert probe_timeout(service, due, CONFIG, default_timeout=10) == 2
+        record_probe_result(service, True, due, CONFIG)
+        assert service.breaker_state == 'open'
+        intervals.append((service.breaker_next_probe_at - due).total_seconds())
+    assert intervals == [120, 200, 200]  # doubled, capped at BREAKER_MAX_INTERVAL
+
+def test_successful_half_open_probe_closes():
+    service = _service()
+    _fail(service, 3)
+    probe_timeout(service, service.breaker_next_probe_at, CONFIG, default_timeout=10)
+    record_probe_result(service, False, NOW, CONFIG)
+    assert service.breaker_state == 'closed'
+    assert (service.breaker_failures, service.breaker_interval, service.breaker_next_probe_at) == (0, None, None)
+    assert probe_timeout(service, NOW, CONFIG, default_timeout=10) == 10
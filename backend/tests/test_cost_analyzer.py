@@ -0,0 +1,56 @@
+"""
+Tests for the closed-day cost summary cache
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from checker import run_housekeeping
+from cost_analyzer import CostAnalyzer, get_cost_summary_cache
+from cost_rollups import record_cost_rollup
+from extensions import db
+from models import CostCacheEntry
+
+def _stale_entry():
+    with Session(db.engine) as other:
+        other.add(CostCacheEntry(cache_key='daily_costs:0:7:2000-01-01', as_of_date=datetime(2000, 1, 1).date(),
+                                 payload={}))
+        other.commit()
+
+def test_cache_built_from_app_config(app):
+    app.config['COST_CACHE_MAX_ENTRIES'] = 7
+    app.extensions.pop('cost_summary_cache', None)
+    cache = get_cost_summary_cache(app)
+    assert cache.max_entries == 7
+    assert CostAnalyzer().cache is cache
+
+def test_miss_persists_without_touching_the_request_session(app, service):
+    record_cost_rollup(service.id, datetime.utcnow() - timedelta(days=2), 0.5)
+    db.session.commit()
+    _stale_entry()
+    cache = get_cost_summary_cache(app)
+    cache.clear()
+
+    service.name = 'renamed'  # pending change of the request, not flushed yet
+    with db.session.no_autoflush:
+        payload = cache.get_closed_days(service.id, 7)
+    assert sum(day['count'] for day in payload.values()) == 1
+    assert service in db.session.dirty
+    db.session.rollback()
+    assert service.name == 'api'
+
+    with Session(db.engine) as other:
+        keys = {entry.cache_key for entry in other.query(CostCacheEntry)}
+    # The read path stores its entry and leaves pruning to the checker
+    assert len(keys) == 2
+
+    cache.clear()
+    assert cache.get_closed_days(service.id, 7) == payload
+    assert cache.persistent_hits == 1
+
+def test_housekeeping_prunes_previous_days(app, service):
+    _stale_entry()
+    get_cost_summary_cache(app).get_closed_days(service.id, 7)
+
+    run_housekeeping(app)
+
+    assert [entry.as_of_date for entry in CostCacheEntry.query] == [datetime.utcnow().date()]
@@ -0,0 +1,54 @@
+"""
+Tests for the cost rollup upsert and the last-hour cost total
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from cost_rollups import get_total_cost, record_cost_rollup
+from extensions import db
+from latency_sketch import LatencySketch
+from models import CostRollup, Metric
+
+def test_rollup_counters_accumulate(app, service):
+    now = datetime(2024, 5, 1, 10, 15)
+    record_cost_rollup(service.id, now, 0.5, response_time=0.1)
+    record_cost_rollup(service.id, now + timedelta(minutes=5), 0.25, response_time=0.3)
+    record_cost_rollup(service.id, now + timedelta(minutes=10), 0.0, error=True)
+    db.session.commit()
+
+    rows = CostRollup.query.filter_by(service_id=service.id).all()
+    assert sorted(row.period for row in rows) == ['day', 'hour']
+    for row in rows:
+        assert row.total_cost == 0.75
+        assert row.request_count == 3
+        assert row.error_count == 1
+        assert LatencySketch.from_dict(row.latency_sketch).count == 2
+
+def test_rollup_bucket_created_by_another_process(app, service):
+    """The first row of a bucket inserted elsewhere after we looked must not abort our probe"""
+    now = datetime(2024, 5, 1, 10, 15)
+    with Session(db.engine) as other:
+        other.add(CostRollup(service_id=service.id, period='hour', bucket_start=now.replace(minute=0),
+                             total_cost=1.0, request_count=4, error_count=0))
+        other.commit()
+
+    record_cost_rollup(service.id, now, 0.5, response_time=0.2)
+    db.session.commit()
+
+    hour = CostRollup.query.filter_by(service_id=service.id, period='hour').one()
+    assert (hour.total_cost, hour.request_count) == (1.5, 5)
+
+def test_total_cost_adds_raw_tail_before_first_whole_hour(app, service):
+    now = datetime(2024, 5, 1, 10, 20)
+    since = now - timedelta(hours=1)  # 09:20
+    for minute in range(0, 80, 10):  # 09:00 .. 10:10
+        timestamp = datetime(2024, 5, 1, 9, 0) + timedelta(minutes=minute)
+        db.session.add(Metric(service_id=service.id, timestamp=timestamp, response_time=0.1,
+                              status_code=200, error=False, cost=1.0))
+        record_cost_rollup(service.id, timestamp, 1.0, response_time=0.1)
+    db.session.commit()
+
+    # 09:20, 09:30, 09:40, 09:50 from raw metrics; 10:00 and 10:10 from the 10:00 bucket
+    assert get_total_cost(since, now) == 6.0
+    # Sampled metrics: 40 of the 09:00 bucket's 60 minutes are inside the window
+    assert round(get_total_cost(since, now, raw_tail=False), 6) == round(2 + 6 * 40 / 60, 6)
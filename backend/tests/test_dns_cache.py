@@ -0,0 +1,141 @@
+"""
+Tests for the checker DNS cache
+"""
+
+import socket
+import struct
+import threading
+from types import SimpleNamespace
+import pytest
+import dns_cache
+from dns_cache import (QTYPE_A, QTYPE_AAAA, QTYPE_CNAME, QTYPE_SOA, RCODE_NXDOMAIN, DnsCache, DnsLookupError,
+                       build_query, parse_response)
+
+QUERY_ID = 0x1234
+
+def _record(rtype, ttl, rdata):
+    return b'\xc0\x0c' + struct.pack('!HHIH', rtype, 1, ttl, len(rdata)) + rdata
+
+def _response(answers=(), authorities=(), rcode=0, flags=0x8180):
+    question = build_query('api.example.com', QTYPE_A, QUERY_ID)[12:]
+    header = struct.pack('!HHHHHH', QUERY_ID, flags | rcode, 1, len(answers), len(authorities), 0)
+    return header + question + b''.join(answers) + b''.join(authorities)
+
+def _soa(ttl, minimum):
+    return _record(QTYPE_SOA, ttl, b'\x00\x00' + struct.pack('!IIIII', 1, 7200, 3600, 1209600, minimum))
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+class _InlineThread:
+    def __init__(self, target, args, **kwargs):
+        self.target, self.args = target, args
+
+    def start(self):
+        self.target(*self.args)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(dns_cache, 'time', clock)
+    monkeypatch.setattr(dns_cache, 'threading', SimpleNamespace(Lock=threading.Lock, Thread=_InlineThread))
+    return clock
+
+def _cache(monkeypatch, answers, system=None, **kwargs):
+    """A cache whose nameserver query pops answers and whose system resolver returns system"""
+    cache = DnsCache(nameservers=['192.0.2.53'], hosts=set(), min_ttl=5, max_ttl=3600, default_ttl=60,
+                     negative_ttl=30, refresh_ahead=0.1, **kwargs)
+    cache.queries = 0
+
+    def query(name):
+        cache.queries += 1
+        return answers.pop(0)
+
+    def resolve(host, port, socktype=socket.SOCK_STREAM):
+        if system is None:
+            raise socket.gaierror(socket.EAI_NONAME, 'unknown host')
+        return [(socket.AF_INET, socktype, 6, '', (system, port))]
+
+    monkeypatch.setattr(cache, '_query', query)
+    monkeypatch.setattr(dns_cache, 'system_resolve', resolve)
+    return cache
+
+def test_parse_response_addresses_and_min_ttl():
+    data = _response([_record(QTYPE_CNAME, 120, b'\x03lb1\xc0\x0c'),
+                      _record(QTYPE_A, 300, socket.inet_aton('10.0.0.1')),
+                      _record(QTYPE_AAAA, 600, socket.inet_pton(socket.AF_INET6, '2001:db8::1'))])
+    rcode, addresses, ttl, negative_ttl = parse_response(data, QUERY_ID)
+    assert rcode == 0
+    assert addresses == [(socket.AF_INET, '10.0.0.1'), (socket.AF_INET6, '2001:db8::1')]
+    assert ttl == 120  # the CNAME expires the chain first
+    assert negative_ttl is None
+
+def test_parse_response_negative_ttl_from_soa():
+    rcode, addresses, ttl, negative_ttl = parse_response(_response(authorities=[_soa(900, 45)], rcode=RCODE_NXDOMAIN),
+                                                         QUERY_ID)
+    assert (rcode, addresses, ttl, negative_ttl) == (RCODE_NXDOMAIN, [], None, 45)
+
+@pytest.mark.parametrize('data, query_id', [
+    (b'\x12\x34', QUERY_ID),
+    (_response(), QUERY_ID + 1),
+    (_response(flags=0x8380), QUERY_ID),
+    (_response([_record(QTYPE_A, 300, socket.inet_aton('10.0.0.1'))])[:-8], QUERY_ID),
+])
+def test_parse_response_rejects_unusable_replies(data, query_id):
+    with pytest.raises(DnsLookupError):
+        parse_response(data, query_id)
+
+@pytest.mark.parametrize('ttl, expected', [(1, 5), (300, 300), (86400, 3600)])
+def test_answer_ttl_is_clamped(monkeypatch, clock, ttl, expected):
+    cache = _cache(monkeypatch, [([(socket.AF_INET, '10.0.0.1')], ttl, None)])
+    assert cache.resolve('api.example.com', 443)[0][4] == ('10.0.0.1', 443)
+    assert cache._entries['api.example.com'].ttl == expected
+
+def test_nxdomain_falls_back_to_the_system_resolver(monkeypatch, clock):
+    cache = _cache(monkeypatch, [([], None, 20)], system='10.0.0.9')
+    assert cache.resolve('api.internal', 80)[0][4] == ('10.0.0.9', 80)
+    assert cache._entries['api.internal'].ttl == 60
+
+def test_negative_entry_only_after_both_resolvers_fail(monkeypatch, clock):
+    cache = _cache(monkeypatch, [([], None, 20), ([], None, 300)])
+    with pytest.raises(socket.gaierror):
+        cache.resolve('gone.example.com', 80)
+    assert cache._entries['gone.example.com'].ttl == 20
+    clock.now += 19
+    with pytest.raises(socket.gaierror):
+        cache.resolve('gone.example.com', 80)
+    assert (cache.queries, cache.negative_hits) == (1, 1)
+
+    clock.now += 1
+    with pytest.raises(socket.gaierror):
+        cache.resolve('gone.example.com', 80)
+    assert cache.queries == 2
+    assert cache._entries['gone.example.com'].ttl == 30  # the SOA's TTL is capped by DNS_CACHE_NEGATIVE_TTL
+
+def test_servfail_falls_back_to_the_system_resolver(monkeypatch, clock):
+    cache = _cache(monkeypatch, [], system='10.0.0.9')
+
+    def servfail(name):
+        raise DnsLookupError('DNS rcode 2 from 192.0.2.53')
+
+    monkeypatch.setattr(cache, '_query', servfail)
+    assert cache.resolve('api.example.com', 80)[0][4] == ('10.0.0.9', 80)
+
+def test_refresh_ahead_near_expiry(monkeypatch, clock):
+    cache = _cache(monkeypatch, [([(socket.AF_INET, '10.0.0.1')], 100, None),
+                                 ([(socket.AF_INET, '10.0.0.2')], 100, None)])
+    cache.resolve('api.example.com', 80)
+    clock.now += 89
+    assert cache.resolve('api.example.com', 80)[0][4] == ('10.0.0.1', 80)
+    assert cache.refreshes == 0
+
+    clock.now += 2  # inside the last 10% of the TTL
+    assert cache.resolve('api.example.com', 80)[0][4] == ('10.0.0.1', 80)
+    assert cache.refreshes == 1
+    assert cache.resolve('api.example.com', 80)[0][4] == ('10.0.0.2', 80)
+    assert cache._entries['api.example.com'].expires_at == clock.now + 100
+    assert cache.stats()['misses'] == 1
@@ -0,0 +1,77 @@
+"""
+Tests for the DDSketch latency quantiles
+"""
+
+import json
+import random
+import pytest
+from latency_sketch import LatencySketch, merge_sketches, percentile_threshold
+
+QUANTILES = (0.0, 0.1, 0.5, 0.9, 0.95, 0.99, 0.999, 1.0)
+
+def _values(seed, n=5000):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(-2.5, 1.2) for _ in range(n)]
+
+def _sketch(values):
+    sketch = LatencySketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+def _exact(values, q):
+    """The element the sketch's rank q * (n - 1) refers to"""
+    return sorted(values)[int(q * (len(values) - 1))]
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_quantiles_within_relative_accuracy(seed):
+    values = _values(seed)
+    sketch = _sketch(values)
+    for q in QUANTILES:
+        exact = _exact(values, q)
+        assert abs(sketch.quantile(q) - exact) <= sketch.relative_accuracy * exact + 1e-12, q
+    assert sketch.count == len(values)
+    assert sketch.mean() == pytest.approx(sum(values) / len(values), rel=sketch.relative_accuracy)
+
+def test_tiny_values_land_in_the_zero_bin():
+    sketch = _sketch([0.0, 1e-9, 0.5, 0.5])
+    assert sketch.zero_count == 2
+    assert sketch.quantile(0.25) == 0.0
+    assert sketch.quantile(1.0) == pytest.approx(0.5, rel=0.01)
+    assert LatencySketch().quantile(0.5) is None
+
+def test_merge_is_associative_and_matches_one_sketch():
+    parts = [_values(seed, 1000) for seed in (4, 5, 6)]
+    a, b, c = (_sketch(values) for values in parts)
+    left = _sketch(parts[0]).merge(_sketch(parts[1])).merge(_sketch(parts[2]))
+    right = a.merge(b.merge(c))
+    whole = _sketch(parts[0] + parts[1] + parts[2])
+    for sketch in (left, right):
+        assert sketch.to_dict() == whole.to_dict()
+
+def test_merge_rejects_different_accuracy():
+    other = LatencySketch(relative_accuracy=0.02)
+    other.add(1.0)
+    with pytest.raises(ValueError):
+        _sketch([1.0]).merge(other)
+    assert _sketch([1.0]).merge(None).count == 1
+
+def test_bins_stay_bounded():
+    sketch = LatencySketch(max_bins=64)
+    for value in _values(7):
+        sketch.add(value)
+    assert len(sketch.bins) <= 64
+    assert sketch.quantile(0.99) == pytest.approx(_exact(_values(7), 0.99), rel=0.01)
+
+def test_dict_round_trip_through_json():
+    sketch = _sketch(_values(8) + [0.0])
+    restored = LatencySketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    assert restored.to_dict() == sketch.to_dict()
+    assert restored.quantiles() == sketch.quantiles()
+    assert merge_sketches([sketch.to_dict(), None, sketch.to_dict()]).count == 2 * sketch.count
+    assert LatencySketch.from_dict(None).count == 0
+
+def test_percentile_threshold():
+    assert percentile_threshold('p95_response_time') == 0.95
+    assert percentile_threshold('p99.9_response_time') == pytest.approx(0.999)
+    assert percentile_threshold('response_time') is None
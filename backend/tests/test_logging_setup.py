@@ -0,0 +1,31 @@
+"""
+Tests for the bounded logging queue
+"""
+
+import logging
+import queue
+import threading
+from prometheus_client import REGISTRY
+from logging_setup import BoundedQueueHandler
+
+def _dropped_total():
+    return REGISTRY.get_sample_value('log_records_dropped_total') or 0.0
+
+def test_full_queue_drops_and_counts_from_every_thread():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+    before = _dropped_total()
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, 'message', None, None)
+
+    def emit_many():
+        for _ in range(500):
+            handler.emit(record)
+
+    threads = [threading.Thread(target=emit_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 8 * 500 - 1
+    assert _dropped_total() - before == 8 * 500 - 1
@@ -0,0 +1,87 @@
+"""
+Tests for login lockouts and the bounded password hashing executor
+"""
+
+import threading
+import pytest
+from auth import generate_token, hash_password
+from extensions import db
+from login_throttle import HashQueueFull, LoginThrottle, MemoryCounters, PasswordHasher
+from models import User
+
+def test_username_locks_after_max_attempts():
+    throttle = LoginThrottle(MemoryCounters(), max_attempts=3, max_attempts_per_ip=100, lockout_duration=60)
+    for _ in range(2):
+        throttle.failed('alice', '10.0.0.1')
+    assert throttle.locked_for('alice', '10.0.0.1') == 0
+    throttle.failed('Alice', '10.0.0.2')  # usernames are case-insensitive, from any address
+    assert 0 < throttle.locked_for('alice', '10.0.0.3') <= 60
+    assert throttle.locked_for('bob', '10.0.0.1') == 0
+
+def test_address_locks_across_usernames():
+    throttle = LoginThrottle(MemoryCounters(), max_attempts=100, max_attempts_per_ip=3, lockout_duration=60)
+    for name in ('a', 'b', 'c'):
+        throttle.failed(name, '10.0.0.1')
+    assert throttle.locked_for('d', '10.0.0.1') > 0
+    assert throttle.locked_for('d', '10.0.0.2') == 0
+
+def test_success_clears_the_username_only():
+    throttle = LoginThrottle(MemoryCounters(), max_attempts=2, max_attempts_per_ip=2, lockout_duration=60)
+    throttle.failed('alice', '10.0.0.1')
+    throttle.succeeded('alice')
+    throttle.failed('alice', '10.0.0.2')
+    assert throttle.locked_for('alice', '10.0.0.2') == 0
+    throttle.failed('bob', '10.0.0.1')
+    assert throttle.locked_for('carol', '10.0.0.1') > 0
+
+def test_counters_expire():
+    counters = MemoryCounters()
+    counters.incr('k', 10, now=100.0)
+    assert counters.get(['k'], now=105.0) == [(1, 5.0)]
+    assert counters.get(['k'], now=110.0) == [(0, 0)]
+    assert counters.incr('k', 10, now=111.0) == 1
+
+def test_hasher_sheds_when_its_queue_is_full():
+    hasher = PasswordHasher(workers=1, queue_depth=1, timeout=5)
+    release = threading.Event()
+    blocked = threading.Thread(target=hasher.run, args=(release.wait, 5))
+    blocked.start()
+    try:
+        while hasher.pending == 0:
+            release.wait(0.01)
+        with pytest.raises(HashQueueFull):
+            hasher.run(lambda: True)
+    finally:
+        release.set()
+        blocked.join(5)
+    assert hasher.run(lambda: 'ok') == 'ok'
+
+def test_login_route_locks_out_before_hashing(app):
+    app.config.update(MAX_LOGIN_ATTEMPTS=3, MAX_LOGIN_ATTEMPTS_PER_IP=100)
+    app.extensions.pop('login_throttle', None)
+    db.session.add(User(username='alice', email='alice@example.com', password_hash=hash_password('right')))
+    db.session.commit()
+    client = app.test_client()
+
+    statuses = [client.post('/api/auth/login', json={'username': 'alice', 'password': 'wrong'}).status_code
+                for _ in range(3)]
+    assert statuses == [401, 401, 401]
+    locked = client.post('/api/auth/login', json={'username': 'alice', 'password': 'right'})
+    assert locked.status_code == 429
+    assert int(locked.headers['Retry-After']) > 0
+
+def test_profile_password_change_goes_through_the_hasher(app):
+    user = User(username='alice', email='alice@example.com', password_hash=hash_password('old'))
+    db.session.add(user)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {generate_token(user.id, user.username, user.role)}'}
+    client = app.test_client()
+
+    app.extensions['password_hasher'] = PasswordHasher(workers=1, queue_depth=0)
+    busy = client.put('/api/auth/profile', json={'password': 'new'}, headers=headers)
+    assert busy.status_code == 503
+    assert busy.headers['Retry-After'] == '1'
+
+    app.extensions['password_hasher'] = PasswordHasher(workers=1, queue_depth=1)
+    assert client.put('/api/auth/profile', json={'password': 'new'}, headers=headers).status_code == 200
+    assert client.post('/api/auth/login', json={'username': 'alice', 'password': 'new'}).status_code == 200
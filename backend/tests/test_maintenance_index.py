@@ -0,0 +1,81 @@
+"""
+Tests for maintenance window parsing and index lookups
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from extensions import db
+from maintenance_index import (MINUTES_PER_DAY, MINUTES_PER_WEEK, Intervals, MaintenanceIndex,
+                               maintenance_probe_due, parse_maintenance_window)
+from models import Maintenance
+
+SUNDAY = 6 * MINUTES_PER_DAY
+
+def test_parse_single_window():
+    assert parse_maintenance_window('Sun 2:00-4:00 UTC') == [(SUNDAY + 120, SUNDAY + 240)]
+    assert parse_maintenance_window('sunday 02:00 - 04:00') == [(SUNDAY + 120, SUNDAY + 240)]
+
+def test_parse_ranges_lists_and_midnight_wrap():
+    assert len(parse_maintenance_window('Mon-Fri 1:00-2:00')) == 5
+    assert len(parse_maintenance_window('Weekends 0:00-1:00; Wed 3:00-3:30')) == 3
+    assert [day for day, _ in parse_maintenance_window('Fri-Mon 0:00-0:10')] == [
+        4 * MINUTES_PER_DAY, 5 * MINUTES_PER_DAY, 6 * MINUTES_PER_DAY, 0]
+    # Sunday 23:00 to Monday 01:00 wraps around the end of the week
+    assert parse_maintenance_window('Sun 23:00-1:00') == [(SUNDAY + 1380, MINUTES_PER_WEEK), (0, 60)]
+
+@pytest.mark.parametrize('text', ['Someday 1:00-2:00', 'Sun 25:00-26:00', 'Sun 1:75-2:00', 'Sun 2pm'])
+def test_parse_rejects_garbage(text):
+    with pytest.raises(ValueError):
+        parse_maintenance_window(text)
+
+def test_intervals_merge_and_half_open_lookup():
+    intervals = Intervals([(10, 20), (15, 30), (30, 35), (50, 60)])
+    assert len(intervals) == 2
+    assert [point in intervals for point in (9, 10, 34, 35, 49, 50, 59, 60)] == [
+        False, True, True, False, False, True, True, False]
+    assert 0 not in Intervals()
+
+def test_index_recurring_and_scheduled_lookups(app, service):
+    service.maintenance_window = 'Sun 2:00-4:00 UTC'
+    start = datetime(2024, 5, 1, 12, 0)  # a Wednesday
+    db.session.add(Maintenance(service_id=service.id, title='upgrade', start_time=start,
+                               end_time=start + timedelta(hours=1)))
+    db.session.add(Maintenance(service_id=service.id, title='done', start_time=start + timedelta(hours=3),
+                               end_time=start + timedelta(hours=4), status='completed'))
+    db.session.commit()
+    index = MaintenanceIndex(refresh_interval=3600)
+
+    assert index.in_maintenance(service.id, start + timedelta(minutes=30))
+    assert not index.in_maintenance(service.id, start + timedelta(hours=3, minutes=30))  # completed
+    sunday = datetime(2024, 5, 5, 3, 59)
+    assert index.in_maintenance(service.id, sunday)
+    assert not index.in_maintenance(service.id, sunday + timedelta(minutes=1))
+    assert not index.in_maintenance(service.id + 1, sunday)
+    assert index.stats()['lookups'] == 5
+    assert index.stats()['matches'] == 2
+
+def test_index_reloads_only_when_due_or_invalidated(app, service):
+    index = MaintenanceIndex(refresh_interval=3600)
+    now = datetime(2024, 5, 5, 3, 0)
+    assert not index.in_maintenance(service.id, now)
+
+    service.maintenance_window = 'Sun 2:00-4:00'
+    db.session.commit()
+    assert not index.in_maintenance(service.id, now)  # still the cached index
+    index.invalidate()
+    assert index.in_maintenance(service.id, now)
+
+def test_invalid_window_is_skipped(app, service):
+    service.maintenance_window = 'whenever'
+    db.session.commit()
+    index = MaintenanceIndex()
+    assert not index.in_maintenance(service.id, datetime(2024, 5, 5, 3, 0))
+    assert index.stats()['recurring_services'] == 0
+
+def test_maintenance_probe_due(service):
+    now = datetime(2024, 5, 5, 3, 0)
+    service.last_check = now - timedelta(seconds=299)
+    assert not maintenance_probe_due(service, now, 300)
+    service.last_check = now - timedelta(seconds=300)
+    assert maintenance_probe_due(service, now, 300)
+    assert not maintenance_probe_due(service, now, 0)
@@ -0,0 +1,46 @@
+"""
+Tests for change-only probe metric persistence
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+from checker import persist_metric
+from extensions import db
+from models import Metric
+
+OUTCOMES = ('all', 'transition', 'sample', 'skipped')
+
+def _rows_counted():
+    return {outcome: REGISTRY.get_sample_value('probe_metric_rows_total', {'outcome': outcome}) or 0
+            for outcome in OUTCOMES}
+
+def _persist(service, previous_status):
+    before = _rows_counted()
+    stored = persist_metric(Metric(service_id=service.id, response_time=10), service, previous_status)
+    db.session.commit()
+    after = _rows_counted()
+    return stored, {outcome: after[outcome] - before[outcome] for outcome in OUTCOMES if after[outcome] != before[outcome]}
+
+def test_every_probe_stored_by_default(app, service):
+    assert _persist(service, service.status) == (True, {'all': 1})
+    assert Metric.query.count() == 1
+
+@pytest.mark.parametrize('ratio', [0.0, 1.0])
+def test_status_change_always_stored(app, service, ratio):
+    app.config.update(METRIC_PERSISTENCE='changes', METRIC_SAMPLE_RATIO=ratio)
+    previous_status = service.status
+    service.status = 'down' if previous_status != 'down' else 'up'
+    assert _persist(service, previous_status) == (True, {'transition': 1})
+    assert Metric.query.count() == 1
+
+def test_steady_state_skipped_at_ratio_zero(app, service):
+    app.config.update(METRIC_PERSISTENCE='changes', METRIC_SAMPLE_RATIO=0.0)
+    for _ in range(20):
+        assert _persist(service, service.status) == (False, {'skipped': 1})
+    assert Metric.query.count() == 0
+
+def test_steady_state_stored_at_ratio_one(app, service):
+    app.config.update(METRIC_PERSISTENCE='changes', METRIC_SAMPLE_RATIO=1.0)
+    for _ in range(20):
+        assert _persist(service, service.status) == (True, {'sample': 1})
+    assert Metric.query.count() == 20
@@ -0,0 +1,97 @@
+"""
+Tests for the notification outbox worker's failure handling
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from extensions import db
+from models import Notification
+from notifications import ChannelWorker
+
+class RecordingSender:
+    def __init__(self, error=None):
+        self.error = error
+        self.sent = []
+
+    def send(self, subject, text):
+        if self.error is not None:
+            raise self.error
+        self.sent.append(subject)
+
+    def close(self):
+        pass
+
+def _queue(status='pending', next_attempt_at=None):
+    row = Notification(channel='slack', event_type='alert_firing', subject='api down', body='',
+                       status=status, attempts=0, next_attempt_at=next_attempt_at or datetime.utcnow())
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+def test_delivered_digest_marks_rows_sent(app):
+    row_id = _queue()
+    sender = RecordingSender()
+    assert ChannelWorker(app, 'slack', sender).run_once() == 1
+    assert sender.sent == ['api down']
+    assert db.session.get(Notification, row_id).status == 'sent'
+
+@pytest.mark.parametrize('fail_in', ['send', 'record'])
+def test_any_failure_returns_rows_to_pending_with_backoff(app, monkeypatch, fail_in):
+    row_id = _queue()
+    worker = ChannelWorker(app, 'slack', RecordingSender(OSError('boom') if fail_in == 'send' else None))
+    if fail_in == 'record':
+        def broken(rows, now):
+            raise RuntimeError('database went away')
+        monkeypatch.setattr(worker, '_record_success', broken)
+
+    before = datetime.utcnow()
+    assert worker.run_once() == 0
+
+    db.session.expire_all()
+    row = db.session.get(Notification, row_id)
+    assert row.status == 'pending'
+    assert row.attempts == 1
+    assert row.next_attempt_at >= before + timedelta(seconds=app.config['NOTIFICATION_RETRY_DELAY'])
+
+def test_sweep_requeues_rows_whose_lease_expired(app):
+    lease = app.config['NOTIFICATION_SENDING_LEASE']
+    stuck = _queue('sending', datetime.utcnow() - timedelta(seconds=1))
+    held = _queue('sending', datetime.utcnow() + timedelta(seconds=lease))
+    worker = ChannelWorker(app, 'slack', RecordingSender())
+
+    assert worker.sweep(datetime.utcnow()) == 1
+    assert worker.sweep(datetime.utcnow()) == 0  # at most once per lease
+
+    db.session.expire_all()
+    assert db.session.get(Notification, stuck).status == 'pending'
+    assert db.session.get(Notification, stuck).last_error == 'Delivery lease expired'
+    assert db.session.get(Notification, held).status == 'sending'
+
+def test_racing_workers_never_claim_the_same_row(app):
+    ids = [_queue() for _ in range(3)]
+    other = ChannelWorker(app, 'slack', RecordingSender())
+
+    class Interrupted(ChannelWorker):
+        def _due_ids(self, now):
+            due = super()._due_ids(now)
+            # Another dispatcher claims the same rows between our SELECT and our UPDATE
+            assert [row.id for row in other.claim(now)] == due
+            return due
+
+    late = Interrupted(app, 'slack', RecordingSender())
+    assert late.claim(datetime.utcnow()) == []
+    assert {row.status for row in Notification.query.filter(Notification.id.in_(ids))} == {'sending'}
+
+def test_racing_workers_split_the_rows(app):
+    ids = [_queue() for _ in range(3)]
+    other = ChannelWorker(app, 'slack', RecordingSender())
+    other.batch_size = 1
+
+    class Interrupted(ChannelWorker):
+        def _due_ids(self, now):
+            due = super()._due_ids(now)
+            assert [row.id for row in other.claim(now)] == ids[:1]
+            return due
+
+    late = Interrupted(app, 'slack', RecordingSender())
+    assert [row.id for row in late.claim(datetime.utcnow())] == ids[1:]
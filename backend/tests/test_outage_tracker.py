@@ -0,0 +1,86 @@
+"""
+Tests for one open incident per service and failure class
+"""
+
+import socket
+from datetime import datetime, timedelta
+import pytest
+import checker
+from checker import check_service_health
+from extensions import db
+from models import Incident
+from outage_tracker import classify_failure, record_failure, resolve_outages
+from probe_client import ProbeResult
+
+NOW = datetime(2024, 5, 1, 10, 0)
+
+def _open(service, failure_class):
+    return Incident.query.filter_by(service_id=service.id, status='open', failure_class=failure_class).all()
+
+def test_classify_failure():
+    assert classify_failure(socket.timeout()) == 'timeout'
+    assert classify_failure(ConnectionRefusedError()) == 'connection'
+    assert classify_failure(socket.gaierror()) == 'connection'
+    assert classify_failure(ValueError()) == 'error'
+
+def test_repeated_failures_extend_the_open_incident(app, service):
+    first = record_failure(service, 'timeout', 'timed out', NOW)
+    db.session.commit()
+    second = record_failure(service, 'timeout', 'timed out again', NOW + timedelta(minutes=1))
+    db.session.commit()
+
+    assert second.id == first.id
+    assert second.failure_count == 2
+    assert second.last_seen_at == NOW + timedelta(minutes=1)
+    assert 'timed out again' in second.description
+    assert len(_open(service, 'timeout')) == 1
+
+def test_failure_classes_get_separate_incidents(app, service):
+    record_failure(service, 'timeout', 'timed out', NOW)
+    record_failure(service, 'connection', 'refused', NOW)
+    db.session.commit()
+    assert len(_open(service, 'timeout')) == 1
+    assert len(_open(service, 'connection')) == 1
+
+def test_failure_after_resolve_opens_a_new_incident(app, service):
+    first = record_failure(service, 'timeout', 'timed out', NOW)
+    db.session.commit()
+    assert resolve_outages(service, NOW + timedelta(minutes=5)) == [first]
+    db.session.commit()
+    assert first.status == 'resolved'
+    assert first.actual_resolution_time == pytest.approx(5 / 60)
+
+    second = record_failure(service, 'timeout', 'timed out', NOW + timedelta(minutes=10))
+    db.session.commit()
+    assert second.id != first.id
+    assert second.failure_count == 1
+
+def test_resolve_leaves_manual_incidents_open(app, service):
+    manual = Incident(service_id=service.id, title='Disk full', status='open')
+    db.session.add(manual)
+    db.session.commit()
+    assert resolve_outages(service, NOW) == []
+    assert manual.status == 'open'
+
+def test_bookkeeping_error_is_not_an_outage(app, service, monkeypatch):
+    class Answering:
+        def fetch(self, service, **options):
+            return ProbeResult(200, 0, 10, None, 0.01, 1, False)
+
+    def broken_rollup(service_id, timestamp, cost, error=False, **kwargs):
+        if not error:  # only the healthy probe's write fails
+            raise RuntimeError('database is locked')
+    monkeypatch.setattr(checker, 'get_probe_client', lambda app: Answering())
+    monkeypatch.setattr(checker, 'record_cost_rollup', broken_rollup)
+
+    with pytest.raises(RuntimeError):
+        check_service_health(service)
+    db.session.rollback()
+    assert Incident.query.count() == 0
+    assert service.status != 'down'
+
+def test_failed_probe_opens_an_incident(app, service):
+    observation = check_service_health(service, retries=0)
+    assert observation.error
+    assert service.status == 'down'
+    assert [incident.failure_class for incident in _open(service, 'connection')] == ['connection']
@@ -0,0 +1,95 @@
+"""
+Tests for probe retries and the per-probe time budget
+"""
+
+import socket
+import time
+import pytest
+import probe_client
+from probe_client import ProbeClient
+from probes import ConnectError, ConnectTimeout, ProbeResponse, tcp_probe
+
+class FixedDelays:
+    def __init__(self, delay):
+        self._delay = delay
+
+    def delay(self, service_id):
+        return self._delay
+
+    def observe(self, service_id, latency):
+        pass
+
+def _client(**options):
+    settings = dict(connect_timeout=0.2, read_timeout=0.5, max_retries=10, retry_backoff=0.01)
+    settings.update(options)
+    return ProbeClient(**settings)
+
+def _use_probe(monkeypatch, probe):
+    calls = []
+
+    def recording(service, timeout, resolve):
+        calls.append(timeout)
+        return probe(service, timeout, resolve)
+    monkeypatch.setattr(probe_client, 'resolve_probe', lambda service: recording)
+    return calls
+
+def test_connect_failures_are_retried(app, service, monkeypatch):
+    outcomes = [ConnectError('refused'), ConnectError('refused')]
+
+    def flaky(service, timeout, resolve):
+        if outcomes:
+            raise outcomes.pop()
+        return ProbeResponse(200, 0, 0, None)
+    calls = _use_probe(monkeypatch, flaky)
+
+    result = _client().fetch(service)
+    assert (result.status_code, result.attempts) == (200, 3)
+    assert len(calls) == 3
+
+def test_read_timeout_is_not_retried(app, service):
+    # A listening socket that is never accepted: connect succeeds, nothing is ever read
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(8)
+    service.url = f'redis://127.0.0.1:{listener.getsockname()[1]}'
+    try:
+        started = time.monotonic()
+        with pytest.raises(socket.timeout) as raised:
+            _client(read_timeout=0.3).fetch(service)
+        assert not isinstance(raised.value, ConnectTimeout)
+        assert time.monotonic() - started < 0.6
+    finally:
+        listener.close()
+
+def test_refused_connect_is_a_connect_phase_error(app, service):
+    with pytest.raises(ConnectError):
+        tcp_probe(service, (0.5, 0.5))
+
+def test_retries_share_one_read_timeout_budget(app, service, monkeypatch):
+    def hanging_connect(service, timeout, resolve):
+        time.sleep(timeout[0])
+        raise ConnectTimeout('timed out')
+    calls = _use_probe(monkeypatch, hanging_connect)
+
+    started = time.monotonic()
+    with pytest.raises(ConnectTimeout):
+        _client().fetch(service)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.5 + 0.1
+    assert 2 <= len(calls) < 11
+    assert sum(connect for connect, _ in calls) <= 0.5 + 1e-6
+    assert calls[-1][1] < 0.5  # later attempts only get what is left
+
+def test_hedged_probe_gives_up_at_the_deadline(app, service, monkeypatch):
+    def hung(service, timeout, resolve):
+        time.sleep(1)
+        return ProbeResponse(200, 0, 0, None)
+    calls = _use_probe(monkeypatch, hung)
+    client = _client(read_timeout=0.3, hedge_enabled=True, hedge_delays=FixedDelays(0.05))
+
+    started = time.monotonic()
+    with pytest.raises(socket.timeout):
+        client.fetch(service)
+    assert time.monotonic() - started < 0.3 + 0.1
+    assert len(calls) == 2  # primary and hedge, no retry of a read timeout
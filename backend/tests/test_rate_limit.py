@@ -0,0 +1,99 @@
+"""
+Tests for API rate limiting and the concurrency admission gate
+"""
+
+import threading
+import pytest
+from flask import jsonify
+from rate_limit import AdmissionGate, MemoryStorage, RateLimiter, exempt, parse_rate, rate_limit
+
+@pytest.fixture
+def limited_app(tmp_path):
+    """An app with a tight default limit, a one-request gate and a few extra test views"""
+    from app import create_app
+
+    app = create_app('testing', DATABASE_URL=f'sqlite:///{tmp_path / "test.db"}',
+                     RATE_LIMIT_ENABLED=True, RATE_LIMIT_DEFAULT='3 per minute', MAX_CONCURRENT_REQUESTS=1)
+    app.entered = threading.Event()
+    app.release = threading.Event()
+
+    def slow():
+        app.entered.set()
+        app.release.wait(5)
+        return jsonify({'ok': True})
+
+    @rate_limit('1 per minute')
+    def strict():
+        return jsonify({'ok': True})
+
+    @exempt
+    def free():
+        return jsonify({'ok': True})
+
+    app.add_url_rule('/test/slow', 'slow', slow)
+    app.add_url_rule('/test/strict', 'strict', strict)
+    app.add_url_rule('/test/free', 'free', free)
+    app.add_url_rule('/test/default', 'default', lambda: jsonify({'ok': True}))
+    return app
+
+def test_parse_rate():
+    assert parse_rate('100 per minute') == (100, 60)
+    assert parse_rate('10/second') == (10, 1)
+    assert parse_rate('1000 per 5 minutes') == (1000, 300)
+    with pytest.raises(ValueError):
+        parse_rate('lots')
+
+def test_token_bucket_refills_at_the_rate():
+    storage = MemoryStorage()
+    assert [storage.acquire('k', 2, 1.0, 100.0)[0] for _ in range(3)] == [True, True, False]
+    allowed, tokens, retry_after = storage.acquire('k', 2, 1.0, 100.0)
+    assert (allowed, retry_after) == (False, 1.0)
+    assert storage.acquire('k', 2, 1.0, 101.0)[0]
+
+def test_storage_failure_lets_requests_through():
+    class Broken:
+        def acquire(self, *args):
+            raise ConnectionError('redis down')
+    assert RateLimiter(Broken(), (1, 60)).hit('k')[0]
+
+def test_default_limit_rejects_with_429(limited_app):
+    client = limited_app.test_client()
+    responses = [client.get('/test/default') for _ in range(4)]
+    assert [r.status_code for r in responses] == [200, 200, 200, 429]
+    assert responses[0].headers['X-RateLimit-Limit'] == '3'
+    assert responses[2].headers['X-RateLimit-Remaining'] == '0'
+    assert int(responses[3].headers['Retry-After']) >= 1
+    assert responses[3].get_json()['error'] == 'Rate limit exceeded'
+
+def test_limits_are_per_caller_endpoint_and_view(limited_app):
+    client = limited_app.test_client()
+    assert client.get('/test/strict').status_code == 200
+    assert client.get('/test/strict').status_code == 429
+    # Another client address and another endpoint have buckets of their own
+    assert client.get('/test/strict', environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code == 200
+    assert client.get('/test/default').status_code == 200
+    assert all(client.get('/test/free').status_code == 200 for _ in range(10))
+
+def test_gate_sheds_requests_beyond_the_limit_with_503(limited_app):
+    results = []
+    worker = threading.Thread(target=lambda: results.append(limited_app.test_client().get('/test/slow')))
+    worker.start()
+    try:
+        assert limited_app.entered.wait(5)
+        shed = limited_app.test_client().get('/test/free')
+        assert shed.status_code == 503
+        assert shed.headers['Retry-After'] == '1'
+    finally:
+        limited_app.release.set()
+        worker.join(5)
+    assert results[0].status_code == 200
+    # The slow request's slot was released at teardown
+    assert limited_app.test_client().get('/test/free').status_code == 200
+    assert limited_app.extensions['admission_gate'].in_flight == 0
+
+def test_gate_counts_in_flight():
+    gate = AdmissionGate(2)
+    assert gate.enter() and gate.enter()
+    assert not gate.enter()
+    gate.leave()
+    assert gate.enter()
@@ -0,0 +1,92 @@
+"""
+Tests for the SLA compliance counters
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from auth import generate_token
+from extensions import db
+from models import Incident, SlaCounter, User
+from sla_counters import count_resolution, get_sla_compliance, rebuild_sla_counters
+
+NOW = datetime(2024, 5, 20, 12, 0)
+
+def _resolved(service, resolved_at, hours=2, sla_hours=4, severity='high'):
+    created_at = resolved_at - timedelta(hours=hours)
+    incident = Incident(service_id=service.id, title='Outage', severity=severity, status='resolved',
+                        created_at=created_at, resolved_at=resolved_at,
+                        sla_target=created_at + timedelta(hours=sla_hours))
+    db.session.add(incident)
+    count_resolution(incident)
+    db.session.commit()
+    return incident
+
+def _counters():
+    return {(row.day, row.severity): (row.resolved_count, row.met_count, round(row.resolution_hours, 6))
+            for row in SlaCounter.query.populate_existing()}
+
+def test_resolutions_add_up_per_day_and_severity(app, service):
+    _resolved(service, NOW)
+    _resolved(service, NOW, hours=6)
+    _resolved(service, NOW, severity='low')
+    db.session.add(Incident(service_id=service.id, title='No target', status='resolved', resolved_at=NOW))
+    db.session.commit()
+
+    assert _counters() == {(NOW.date(), 'high'): (2, 1, 8.0), (NOW.date(), 'low'): (1, 1, 2.0)}
+
+def test_concurrent_resolution_is_not_lost(app, service):
+    incident = _resolved(service, NOW)
+    counter = SlaCounter.query.one()  # loaded in this session, as a read-then-add would
+    assert counter.resolved_count == 1
+    with Session(db.engine) as other:  # another worker counts the same day meanwhile
+        other.query(SlaCounter).update({SlaCounter.resolved_count: SlaCounter.resolved_count + 1})
+        other.commit()
+    count_resolution(incident)
+    db.session.commit()
+    assert _counters() == {(NOW.date(), 'high'): (3, 2, 4.0)}
+
+def test_re_resolving_moves_the_incident_to_its_new_day(app, service):
+    incident = _resolved(service, NOW - timedelta(days=3), hours=1)
+    user = User(username='ops', email='ops@example.com', password_hash='x', role='admin')
+    db.session.add(user)
+    db.session.commit()
+    token = generate_token(user.id, user.username, user.role)
+
+    client = app.test_client()
+    for _ in range(2):
+        response = client.post(f'/api/incidents/{incident.id}/resolve', json={'resolution_notes': 'again'},
+                               headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200
+
+    incident = db.session.get(Incident, incident.id)
+    hours = round((incident.resolved_at - incident.created_at).total_seconds() / 3600, 6)
+    counters = _counters()
+    assert counters.pop(((NOW - timedelta(days=3)).date(), 'high')) == (0, 0, 0.0)
+    assert counters == {(incident.resolved_at.date(), 'high'): (1, 0, hours)}  # late against its old target
+
+def test_compliance_windows(app, service):
+    _resolved(service, NOW)
+    _resolved(service, NOW - timedelta(days=5), hours=6)
+    _resolved(service, NOW - timedelta(days=7), severity='low')  # the day `days` ago is outside the window
+    _resolved(service, NOW - timedelta(days=40), hours=5, severity='low')
+
+    week = get_sla_compliance(days=7, now=NOW)
+    assert (week['resolved'], week['met'], week['compliance_percent'], week['avg_resolution_hours']) == (2, 1, 50.0, 4.0)
+    assert set(week['by_severity']) == {'high'}
+
+    month = get_sla_compliance(days=30, now=NOW)
+    assert (month['resolved'], month['met']) == (3, 2)
+    assert month['by_severity']['low'] == {'resolved': 1, 'met': 1, 'compliance_percent': 100.0,
+                                           'avg_resolution_hours': 2.0}
+
+    everything = get_sla_compliance(now=NOW)
+    assert (everything['resolved'], everything['met']) == (4, 2)
+    assert get_sla_compliance(days=30, severity='low', now=NOW)['resolved'] == 1
+    assert get_sla_compliance(days=1, service_id=service.id + 1, now=NOW)['compliance_percent'] is None
+
+def test_rebuild_matches_the_incremental_counters(app, service):
+    _resolved(service, NOW)
+    _resolved(service, NOW - timedelta(days=5), hours=6)
+    before = _counters()
+    rebuild_sla_counters()
+    assert _counters() == before
@@ -0,0 +1,69 @@
+"""
+Tests for the ring-buffer sliding windows
+"""
+
+import random
+import pytest
+from sliding_window import ServiceWindows, SlidingWindow, WindowRegistry, parse_window, parse_windows
+
+def test_parse_window():
+    assert [parse_window(spec) for spec in ('300', '5m', '1h', ' 24H ', '1.5m')] == [300, 300, 3600, 86400, 90]
+    assert parse_windows('5m, 1h,') == {'5m': 300, '1h': 3600}
+
+def test_buckets_expire_as_the_window_slides():
+    window = SlidingWindow(60, buckets=6)  # 10 s buckets
+    window.add(1000, 0.5)
+    window.add(1015, 0.0, error=True)
+    assert window.totals(1059) == (2, 1, 0.5)
+    assert window.totals(1060) == (1, 1, 0.0)  # the 1000-1009 bucket left the window
+    assert window.totals(1069) == (1, 1, 0.0)
+    assert window.totals(1070) == (0, 0, 0.0)
+
+def test_idle_gap_longer_than_the_window_clears_every_bucket():
+    window = SlidingWindow(60, buckets=6)
+    for second in range(1000, 1060, 5):
+        window.add(second, 0.1)
+    window.add(5000, 0.2)
+    assert window.totals(5000) == (1, 0, pytest.approx(0.2))
+    # Exactly one full ring later the slots are reused after wraparound
+    window.add(5060, 0.3)
+    assert window.totals(5060) == (1, 0, pytest.approx(0.3))
+
+def test_late_sample_is_counted_in_the_newest_bucket():
+    window = SlidingWindow(60, buckets=6)
+    window.add(1050, 0.1)
+    window.add(1040, 0.1)  # clock stepped back
+    assert window.totals(1050)[0] == 2
+
+def test_totals_match_a_brute_force_sum():
+    rng = random.Random(3)
+    window = SlidingWindow(300, buckets=30)
+    samples = []
+    now = 10_000.0
+    for _ in range(3000):
+        now += rng.choice([0.0, 0.3, 2.0, 7.5, 45.0]) if rng.random() < 0.98 else rng.uniform(300, 900)
+        latency, error = rng.random(), rng.random() < 0.1
+        window.add(now, latency, error)
+        samples.append((now, latency, error))
+
+        newest = int(now // window.bucket_seconds)
+        live = [s for s in samples if int(s[0] // window.bucket_seconds) > newest - window.size]
+        requests, errors, latency_sum = window.totals(now)
+        assert requests == len(live)
+        assert errors == sum(1 for s in live if s[2])
+        assert latency_sum == pytest.approx(sum(s[1] for s in live if not s[2]), abs=1e-6)
+
+def test_service_windows_stats():
+    windows = ServiceWindows({'1m': 60, '1h': 3600}, buckets=60)
+    windows.record(1000, 0.2)
+    windows.record(1001, 0.4)
+    windows.record(1002, None, error=True)
+    assert windows.stats('1m', 1002) == {'requests': 3, 'errors': 1, 'error_rate': 33.33, 'avg_response_time': 0.3}
+    assert windows.snapshot(1100)['1m']['error_rate'] is None
+    assert windows.snapshot(1100)['1h']['requests'] == 3
+
+def test_registry_keeps_the_alert_window():
+    registry = WindowRegistry.from_config({'STATS_WINDOWS': '5m,1h', 'ALERT_ERROR_RATE_WINDOW': '15m',
+                                           'STATS_WINDOW_BUCKETS': 10})
+    assert set(registry.windows) == {'5m', '1h', '15m'}
+    assert registry.get(1) is registry.get(1)
@@ -0,0 +1,66 @@
+"""
+Tests for the Bloom filter and the cross-worker token revocation list
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from auth import generate_token
+from extensions import db
+from models import RevokedToken, User
+from token_revocation import BloomFilter, RevocationList, prune_revoked_tokens
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(10000, 0.01)
+    added = [uuid.uuid4().hex for _ in range(10000)]
+    for key in added:
+        bloom.add(key)
+    assert all(key in bloom for key in added)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(20000))
+    assert false_positives / 20000 < 0.02
+
+def _revoke_elsewhere(jti, expires_in=timedelta(hours=1)):
+    """A revocation written by another worker"""
+    db.session.add(RevokedToken(jti=jti, user_id=None, expires_at=datetime.utcnow() + expires_in))
+    db.session.commit()
+
+def test_refresh_picks_up_other_workers_revocations_when_due(app):
+    revocations = RevocationList(refresh_interval=3600)
+    assert not revocations.is_revoked('a')  # first lookup loads
+    _revoke_elsewhere('a')
+    assert not revocations.is_revoked('a')  # refresh not due yet
+    revocations.refresh_interval = 0
+    assert revocations.is_revoked('a')
+    assert revocations.stats()['revoked'] == 1
+
+def test_local_revocation_applies_at_once(app):
+    revocations = RevocationList(refresh_interval=3600)
+    revocations.load()
+    revocations.revoke('b', None, datetime.utcnow() + timedelta(hours=1))
+    assert revocations.is_revoked('b')
+    db.session.commit()
+    assert RevokedToken.query.filter_by(jti='b').count() == 1
+
+def test_rebuild_drops_expired_tokens(app):
+    _revoke_elsewhere('old', expires_in=timedelta(seconds=-1))
+    _revoke_elsewhere('live')
+    revocations = RevocationList(rebuild_interval=0)
+    assert revocations.is_revoked('live')
+    assert not revocations.is_revoked('old')
+    assert prune_revoked_tokens() == 1
+
+def test_logout_revokes_the_token_in_every_app(app):
+    from app import create_app
+
+    user = User(username='alice', email='alice@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {generate_token(user.id, user.username, user.role)}'}
+    other_worker = create_app('testing', DATABASE_URL=app.config['DATABASE_URL'], TOKEN_REVOCATION_REFRESH=0)
+
+    assert other_worker.test_client().get('/api/auth/profile', headers=headers).status_code == 200
+    client = app.test_client()
+    assert client.post('/api/auth/logout', headers=headers).status_code == 200
+    assert client.get('/api/auth/profile', headers=headers).status_code == 401
+    revoked = other_worker.test_client().get('/api/auth/profile', headers=headers)
+    assert revoked.status_code == 401
+    assert revoked.get_json()['error'] == 'Token has been revoked'
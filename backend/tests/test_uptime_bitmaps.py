@@ -0,0 +1,46 @@
+"""
+Tests for per-minute uptime bitmaps
+"""
+
+import random
+from datetime import datetime, timedelta
+from extensions import db
+from uptime_bitmaps import (BITMAP_BYTES, MINUTES_PER_DAY, count_bits, get_availability, mark,
+                            record_uptime)
+
+def _naive_count(bitmap, start, end):
+    return sum(1 for minute in range(start, end) if bitmap[minute // 8] & (0x80 >> (minute % 8)))
+
+def test_count_bits_matches_a_bit_by_bit_count():
+    rng = random.Random(7)
+    bitmap = bytes(rng.getrandbits(8) for _ in range(BITMAP_BYTES))
+    ranges = [(0, MINUTES_PER_DAY), (0, 1), (1439, 1440), (3, 5), (8, 16), (7, 9), (5, 700), (700, 5)]
+    ranges += [tuple(sorted(rng.sample(range(MINUTES_PER_DAY + 1), 2))) for _ in range(500)]
+    for start, end in ranges:
+        assert count_bits(bitmap, start, end) == _naive_count(bitmap, start, end), (start, end)
+    assert count_bits(None) == 0
+    assert count_bits(bytes([0xFF]) * BITMAP_BYTES) == MINUTES_PER_DAY
+
+def test_mark_counts_partial_day_ranges():
+    probed, up = bytearray(BITMAP_BYTES), bytearray(BITMAP_BYTES)
+    for minute in range(600, 660):  # 10:00-10:59
+        mark(probed, up, minute, healthy=minute % 10 != 0)
+    mark(probed, up, 615, healthy=False)  # a second, failing probe takes the minute down
+    mark(probed, up, 620, healthy=True)  # a later healthy probe does not bring it back
+
+    assert count_bits(probed, 0, 600) == 0
+    assert count_bits(probed, 600, 660) == 60
+    assert count_bits(up, 600, 660) == 60 - 6 - 1
+    assert count_bits(up, 605, 625) == 20 - 2 - 1
+    assert count_bits(probed, 659, MINUTES_PER_DAY) == 1
+
+def test_availability_masks_the_partial_first_day(app, service):
+    now = datetime(2024, 5, 31, 12, 0)
+    record_uptime(service.id, now - timedelta(days=30, minutes=1), healthy=False)  # just outside 30d
+    record_uptime(service.id, now - timedelta(days=30), healthy=True)
+    assert record_uptime(service.id, now - timedelta(minutes=1), healthy=True) == 100.0
+    assert record_uptime(service.id, now, healthy=False) == 50.0
+    db.session.commit()
+
+    window = get_availability(service.id, windows=('30d',), now=now)['30d']
+    assert (window['minutes_probed'], window['minutes_up']) == (3, 2)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Token revocation for Cloud Health Dashboard Phase 2
+Logging out stores the token's JWT ID in the revoked_token table. Every worker keeps the
+unexpired revoked IDs in memory: a Bloom filter answers "not revoked" for almost every token
+with a few hashes, and an exact set settles the rare possible hit. Workers pick up each other's
+revocations every TOKEN_REVOCATION_REFRESH seconds by reading only the rows added since their
+last refresh, and reload everything every TOKEN_REVOCATION_REBUILD seconds to drop expired IDs.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from extensions import db
+from models import RevokedToken
+from monitoring import REVOKED_TOKENS, TOKEN_REVOCATION_CHECKS
+
+# Incremental reads look back this far, so a revocation committed late is still picked up
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, sized for capacity items at error_rate"""
+
+    __slots__ = ('capacity', 'size', 'hashes', 'bits', 'count')
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class RevocationList:
+    """The revoked JWT IDs of unexpired tokens; one per worker process"""
+
+    def __init__(self, refresh_interval=5, rebuild_interval=3600, capacity=100000, error_rate=0.001):
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._revoked = set()
+        self._since = None  # revoked_at of the last incremental read
+        self._loaded_at = None
+        self._refreshed_at = None
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            refresh_interval=config['TOKEN_REVOCATION_REFRESH'],
+            rebuild_interval=config['TOKEN_REVOCATION_REBUILD'],
+            capacity=config['TOKEN_REVOCATION_CAPACITY'],
+            error_rate=config['TOKEN_REVOCATION_ERROR_RATE']
+        )
+
+    def load(self, now=None):
+        """Rebuild from every revocation of a token that has not expired yet"""
+        now = now or datetime.utcnow()
+        jtis = [jti for (jti,) in db.session.query(RevokedToken.jti).filter(RevokedToken.expires_at > now)]
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._revoked = set(jtis)
+            self._since = now
+            self._loaded_at = self._refreshed_at = time.monotonic()
+        REVOKED_TOKENS.set(len(jtis))
+
+    def refresh(self):
+        """Read the revocations added since the last refresh (or reload) when one is due"""
+        if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        # Until the first load has finished every thread waits for it; later, one refreshes and the rest move on
+        if not self._refresh_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            now = datetime.utcnow()
+            if (self._loaded_at is None or time.monotonic() - self._loaded_at >= self.rebuild_interval
+                    or self._bloom.count > self._bloom.capacity):  # past its sizing: rebuild larger
+                self.load(now)
+                return
+            rows = db.session.query(RevokedToken.jti).filter(
+                RevokedToken.revoked_at >= self._since - REFRESH_OVERLAP,
+                RevokedToken.expires_at > now
+            )
+            for (jti,) in rows:
+                self._add(jti)
+            self._since = now
+            self._refreshed_at = time.monotonic()
+            REVOKED_TOKENS.set(len(self._revoked))
+        finally:
+            self._refresh_lock.release()
+
+    def _add(self, jti):
+        with self._lock:
+            if jti not in self._revoked:
+                self._revoked.add(jti)
+                self._bloom.add(jti)
+
+    def is_revoked(self, jti):
+        """Bloom filter first; only its (rare) positives consult the exact set"""
+        self.refresh()
+        if jti not in self._bloom:
+            TOKEN_REVOCATION_CHECKS.labels(result='clear').inc()
+            return False
+        revoked = jti in self._revoked
+        TOKEN_REVOCATION_CHECKS.labels(result='revoked' if revoked else 'false_positive').inc()
+        return revoked
+
+    def revoke(self, jti, user_id, expires_at):
+        """Store the revocation (the caller commits) and apply it in this process at once"""
+        db.session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        self._add(jti)
+        REVOKED_TOKENS.set(len(self._revoked))
+
+    def stats(self):
+        """Get size and sizing of the in-memory list"""
+        return {
+            'revoked': len(self._revoked),
+            'bloom_bits': self._bloom.size,
+            'bloom_hashes': self._bloom.hashes
+        }
+
+def prune_revoked_tokens(now=None):
+    """Delete revocations of tokens that have expired anyway; the caller commits"""
+    return RevokedToken.query.filter(RevokedToken.expires_at <= (now or datetime.utcnow())).delete()
+
+def get_revocation_list(app):
+    """The app's revocation list, loaded from the database on first lookup"""
+    revocations = app.extensions.get('token_revocations')
+    if revocations is None:
+        revocations = app.extensions['token_revocations'] = RevocationList.from_config(app.config)
+    return revocations
+
+def is_token_revoked(app, payload):
+    """Whether a decoded token was revoked; tokens issued without a jti cannot be"""
+    jti = payload.get('jti')
+    return jti is not None and get_revocation_list(app).is_revoked(jti)
+
+def revoke_token(app, payload):
+    """Revoke a decoded token until it expires; the caller commits"""
+    jti = payload.get('jti')
+    if jti is None:
+        return False
+    prune_revoked_tokens()
+    get_revocation_list(app).revoke(jti, payload.get('user_id'), datetime.utcfromtimestamp(payload['exp']))
+    return True
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Race-free counter rows for Cloud Health Dashboard Phase 2
+The checker process and the web workers (inline checks, incident resolution) can both create
+the first row of a rollup bucket. These helpers create-or-update such rows in one statement
+(INSERT ... ON CONFLICT on PostgreSQL and SQLite) instead of SELECT-then-INSERT, whose loser
+would hit the unique constraint and lose its whole transaction.
+"""
+
+from sqlalchemy import insert as generic_insert, update
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+
+def _dialect_insert(model):
+    """The dialect's INSERT supporting ON CONFLICT, or None"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(model)
+
+def upsert_increment(model, key, increments):
+    """Insert key with increments as initial values, or add increments to the existing row
+
+    key columns must form a unique constraint. The caller commits.
+    """
+    insert = _dialect_insert(model)
+    if insert is not None:
+        statement = insert.values(**key, **increments)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={name: getattr(model, name) + getattr(statement.excluded, name) for name in increments}
+        ))
+        return
+    # Other databases: try the insert in a savepoint and fall back to an increment
+    try:
+        with db.session.begin_nested():
+            db.session.execute(generic_insert(model).values(**key, **increments))
+    except IntegrityError:
+        db.session.execute(update(model).filter_by(**key).values(
+            {name: getattr(model, name) + value for name, value in increments.items()}))
+
+def locked_row(model, **key):
+    """Create the row for key if no process has yet, and return it locked for this transaction"""
+    insert = _dialect_insert(model)
+    if insert is not None:
+        db.session.execute(insert.values(**key).on_conflict_do_nothing(index_elements=list(key)))
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(generic_insert(model).values(**key))
+        except IntegrityError:
+            pass
+    return model.query.filter_by(**key).with_for_update().populate_existing().one()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-minute uptime bitmaps for Cloud Health Dashboard Phase 2
+Each service keeps one row per UTC day holding two 1440-bit (180-byte) bitmaps: the minutes
+that were probed and the minutes in which every probe found the service healthy. Availability
+over any window is a popcount of the two, so 30/90/365-day SLAs read at most 366 small rows.
+"""
+
+from datetime import datetime, timedelta
+from extensions import db
+from models import Metric, UptimeBitmap
+from sliding_window import parse_window
+from upserts import locked_row
+
+MINUTES_PER_DAY = 1440
+BITMAP_BYTES = MINUTES_PER_DAY // 8
+SLA_WINDOWS = ('30d', '90d', '365d')
+# Set bits of every byte value, for bytes.translate (int.bit_count() needs Python 3.10)
+POPCOUNT = bytes(bin(value).count('1') for value in range(256))
+
+def _empty():
+    return bytes(BITMAP_BYTES)
+
+def minute_of_day(timestamp):
+    return timestamp.hour * 60 + timestamp.minute
+
+def count_bits(bitmap, start=0, end=MINUTES_PER_DAY):
+    """Set bits among minutes [start, end) of a day bitmap (bit 0 is 00:00, most significant first)"""
+    if not bitmap or start >= end:
+        return 0
+    first, last = start // 8, (end - 1) // 8
+    head = 0xFF >> (start % 8)
+    tail = (0xFF << (7 - (end - 1) % 8)) & 0xFF
+    if first == last:
+        return POPCOUNT[bitmap[first] & head & tail]
+    middle = sum(bitmap[first + 1:last].translate(POPCOUNT))
+    return POPCOUNT[bitmap[first] & head] + middle + POPCOUNT[bitmap[last] & tail]
+
+def mark(probed, up, minute, healthy):
+    """Record a probe in minute on bytearray bitmaps; a minute stays up only if every probe in it was"""
+    index, mask = minute // 8, 0x80 >> (minute % 8)
+    first_probe = not probed[index] & mask
+    probed[index] |= mask
+    if healthy and first_probe:
+        up[index] |= mask
+    elif not healthy:
+        up[index] &= ~mask & 0xFF
+
+def mark_minute(probed, up, minute, healthy):
+    """(probed, up) bytes after a probe in minute"""
+    probed, up = bytearray(probed or _empty()), bytearray(up or _empty())
+    mark(probed, up, minute, healthy)
+    return bytes(probed), bytes(up)
+
+def record_uptime(service_id, timestamp, healthy):
+    """Mark the probe's minute and return the day's availability so far in percent; the caller commits"""
+    # The web workers' inline checks can race the checker for a day's first row
+    row = locked_row(UptimeBitmap, service_id=service_id, day=timestamp.date())
+    row.probed, row.up = mark_minute(row.probed, row.up, minute_of_day(timestamp), healthy)
+    return count_bits(row.up) / count_bits(row.probed) * 100
+
+def _window_counts(rows, since, until):
+    """(minutes probed, minutes up) in rows between two datetimes, masking the partial first and last day"""
+    probed = up = 0
+    for row in rows:
+        if row.day < since.date() or row.day > until.date():
+            continue
+        start = minute_of_day(since) if row.day == since.date() else 0
+        end = minute_of_day(until) + 1 if row.day == until.date() else MINUTES_PER_DAY
+        probed += count_bits(row.probed, start, end)
+        up += count_bits(row.up, start, end)
+    return probed, up
+
+def _summary(probed, up):
+    return {
+        'minutes_probed': probed,
+        'minutes_up': up,
+        'uptime_percent': round(up / probed * 100, 4) if probed else None
+    }
+
+def get_availability(service_id, windows=SLA_WINDOWS, now=None):
+    """{window: {'minutes_probed', 'minutes_up', 'uptime_percent'}} from one read of the day rows"""
+    now = now or datetime.utcnow()
+    spans = {window: now - timedelta(seconds=parse_window(window)) for window in windows}
+    rows = UptimeBitmap.query.filter(
+        UptimeBitmap.service_id == service_id,
+        UptimeBitmap.day >= min(spans.values()).date()
+    ).all()
+    return {window: _summary(*_window_counts(rows, since, now)) for window, since in spans.items()}
+
+def rebuild_uptime_bitmaps():
+    """Recompute every bitmap from the raw metrics table (used after bulk loads)"""
+    bitmaps = {}
+    rows = db.session.query(Metric.service_id, Metric.timestamp, Metric.error, Metric.status_code)
+    for service_id, timestamp, error, status_code in rows.yield_per(10000):
+        key = (service_id, timestamp.date())
+        bits = bitmaps.get(key)
+        if bits is None:
+            bits = bitmaps[key] = (bytearray(BITMAP_BYTES), bytearray(BITMAP_BYTES))
+        mark(*bits, minute_of_day(timestamp), not error and status_code == 200)
+
+    UptimeBitmap.query.delete()
+    db.session.bulk_insert_mappings(UptimeBitmap, [{
+        'service_id': service_id,
+        'day': day,
+        'probed': bytes(probed),
+        'up': bytes(up)
+    } for (service_id, day), (probed, up) in bitmaps.items()])
+    db.session.commit()